@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Benchmark the per-call CPU cost of building a request.
+
+Compares the former per-call `urljoin` plus params dict construction with
+dispatch through the precomputed endpoint routes. The transport is replaced
+by a no-op so only client-side overhead is measured.
+
+Usage: python benchmarks/endpoint_dispatch.py
+"""
+
+import timeit
+
+try:
+    from urllib.parse import urljoin  # python 3
+except ImportError:
+    from urlparse import urljoin  # python 2
+
+from python_hologram_api import endpoints
+from python_hologram_api.client import HologramClient
+
+N = 200000
+
+
+class NullTransport(object):
+    cache = None
+
+    def request(self, method, url, **kwargs):
+        return None
+
+
+def legacy(client, link_id):
+    url = urljoin(client.base_url, 'links/cellular/{}/changeplan'.format(link_id))
+    params = {
+        'apikey': client.api_key,
+        'plan': 73,
+        'tier': 1
+    }
+    return client.transport.request('POST', url, json=params)
+
+
+def legacy_static(client):
+    url = urljoin(client.base_url, 'devices')
+    params = {
+        'apikey': client.api_key,
+        'orgid': None,
+    }
+    return client.transport.request('GET', url, json=params)
+
+
+def main():
+    client = HologramClient('key', transport=NullTransport())
+    cases = [
+        ('change_plan (templated)',
+         lambda: legacy(client, 54321),
+         lambda: client.request(endpoints.CHANGE_PLAN, 54321, plan=73, tier=1)),
+        ('list devices (static)',
+         lambda: legacy_static(client),
+         lambda: client.request(endpoints.LIST_DEVICES, org_id=None)),
+    ]
+    for name, old, new in cases:
+        t_old = min(timeit.repeat(old, number=N, repeat=3)) / N * 1e6
+        t_new = min(timeit.repeat(new, number=N, repeat=3)) / N * 1e6
+        print('{:<26} urljoin: {:6.2f} us  registry: {:6.2f} us  ({:.1f}x)'.format(
+            name, t_old, t_new, t_old / t_new))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,35 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Load test the client against the local stub API.
+
+Runs each built-in workload against a `StubServer` with log-normal latency
+and injected 500s and 429s, and prints throughput and p50/p99 latency.
+
+Usage: python benchmarks/load_stub.py [requests] [workers]
+"""
+
+import sys
+
+from python_hologram_api.client import HologramClient
+from python_hologram_api.loadgen import format_report, run_load, workloads
+from python_hologram_api.stub import StubServer, lognormal
+from python_hologram_api.transport import Transport
+
+DEVICES = 1000
+
+
+def main():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+    with StubServer(devices=DEVICES, latency=lognormal(0.02, 0.6), error_rate=0.01, throttle_rate=0.02,
+                    seed=1) as stub:
+        for workload in sorted(workloads(DEVICES)):
+            client = HologramClient('key', base_url=stub.base_url, transport=Transport(pool_maxsize=workers))
+            report = run_load(client, workload, requests=requests, workers=workers, devices=DEVICES, seed=1)
+            print('{}: {}'.format(workload, format_report(report)))
+            client.transport.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,156 @@
+"""Balance History analytics module.
+
+Requires NumPy (``pip install python_hologram_api[analytics]``). pandas is
+used by `BalanceHistory.to_pandas` when it is installed.
+"""
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    raise ImportError('python_hologram_api.balance requires numpy: pip install python_hologram_api[analytics]')
+
+try:
+    string_types = basestring  # python 2
+except NameError:
+    string_types = str  # python 3
+
+
+CHARGE_TYPES = frozenset(['charge', 'debit'])
+"""Transaction types whose amount is subtracted from the balance."""
+
+
+def _timestamps(values):
+    """Convert unix timestamps and/or date strings to a datetime64[s] array."""
+    out = np.empty(len(values), dtype='datetime64[s]')
+    is_str = np.fromiter((isinstance(v, string_types) for v in values), dtype=bool, count=len(values))
+    if is_str.any():
+        out[is_str] = np.array([v for v, s in zip(values, is_str) if s], dtype='datetime64[s]')
+    if not is_str.all():
+        numbers = np.array([v for v, s in zip(values, is_str) if not s], dtype='int64')
+        out[~is_str] = numbers.astype('datetime64[s]')
+    return out
+
+
+class BalanceHistory(object):
+    """BalanceHistory class.
+
+    A columnar view of a Get Balance History response. Every column is a NumPy
+    array of the same length, sorted by time:
+
+    * `time` (datetime64[s]): when the transaction happened.
+    * `amount` (float64): signed amount; charges are negative, credits positive.
+    * `type` (object): transaction type as returned by the API.
+    * `description` (object): transaction description.
+    * `org_id` (int64): organization the transaction belongs to, -1 if unknown.
+    """
+
+    COLUMNS = ('time', 'amount', 'type', 'description', 'org_id')
+
+    def __init__(self, time, amount, type, description, org_id):
+        """Initialize from columns, sorting them by time."""
+        time = np.asarray(time, dtype='datetime64[s]')
+        order = np.argsort(time, kind='mergesort')
+        self.time = time[order]
+        self.amount = np.asarray(amount, dtype='float64')[order]
+        self.type = np.asarray(type, dtype=object)[order]
+        self.description = np.asarray(description, dtype=object)[order]
+        self.org_id = np.asarray(org_id, dtype='int64')[order]
+
+    @classmethod
+    def from_records(cls, records, org_id=None):
+        """Build from the `data` list of a Get Balance History response.
+
+        Args:
+            records (List[dict]): transaction records.
+            org_id (int, optional): organization the records belong to.
+
+        Returns:
+            BalanceHistory: the columnar history.
+
+        Raises:
+            ValueError: if a record has neither a `time` nor a `timestamp`.
+        """
+        times = [r.get('time') if r.get('time') is not None else r.get('timestamp') for r in records]
+        untimed = [i for i, t in enumerate(times) if t is None]
+        if untimed:
+            raise ValueError('Balance history records without a time, at index {}'.format(
+                ', '.join(str(i) for i in untimed[:10]) + (', ...' if len(untimed) > 10 else '')))
+        n = len(records)
+        types = [r.get('type') or '' for r in records]
+        amount = np.abs(np.fromiter((float(r.get('amount') or 0) for r in records), dtype='float64', count=n))
+        charge = np.fromiter((t.lower() in CHARGE_TYPES for t in types), dtype=bool, count=n)
+        amount[charge] *= -1
+        return cls(
+            time=_timestamps(times),
+            amount=amount,
+            type=types,
+            description=[r.get('description') for r in records],
+            org_id=np.full(n, -1 if org_id is None else org_id, dtype='int64'))
+
+    @classmethod
+    def from_response(cls, resp, org_id=None):
+        """Build from a Get Balance History response dictionary."""
+        if not resp.get('success'):
+            raise RuntimeError('Get Balance History failed: {}'.format(resp))
+        return cls.from_records(resp.get('data') or [], org_id=org_id)
+
+    @classmethod
+    def load(cls, client, org_id=None):
+        """Fetch and convert the balance history of an organization or the user.
+
+        Args:
+            client (HologramClient): the client to fetch with.
+            org_id (int, optional): organization ID. Defaults to the current user.
+
+        Returns:
+            BalanceHistory: the columnar history.
+        """
+        if org_id is None:
+            return cls.from_response(client.user.balance_history())
+        return cls.from_response(client.org.balance_history(org_id), org_id=org_id)
+
+    @classmethod
+    def concat(cls, histories):
+        """Concatenate several histories, e.g. one per organization; none gives an empty history."""
+        histories = list(histories)
+        if not histories:
+            return cls(*[[] for _ in cls.COLUMNS])
+        return cls(*[np.concatenate([getattr(h, c) for h in histories]) for c in cls.COLUMNS])
+
+    def __len__(self):
+        """Return the number of transactions."""
+        return len(self.amount)
+
+    def spend_by_period(self, period='M'):
+        """Total charges per calendar period.
+
+        Args:
+            period (str, optional): NumPy datetime unit: 'Y', 'M', 'W', 'D' or 'h'.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: period start (datetime64) and the
+                positive amount charged during that period.
+        """
+        charged = self.amount < 0
+        periods, inverse = np.unique(self.time[charged].astype('datetime64[{}]'.format(period)),
+                                     return_inverse=True)
+        totals = np.bincount(inverse.ravel(), weights=-self.amount[charged], minlength=len(periods))
+        return periods, totals
+
+    def running_balance(self, initial=0.0):
+        """Balance after each transaction, starting from `initial`."""
+        return initial + np.cumsum(self.amount)
+
+    def top_charges(self, n=10):
+        """Indices of the `n` largest charges, largest first."""
+        charged = np.flatnonzero(self.amount < 0)
+        n = min(n, len(charged))
+        if n == 0:
+            return charged
+        top = charged[np.argpartition(self.amount[charged], n - 1)[:n]]
+        return top[np.argsort(self.amount[top], kind='mergesort')]
+
+    def to_pandas(self):
+        """Return the history as a pandas DataFrame. Requires pandas."""
+        import pandas as pd
+        return pd.DataFrame(dict((c, getattr(self, c)) for c in self.COLUMNS), columns=list(self.COLUMNS))
@@ -0,0 +1,181 @@
+"""Circuit breaker module.
+
+`Transport(breakers=CircuitBreakers())` keeps one `CircuitBreaker` per
+endpoint group (e.g. 'csr/rdm', 'links/cellular', 'devices/messages'). After
+`failure_threshold` consecutive failures of a group, its breaker opens and
+further requests to that group raise `CircuitOpenError` immediately instead
+of waiting on the network. After `recovery_timeout` seconds the breaker lets
+a limited number of probe requests through (half-open); a successful probe
+closes it, a failed one opens it again. A probe slot reserved for a request
+that is then never sent must be given back with `release`.
+"""
+
+import threading
+import time
+
+from requests.exceptions import RequestException
+
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half-open'
+
+
+class CircuitOpenError(RequestException):
+    """Raised instead of sending a request while its circuit breaker is open."""
+
+
+class CircuitBreaker(object):
+    """CircuitBreaker class. Thread-safe."""
+
+    def __init__(self, name, failure_threshold=5, recovery_timeout=30.0, half_open_max=1):
+        """Initialize a closed breaker.
+
+        Args:
+            name (str): Name of the guarded endpoint group.
+            failure_threshold (int, optional): Consecutive failures that open the breaker.
+            recovery_timeout (float, optional): Seconds to stay open before probing.
+            half_open_max (int, optional): Probe requests allowed at once while half-open.
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max = half_open_max
+        self.failures = 0
+        self.opened_at = None
+        self._state = CLOSED
+        self._probes = set()  # tokens of the probes in flight
+        self._last_probe = 0
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        """Return the state to pickle, without the lock."""
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        """Restore a pickled breaker, or reset one in a forked child, with a new lock."""
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        """Return 'closed', 'open' or 'half-open'."""
+        with self._lock:
+            return self._current_state(time.time())
+
+    def _current_state(self, now):
+        if self._state == OPEN and now - self.opened_at >= self.recovery_timeout:
+            self._state = HALF_OPEN
+            self._probes = set()
+        return self._state
+
+    def before_request(self):
+        """Reserve permission to send a request.
+
+        Returns:
+            int or None: a token unique to the probe when a half-open probe
+                slot was taken, to pass to `release` if the request is not
+                sent; else None.
+
+        Raises:
+            CircuitOpenError: if the breaker is open, or half-open with every
+                probe slot taken.
+        """
+        with self._lock:
+            state = self._current_state(time.time())
+            if state == CLOSED:
+                return None
+            if state == HALF_OPEN and len(self._probes) < self.half_open_max:
+                self._last_probe += 1
+                self._probes.add(self._last_probe)
+                return self._last_probe
+        raise CircuitOpenError('Circuit breaker for {!r} is {}'.format(self.name, state))
+
+    def release(self, probe):
+        """Give back the probe slot of `before_request` for a request that was never sent.
+
+        Args:
+            probe (int or None): The token returned by `before_request`. None,
+                a token already released, or one of an earlier half-open
+                period, is ignored.
+        """
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._probes.discard(probe)
+
+    def record_success(self):
+        """Record a successful request, closing the breaker."""
+        with self._lock:
+            self.failures = 0
+            self._state = CLOSED
+            self.opened_at = None
+
+    def record_failure(self):
+        """Record a failed request, opening the breaker past the threshold or after a failed probe."""
+        with self._lock:
+            self.failures += 1
+            if self._state == HALF_OPEN or self.failures >= self.failure_threshold:
+                self._state = OPEN
+                self.opened_at = time.time()
+
+    def __repr__(self):
+        """Return `<CircuitBreaker name state>`."""
+        return '<CircuitBreaker {} {}>'.format(self.name, self.state)
+
+
+class CircuitBreakers(object):
+    """CircuitBreakers class. One CircuitBreaker per endpoint group, created on demand."""
+
+    def __init__(self, failure_threshold=5, recovery_timeout=30.0, half_open_max=1, overrides=None):
+        """Initialize the registry.
+
+        Args:
+            failure_threshold (int, optional): Default for every group.
+            recovery_timeout (float, optional): Default for every group.
+            half_open_max (int, optional): Default for every group.
+            overrides (dict, optional): Group to a dict of CircuitBreaker keyword
+                arguments, e.g. ``{'csr/rdm': {'failure_threshold': 20}}``.
+        """
+        self.defaults = {
+            'failure_threshold': failure_threshold,
+            'recovery_timeout': recovery_timeout,
+            'half_open_max': half_open_max,
+        }
+        self.overrides = overrides or {}
+        self._breakers = {}
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        """Return the state to pickle, without the lock."""
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        """Restore pickled breakers, or reset them in a forked child, with new locks."""
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+        for breaker in self._breakers.values():
+            breaker.__setstate__(breaker.__getstate__())
+
+    def get(self, group):
+        """Return the breaker of `group`."""
+        breaker = self._breakers.get(group)
+        if breaker is None:
+            with self._lock:
+                breaker = self._breakers.get(group)
+                if breaker is None:
+                    kwargs = dict(self.defaults, **self.overrides.get(group, {}))
+                    breaker = self._breakers[group] = CircuitBreaker(group, **kwargs)
+        return breaker
+
+    def states(self):
+        """Return a dict of group to breaker state."""
+        return dict((group, breaker.state) for group, breaker in list(self._breakers.items()))
+
+    @staticmethod
+    def is_failure(resp):
+        """Return whether a response counts as a failure: a 5xx status."""
+        return resp.status_code >= 500
@@ -0,0 +1,264 @@
+"""Response cache module."""
+
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+class TTLCache(object):
+    """TTLCache class.
+
+    A thread-safe, size-bounded LRU cache whose entries expire `ttl` seconds
+    after they are stored. With `max_stale`, expired entries are kept that
+    much longer for `get_stale`. Values are stored as JSON, like in
+    `SQLiteCache`, so every hit returns a new copy that callers may modify.
+    """
+
+    def __init__(self, ttl, maxsize=1024, max_stale=0):
+        """Initialize an empty cache.
+
+        Args:
+            ttl (float): Seconds an entry stays fresh.
+            maxsize (int, optional): Maximum number of entries kept.
+            max_stale (float, optional): Seconds past expiry an entry may still
+                be served by `get_stale`.
+        """
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.max_stale = max_stale
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        """Return the number of entries, including expired ones."""
+        return len(self._data)
+
+    def __getstate__(self):
+        """Return the state to pickle, without the lock."""
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        """Restore a pickled cache, or reset one in a forked child, with a new lock."""
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """Return the fresh value stored for `key`, or `default`."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            now = time.time()
+            if entry[0] <= now:
+                if entry[0] + self.max_stale <= now:
+                    del self._data[key]
+                return default
+            self._data[key] = self._data.pop(key)
+        return json.loads(entry[1])
+
+    def get_stale(self, key):
+        """Return `(value, fresh)` for `key`, including entries expired less than `max_stale` ago, or None."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            now = time.time()
+            if entry[0] + self.max_stale <= now:
+                del self._data[key]
+                return None
+            self._data[key] = self._data.pop(key)
+        return json.loads(entry[1]), entry[0] > now
+
+    def set(self, key, value):
+        """Store `value`, which must be JSON serializable, for `key`, evicting the least recently used entries."""
+        value = json.dumps(value)
+        with self._lock:
+            self._data.pop(key, None)
+            self._data[key] = (time.time() + self.ttl, value)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, predicate):
+        """Remove every entry whose key satisfies `predicate`."""
+        with self._lock:
+            for key in [k for k in self._data if predicate(k)]:
+                del self._data[key]
+
+    def invalidate_prefix(self, api_key, url):
+        """Remove the entries of `api_key` for `url` and the urls below it."""
+        below = url + '/'
+        self.invalidate(lambda key: key[0] == api_key and (key[1] == url or key[1].startswith(below)))
+
+    def clear(self):
+        """Remove every entry."""
+        with self._lock:
+            self._data.clear()
+
+
+class SQLiteCache(object):
+    """SQLiteCache class.
+
+    A persistent response cache with the interface of `TTLCache` that clients
+    use (`get`, `get_stale`, `set`, `invalidate_prefix` and `clear`), stored
+    in a SQLite database so that short-lived and forked processes share warm
+    entries. Safe for concurrent use by many threads and processes. Values
+    must be JSON serializable; API keys are stored hashed, so there is no
+    `invalidate(predicate)` over keys.
+
+    Example:
+        >>> transport = Transport(cache=SQLiteCache('~/.cache/hologram.sqlite', ttl=3600))
+    """
+
+    def __init__(self, path, ttl, maxsize=10000, timeout=5.0, max_stale=0):
+        """Open or create the cache database.
+
+        Args:
+            path (str): Database file path.
+            ttl (float): Seconds an entry stays fresh.
+            maxsize (int, optional): Maximum number of entries kept. The entries
+                closest to expiry are evicted first.
+            timeout (float, optional): Seconds to wait for another process'
+                write lock.
+            max_stale (float, optional): Seconds past expiry an entry may still
+                be served by `get_stale`.
+        """
+        self.path = os.path.expanduser(path)
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.max_stale = max_stale
+        self.timeout = timeout
+        self._local = threading.local()
+        with self._connect() as db:
+            db.execute('CREATE TABLE IF NOT EXISTS cache ('
+                       'owner TEXT NOT NULL, url TEXT NOT NULL, expires REAL NOT NULL, value TEXT NOT NULL, '
+                       'PRIMARY KEY (owner, url))')
+            db.execute('CREATE INDEX IF NOT EXISTS cache_expires ON cache (expires)')
+
+    def __getstate__(self):
+        """Return the state to pickle, without the connections."""
+        state = self.__dict__.copy()
+        del state['_local']
+        return state
+
+    def __setstate__(self, state):
+        """Restore a pickled cache; connections are reopened on use."""
+        self.__dict__.update(state)
+        self._local = threading.local()
+
+    def _connect(self):
+        """Return this thread's connection, reopening it after a fork."""
+        local = self._local
+        if getattr(local, 'pid', None) != os.getpid():
+            local.db = sqlite3.connect(self.path, timeout=self.timeout)
+            local.db.execute('PRAGMA journal_mode=WAL')
+            local.pid = os.getpid()
+        return local.db
+
+    @staticmethod
+    def _owner(api_key):
+        return hashlib.sha256((api_key or '').encode('utf-8')).hexdigest()
+
+    def __len__(self):
+        """Return the number of entries, including expired ones."""
+        return self._connect().execute('SELECT COUNT(*) FROM cache').fetchone()[0]
+
+    def get(self, key, default=None):
+        """Return the fresh value stored for `key`, an `(api_key, url)` pair, or `default`."""
+        row = self._connect().execute(
+            'SELECT value FROM cache WHERE owner = ? AND url = ? AND expires > ?',
+            (self._owner(key[0]), key[1], time.time())).fetchone()
+        return default if row is None else json.loads(row[0])
+
+    def get_stale(self, key):
+        """Return `(value, fresh)` for `key`, including entries expired less than `max_stale` ago, or None."""
+        now = time.time()
+        row = self._connect().execute(
+            'SELECT value, expires FROM cache WHERE owner = ? AND url = ? AND expires > ?',
+            (self._owner(key[0]), key[1], now - self.max_stale)).fetchone()
+        return None if row is None else (json.loads(row[0]), row[1] > now)
+
+    def set(self, key, value):
+        """Store `value` for `key`, evicting expired and excess entries."""
+        now = time.time()
+        with self._connect() as db:
+            db.execute('INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?)',
+                       (self._owner(key[0]), key[1], now + self.ttl, json.dumps(value)))
+            db.execute('DELETE FROM cache WHERE expires <= ?', (now - self.max_stale,))
+            db.execute('DELETE FROM cache WHERE rowid IN (SELECT rowid FROM cache ORDER BY expires '
+                       'LIMIT max(0, (SELECT COUNT(*) FROM cache) - ?))', (self.maxsize,))
+
+    def invalidate_prefix(self, api_key, url):
+        """Remove the entries of `api_key` for `url` and the urls below it."""
+        below = url + '/'
+        with self._connect() as db:
+            db.execute('DELETE FROM cache WHERE owner = ? AND (url = ? OR substr(url, 1, ?) = ?)',
+                       (self._owner(api_key), url, len(below), below))
+
+    def clear(self):
+        """Remove every entry."""
+        with self._connect() as db:
+            db.execute('DELETE FROM cache')
+
+
+class Revalidator(object):
+    """Revalidator class.
+
+    Runs background cache refreshes on a small thread pool, at most one at a
+    time per cache key. A failed refresh is recorded in `last_error` and
+    otherwise ignored, so the stale entry keeps being served.
+    """
+
+    def __init__(self, max_workers=2):
+        """Initialize the revalidator; threads are started on first use."""
+        self.max_workers = max_workers
+        self.last_error = None
+        self._pending = set()
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        """Return the state to pickle: the settings only."""
+        return {'max_workers': self.max_workers}
+
+    def __setstate__(self, state):
+        """Restore a pickled revalidator, or reset one in a forked child, without running refreshes."""
+        self.__init__(**state)
+
+    def submit(self, key, refresh):
+        """Call `refresh()` in the background unless a refresh of `key` is running.
+
+        Returns:
+            bool: whether a refresh was started.
+        """
+        with self._lock:
+            if key in self._pending:
+                return False
+            self._pending.add(key)
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers)
+            executor = self._executor
+        executor.submit(self._run, key, refresh)
+        return True
+
+    def _run(self, key, refresh):
+        try:
+            refresh()
+        except Exception as e:  # keep serving the stale entry
+            self.last_error = e
+        finally:
+            with self._lock:
+                self._pending.discard(key)
+
+    def shutdown(self, wait=True):
+        """Stop the refresh threads, waiting for running refreshes by default."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
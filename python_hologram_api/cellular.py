@@ -1,10 +1,7 @@
 """Cellular Links module."""
 
-try:
-    from urllib.parse import urljoin  # python 3
-except ImportError:
-    from urlparse import urljoin  # python 2
-import requests
+from . import endpoints
+from .getmany import get_many
 
 
 class CellularLinks(object):
@@ -15,8 +12,9 @@ class CellularLinks(object):
     """
 
     def __init__(self, client):
-        """Save a reference to the client."""
+        """Save a reference to the client; `planner` is the cost model of `get_many`, shared per API key."""
         self.client = client
+        self.planner = client.transport.planner(client.api_key, 'links')
 
     def activate_sims(self, sims, plan, tier):
         """Activate SIMs.
@@ -30,15 +28,7 @@ class CellularLinks(object):
         Returns:
             dict: the json response as a dictionary.
         """
-        url = urljoin(self.client.base_url, 'links/cellular/bulkclaim')
-        params = {
-            'apikey': self.client.api_key,
-            'sims': sims,
-            'plan': plan,
-            'tier': tier
-        }
-        resp = requests.post(url, json=params)
-        return resp.json()
+        return self.client.call(endpoints.ACTIVATE_SIMS, sims=sims, plan=plan, tier=tier)
 
     def list_links(self, org_id=None):
         """List Cellular Links.
@@ -49,13 +39,7 @@ class CellularLinks(object):
         Returns:
             dict: the json response as a dictionary.
         """
-        url = urljoin(self.client.base_url, 'links/cellular')
-        params = {
-            'apikey': self.client.api_key,
-            'orgid': org_id
-        }
-        resp = requests.get(url, json=params)
-        return resp.json()
+        return self.client.call(endpoints.LIST_LINKS, org_id=org_id)
 
     def get_link(self, link_id):
         """Get Cellular Link.
@@ -66,12 +50,26 @@ class CellularLinks(object):
         Returns:
             dict: the json response as a dictionary.
         """
-        url = urljoin(self.client.base_url, 'links/cellular/{}'.format(link_id))
-        params = {
-            'apikey': self.client.api_key
-        }
-        resp = requests.get(url, json=params)
-        return resp.json()
+        return self.client.call(endpoints.GET_LINK, link_id)
+
+    def get_many(self, link_ids, org_id=None, strategy=None, fleet_size=None, max_workers=None):
+        """Get Cellular Links by ID, with concurrent Get calls or one filtered List call.
+
+        The strategy expected to be faster is chosen from the number of IDs,
+        the fleet size and the latencies seen so far; see `getmany`.
+
+        Args:
+            link_ids (Iterable[int]): IDs of the links to get.
+            org_id (int, optional): Organization of the links, scoping the List call.
+            strategy (str, optional): `'get'` or `'list'` to force a strategy.
+            fleet_size (int, optional): Number of links the List call would return.
+            max_workers (int, optional): Concurrent Get calls.
+
+        Returns:
+            GetManyResult: `records` in request order, `missing` IDs and the `strategy` used.
+        """
+        return get_many(self.client, self.planner, endpoints.GET_LINK, endpoints.LIST_LINKS, link_ids, org_id=org_id,
+                        strategy=strategy, fleet_size=fleet_size, max_workers=max_workers)
 
     def change_plan(self, link_id, plan, tier):
         """Change Plan.
@@ -85,14 +83,7 @@ class CellularLinks(object):
         Returns:
             dict: the json response as a dictionary.
         """
-        url = urljoin(self.client.base_url, 'links/cellular/{}/changeplan'.format(link_id))
-        params = {
-            'apikey': self.client.api_key,
-            'plan': plan,
-            'tier': tier
-        }
-        resp = requests.post(url, json=params)
-        return resp.json()
+        return self.client.call(endpoints.CHANGE_PLAN, link_id, plan=plan, tier=tier)
 
     def change_overage_limit(self, link_id, limit):
         """Change Overage Limit.
@@ -104,13 +95,7 @@ class CellularLinks(object):
         Returns:
             dict: the json response as a dictionary.
         """
-        url = urljoin(self.client.base_url, 'links/cellular/{}/overagelimit'.format(link_id))
-        params = {
-            'apikey': self.client.api_key,
-            'limit': limit
-        }
-        resp = requests.post(url, json=params)
-        return resp.json()
+        return self.client.call(endpoints.CHANGE_OVERAGE_LIMIT, link_id, limit=limit)
 
     def pause_link(self, link_id):
         """Pause Data.
@@ -121,13 +106,7 @@ class CellularLinks(object):
         Returns:
             dict: the json response as a dictionary.
         """
-        url = urljoin(self.client.base_url, 'links/cellular/{}/state'.format(link_id))
-        params = {
-            'apikey': self.client.api_key,
-            'state': 'pause'
-        }
-        resp = requests.post(url, json=params)
-        return resp.json()
+        return self.client.call(endpoints.PAUSE_LINK, link_id)
 
     def unpause_link(self, link_id):
         """Unpause Data.
@@ -138,10 +117,4 @@ class CellularLinks(object):
         Returns:
             dict: the json response as a dictionary.
         """
-        url = urljoin(self.client.base_url, 'links/cellular/{}/state'.format(link_id))
-        params = {
-            'apikey': self.client.api_key,
-            'state': 'live'
-        }
-        resp = requests.post(url, json=params)
-        return resp.json()
+        return self.client.call(endpoints.UNPAUSE_LINK, link_id)
@@ -0,0 +1,222 @@
+"""Command line interface module.
+
+Streams CSV or NDJSON rows into bulk API calls::
+
+    $ export HOLOGRAM_API_KEY=...
+    $ hologram change_plan links.csv --workers 16 --output results.ndjson
+
+Each row is mapped to one client call; see `OPERATIONS` for the columns each
+operation reads. Results are written as NDJSON lines in completion order.
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+
+from .client import HologramClient
+from .concurrency import AdaptiveLimiter, run_concurrently
+from .constants import HOLOGRAM_API_BASEURL
+from .deadline import deadline
+from .transport import Transport
+
+
+def _int(value):
+    return value if isinstance(value, int) else int(value)
+
+
+def _optional(row, key):
+    return row.get(key) or None
+
+
+OPERATIONS = {
+    'activate_sims': (
+        ('sim', 'plan', 'tier'),
+        lambda c, r: c.cell.activate_sims([str(r['sim'])], _int(r['plan']), _int(r['tier']))),
+    'change_plan': (
+        ('link_id', 'plan', 'tier'),
+        lambda c, r: c.cell.change_plan(_int(r['link_id']), _int(r['plan']), _int(r['tier']))),
+    'change_overage_limit': (
+        ('link_id', 'limit'),
+        lambda c, r: c.cell.change_overage_limit(_int(r['link_id']), _int(r['limit']))),
+    'pause_link': (
+        ('link_id',),
+        lambda c, r: c.cell.pause_link(_int(r['link_id']))),
+    'unpause_link': (
+        ('link_id',),
+        lambda c, r: c.cell.unpause_link(_int(r['link_id']))),
+    'link_devices': (
+        ('tag_id', 'device_id'),
+        lambda c, r: c.tags.link_devices(_int(r['tag_id']), [_int(r['device_id'])])),
+    'unlink_devices': (
+        ('tag_id', 'device_id'),
+        lambda c, r: c.tags.unlink_devices(_int(r['tag_id']), [_int(r['device_id'])])),
+    'send_sms': (
+        ('device_id', 'body'),
+        lambda c, r: c.sms.send_message(_int(r['device_id']), r['body'], _optional(r, 'from_number'))),
+    'send_csr_message': (
+        ('device_id', 'data'),
+        lambda c, r: c.csr.send_message(_int(r['device_id']), r['data'])),
+}
+"""Operation name to (required columns, function of client and row)."""
+
+
+class MalformedRow(ValueError):
+    """MalformedRow class. Stands for an input line that is not a JSON object; `text` is the line."""
+
+    def __init__(self, message, text):
+        """Initialize with the parse error `message` and the raw `text`."""
+        super(MalformedRow, self).__init__(message)
+        self.text = text
+
+
+def read_rows(stream, fmt):
+    """Yield `(line_number, row dict)` from a CSV or NDJSON stream, lazily.
+
+    NDJSON lines that are not JSON objects are yielded as a MalformedRow, so
+    that they are reported as failed rows instead of stopping the job.
+    """
+    if fmt == 'csv':
+        for number, row in enumerate(csv.DictReader(stream), 2):
+            yield number, row
+    else:
+        for number, line in enumerate(stream, 1):
+            if line.strip():
+                try:
+                    row = json.loads(line)
+                except ValueError as e:
+                    row = MalformedRow('malformed NDJSON: {}'.format(e), line.rstrip('\r\n'))
+                if not isinstance(row, (dict, MalformedRow)):
+                    row = MalformedRow('malformed NDJSON: not an object', line.rstrip('\r\n'))
+                yield number, row
+
+
+class Progress(object):
+    """Progress class. Writes a live throughput counter to a stream."""
+
+    def __init__(self, stream, interval=0.5):
+        """Start counting."""
+        self.stream = stream
+        self.interval = interval
+        self.start = self._last = time.time()
+        self.ok = self.failed = 0
+
+    def update(self, ok):
+        """Count one finished row and redraw the counter at most every `interval`."""
+        if ok:
+            self.ok += 1
+        else:
+            self.failed += 1
+        now = time.time()
+        if now - self._last >= self.interval:
+            self._last = now
+            self.draw(now)
+
+    def draw(self, now=None, end=''):
+        """Write the counter."""
+        elapsed = max((now or time.time()) - self.start, 1e-9)
+        done = self.ok + self.failed
+        self.stream.write('\r{} done, {} failed, {:.1f} rows/s{}'.format(done, self.failed, done / elapsed, end))
+        self.stream.flush()
+
+
+def parse_args(argv=None):
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(prog='hologram', description='Run bulk Hologram API operations.')
+    parser.add_argument('operation', choices=sorted(OPERATIONS))
+    parser.add_argument('input', help="CSV or NDJSON file, '-' for stdin")
+    parser.add_argument('-f', '--format', choices=('csv', 'ndjson'),
+                        help='input format. Guessed from the file extension, default csv')
+    parser.add_argument('-o', '--output', default='-', help="NDJSON results file, '-' for stdout (default)")
+    parser.add_argument('-w', '--workers', type=int, default=8, help='concurrent requests (default 8)')
+    parser.add_argument('--adaptive', action='store_true',
+                        help='adapt concurrency to errors and latency, up to --workers')
+    parser.add_argument('--rate', type=float, help='maximum requests per second')
+    parser.add_argument('--deadline', type=float,
+                        help='total seconds for the job; rows not started by then are not run')
+    parser.add_argument('--api-key', default=os.environ.get('HOLOGRAM_API_KEY'),
+                        help='defaults to $HOLOGRAM_API_KEY')
+    parser.add_argument('--base-url', default=HOLOGRAM_API_BASEURL)
+    parser.add_argument('-q', '--quiet', action='store_true', help='do not show progress')
+    args = parser.parse_args(argv)
+    if not args.api_key:
+        parser.error('an API key is required: pass --api-key or set HOLOGRAM_API_KEY')
+    if args.format is None:
+        args.format = 'ndjson' if args.input.endswith(('.ndjson', '.jsonl', '.json')) else 'csv'
+    return args
+
+
+def run(client, operation, rows, output, workers=8, progress=None):
+    """Apply `operation` to every `(line_number, row)` and write one result line each.
+
+    Rows not started before the deadline get an error line too.
+
+    Returns:
+        int: the number of failed rows, including those not started.
+    """
+    columns, func = OPERATIONS[operation]
+
+    def apply(numbered):
+        number, row = numbered
+        if isinstance(row, MalformedRow):
+            raise row
+        missing = [c for c in columns if row.get(c) in (None, '')]
+        if missing:
+            raise ValueError('missing columns: {}'.format(', '.join(missing)))
+        return func(client, row)
+
+    def write(number, row, **fields):
+        line = {'line': number, 'input': row.text if isinstance(row, MalformedRow) else row}
+        line.update(fields)
+        output.write(json.dumps(line) + '\n')
+        if progress is not None:
+            progress.update('error' not in line)
+        return 'error' in line
+
+    failed = 0
+    rows = iter(rows)
+    for result in run_concurrently(apply, rows, max_workers=workers):
+        number, row = result.item
+        if result.error is not None:
+            failed += write(number, row, error='{}: {}'.format(type(result.error).__name__, result.error))
+        elif isinstance(result.result, dict) and not result.result.get('success'):
+            failed += write(number, row, error=result.result.get('error', 'unsuccessful response'),
+                            response=result.result)
+        else:
+            failed += write(number, row, response=result.result)
+    for number, row in rows:  # left over once the deadline passed
+        failed += write(number, row, error='DeadlineExceeded: not started')
+    return failed
+
+
+def main(argv=None):
+    """Console script entry point."""
+    args = parse_args(argv)
+    limiter = AdaptiveLimiter(initial=min(4, args.workers), maximum=args.workers) if args.adaptive else None
+    client = HologramClient(args.api_key, base_url=args.base_url,
+                            transport=Transport(pool_maxsize=args.workers, rate=args.rate, limiter=limiter))
+    source = sys.stdin if args.input == '-' else open(args.input)
+    output = sys.stdout if args.output == '-' else open(args.output, 'w')
+    progress = None if args.quiet else Progress(sys.stderr)
+    try:
+        if args.deadline is None:
+            failed = run(client, args.operation, read_rows(source, args.format), output,
+                         workers=args.workers, progress=progress)
+        else:
+            with deadline(args.deadline):
+                failed = run(client, args.operation, read_rows(source, args.format), output,
+                             workers=args.workers, progress=progress)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if output is not sys.stdout:
+            output.close()
+    if progress is not None:
+        progress.draw(end='\n')
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
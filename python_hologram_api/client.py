@@ -1,41 +1,95 @@
 # -*- coding: utf-8 -*-
 
 """Main module."""
-from .constants import HOLOGRAM_API_BASEURL
+try:
+    from urllib.parse import urljoin  # python 3
+except ImportError:
+    from urlparse import urljoin  # python 2
+
+from .constants import DEFAULT_TIMEOUT, HOLOGRAM_API_BASEURL
 
 from .cellular import CellularLinks
 from .cloud_messaging import CSRMessaging, SMSMessaging, CloudToDeviceMessaging
 from .data_plans import DataPlans
 from .devices import Devices
 from .device_tags import DeviceTags
+from .fanout import across_orgs
 from .organization import Organization
 from .spacebridge import Spacebridge
+from .transport import Transport
 from .user import User
 
 
+class _Resource(object):
+    """Descriptor creating a resource object on first access.
+
+    Clients are cheap to construct; only the resources actually used are
+    instantiated, and then cached on the client instance.
+    """
+
+    def __init__(self, name, cls):
+        self.name = name
+        self.cls = cls
+
+    def __get__(self, client, owner):
+        if client is None:
+            return self
+        resource = client.__dict__[self.name] = self.cls(client)
+        return resource
+
+
 class HologramClient(object):
-    """Hologram API Client class."""
+    """Hologram API Client class.
 
-    def __init__(self, api_key, base_url=HOLOGRAM_API_BASEURL):
+    Clients can be shared between threads, survive forks (see `Transport`)
+    and can be pickled, e.g. to send them to `multiprocessing` workers. The
+    tracer is not pickled.
+    """
+
+    cell = _Resource('cell', CellularLinks)
+    cloud = _Resource('cloud', CloudToDeviceMessaging)
+    csr = _Resource('csr', CSRMessaging)
+    data_plans = _Resource('data_plans', DataPlans)
+    devices = _Resource('devices', Devices)
+    org = _Resource('org', Organization)
+    sms = _Resource('sms', SMSMessaging)
+    spacebridge = _Resource('spacebridge', Spacebridge)
+    tags = _Resource('tags', DeviceTags)
+    user = _Resource('user', User)
+
+    def __init__(self, api_key, base_url=HOLOGRAM_API_BASEURL, transport=None, tracer=None,
+                 timeout=DEFAULT_TIMEOUT):
         """Initialize client.
 
         Args:
             api_key (str): Hologram API Key. See https://dashboard.hologram.io/account/api.
             base_url (str, optional): Hologram API base url.
+            transport (Transport, optional): HTTP transport, possibly shared with
+                other clients. A private one is created by default.
+            tracer (object, optional): Records a span per call, see
+                `python_hologram_api.tracing`. Tracing is disabled by default.
+            timeout (float or Tuple[float, float], optional): `(connect, read)`
+                timeout of every request, in seconds. Override it for a block of
+                calls with `python_hologram_api.deadline.timeout`.
         """
         self._api_key = api_key
         self._base_url = base_url
+        self.transport = transport if transport is not None else Transport()
+        self._prefix = urljoin(base_url, '.') if not base_url.endswith('/') else base_url
+        self._routes = {}
+        self.tracer = tracer
+        self.timeout = timeout
+
+    def __getstate__(self):
+        """Return the state to pickle: settings and transport, without tracer or resources."""
+        names = ('_api_key', '_base_url', 'transport', '_prefix', 'timeout')
+        return dict((name, self.__dict__[name]) for name in names)
 
-        self.cell = CellularLinks(self)
-        self.cloud = CloudToDeviceMessaging(self)
-        self.csr = CSRMessaging(self)
-        self.data_plans = DataPlans(self)
-        self.devices = Devices(self)
-        self.org = Organization(self)
-        self.sms = SMSMessaging(self)
-        self.spacebridge = Spacebridge(self)
-        self.tags = DeviceTags(self)
-        self.user = User(self)
+    def __setstate__(self, state):
+        """Restore a pickled client."""
+        self.__dict__.update(state)
+        self._routes = {}
+        self.tracer = None
 
     @property
     def api_key(self):
@@ -46,3 +100,164 @@ class HologramClient(object):
     def base_url(self):
         """Return base_url."""
         return self._base_url
+
+    def _route(self, endpoint):
+        """Return the precomputed url (None for templated paths) and base body of `endpoint`."""
+        route = self._routes.get(endpoint)
+        if route is None:
+            body = {'apikey': self._api_key} if endpoint.auth else {}
+            body.update((field, None) for field in endpoint.fields.values())
+            body.update(endpoint.fixed)
+            url = self._prefix + endpoint.path if endpoint.static else None
+            route = self._routes[endpoint] = (url, body)
+        return route
+
+    def request(self, endpoint, *path_args, **params):
+        """Send the HTTP request of an endpoint.
+
+        Args:
+            endpoint (Endpoint): the endpoint, see `python_hologram_api.endpoints`.
+            *path_args: Values formatted into the endpoint path template.
+            **params: Endpoint arguments, by Python argument name.
+
+        Returns:
+            requests.Response: the response.
+        """
+        url, body = self._route(endpoint)
+        if url is None:
+            url = self._prefix + endpoint.path.format(*path_args)
+        body = body.copy()
+        fields = endpoint.fields
+        for name, value in params.items():
+            body[fields[name]] = value
+        tracer = self.tracer
+        if tracer is None:
+            return self.transport.request(endpoint.method, url, endpoint=endpoint, json=body, timeout=self.timeout)
+        attributes = {'hologram.endpoint': endpoint.path, 'http.method': endpoint.method}
+        with tracer.span('hologram ' + endpoint.name, attributes) as span:
+            resp = self.transport.request(
+                endpoint.method, url, tracer=tracer, endpoint=endpoint, json=body, timeout=self.timeout)
+            span.set_attribute('http.status_code', resp.status_code)
+            return resp
+
+    def call(self, endpoint, *path_args, **params):
+        """Call an endpoint and return its json response as a dictionary.
+
+        Responses of cached endpoints are served from the transport cache when
+        it is enabled; mutations invalidate the cached paths they affect. When
+        the cache has a `max_stale`, an expired response is returned at once
+        and refreshed in the background. Arguments are the same as for
+        `request`.
+        """
+        cache = self.transport.cache
+        if cache is None or not (endpoint.cached or endpoint.invalidates):
+            return self.request(endpoint, *path_args, **params).json()
+        if endpoint.cached:
+            key = (self._api_key, self._prefix + endpoint.path.format(*path_args))
+            if getattr(cache, 'max_stale', 0):
+                entry = cache.get_stale(key)
+                if entry is not None:
+                    if not entry[1]:
+                        self.transport.revalidator.submit(
+                            key, lambda: self._fetch_cached(cache, key, endpoint, path_args, params))
+                    return entry[0]
+            else:
+                resp = cache.get(key)
+                if resp is not None:
+                    return resp
+            return self._fetch_cached(cache, key, endpoint, path_args, params)
+        resp = self.request(endpoint, *path_args, **params).json()
+        for path in endpoint.invalidates:
+            cache.invalidate_prefix(self._api_key, self._prefix + path.format(*path_args))
+        return resp
+
+    def _fetch_cached(self, cache, key, endpoint, path_args, params):
+        resp = self.request(endpoint, *path_args, **params).json()
+        if resp.get('success'):
+            cache.set(key, resp)
+        return resp
+
+    def warm_up(self, connections=4, keepalive=None):
+        """Resolve the API host and open pooled TLS connections ahead of traffic.
+
+        Example:
+            >>> client = HologramClient(api_key, transport=Transport(pool_maxsize=8, dns_ttl=300))
+            >>> client.warm_up(connections=8, keepalive=30)
+
+        Args:
+            connections (int, optional): Connections to open, at most the
+                transport's `pool_maxsize`.
+            keepalive (float, optional): Seconds between keepalive pings of
+                idle connections, keeping the pool hot between bursts. Not
+                pinged by default.
+
+        Returns:
+            int: the number of connections opened.
+        """
+        return self.transport.warm_up(self._prefix, connections, keepalive)
+
+    def breaker_states(self):
+        """Return the circuit breaker state of every endpoint group used so far.
+
+        Returns:
+            dict: group (e.g. 'links/cellular') to 'closed', 'open' or
+                'half-open'. Empty unless the transport has `breakers`.
+        """
+        breakers = self.transport.breakers
+        return breakers.states() if breakers is not None else {}
+
+    def across_orgs(self, query, org_ids=None, where=None, max_workers=None):
+        """Run a query for many organizations concurrently.
+
+        Example:
+            >>> for result in client.across_orgs(client.devices.list):
+            ...     print(result.org_id, result.error or len(result.response['data']))
+
+        Args:
+            query (Callable): Called with an organization ID.
+            org_ids (Iterable[int], optional): Organizations to query. Defaults
+                to every organization the user is a member of.
+            where (Callable, optional): Called with each organization dict when
+                `org_ids` is not given; only matching organizations are queried.
+            max_workers (int, optional): Number of organizations queried at once.
+                Defaults to `bulk_workers(self)`.
+
+        Returns:
+            Iterator[OrgResult]: one result per organization, in completion order.
+        """
+        return across_orgs(self, query, org_ids=org_ids, where=where, max_workers=max_workers)
+
+
+class HologramClientPool(object):
+    """Hologram API Client Pool class.
+
+    Serves many API keys from one `Transport`: every client returned by the
+    pool shares its connection pool, rate budget and cache, while requests
+    and cache entries stay scoped to their own API key.
+
+    Example:
+        >>> pool = HologramClientPool(rate=20, cache_ttl=300)
+        >>> pool.client(tenant_api_key).devices.list()
+    """
+
+    def __init__(self, base_url=HOLOGRAM_API_BASEURL, transport=None, **transport_kwargs):
+        """Initialize the pool.
+
+        Args:
+            base_url (str, optional): Hologram API base url.
+            transport (Transport, optional): Transport to share. Created from
+                `transport_kwargs` by default.
+            **transport_kwargs: Passed to `Transport`.
+        """
+        self.base_url = base_url
+        self.transport = transport if transport is not None else Transport(**transport_kwargs)
+
+    def client(self, api_key):
+        """Return a client for `api_key` backed by the shared transport."""
+        return HologramClient(api_key, base_url=self.base_url, transport=self.transport)
+
+    __getitem__ = client
+
+    def close(self):
+        """Close the shared transport."""
+        self.transport.close()
@@ -1,10 +1,8 @@
 """Cloud Messaging module."""
 
-try:
-    from urllib.parse import urljoin  # python 3
-except ImportError:
-    from urlparse import urljoin  # python 2
-import requests
+from . import endpoints
+from .concurrency import run_concurrently
+from .payload import encode, is_binary
 
 
 class CSRMessaging(object):
@@ -25,15 +23,7 @@ class CSRMessaging(object):
         Returns:
             dict: the json response as a dictionary.
         """
-        url = urljoin(self.client.base_url, 'csr/rdm')
-        params = {
-            'apikey': self.client.api_key,
-            'deviceid': device_id,
-            'data': data,
-            'tags': tags
-        }
-        resp = requests.post(url, json=params)
-        return resp.json()
+        return self.client.call(endpoints.SEND_CSR_MESSAGE, device_id=device_id, data=data, tags=tags)
 
     def list_messages(
             self,
@@ -56,18 +46,14 @@ class CSRMessaging(object):
         Returns:
             dict: the json response as a dictionary.
         """
-        url = urljoin(self.client.base_url, 'csr/rdm')
-        params = {
-            'apikey': self.client.api_key,
-            'deviceid': device_id,
-            'limit': limit,
-            'orgid': org_id,
-            'topicname': topic_name,
-            'timestampstart': time_stamp_start,
-            'timestampend': time_stamp_end
-        }
-        resp = requests.get(url, json=params)
-        return resp.json()
+        return self.client.call(
+            endpoints.LIST_CSR_MESSAGES,
+            device_id=device_id,
+            limit=limit,
+            org_id=org_id,
+            topic_name=topic_name,
+            time_stamp_start=time_stamp_start,
+            time_stamp_end=time_stamp_end)
 
 
 class SMSMessaging(object):
@@ -90,57 +76,71 @@ class SMSMessaging(object):
         Returns:
             dict: the json response as a dictionary.
         """
-        url = urljoin(self.client.base_url, 'sms/incoming')
-        params = {
-            'apikey': self.client.api_key,
-            'deviceid': device_id,
-            'body': body,
-            'fromnumber': from_number
-        }
-        resp = requests.post(url, json=params)
-        return resp.json()
+        return self.client.call(endpoints.SEND_SMS, device_id=device_id, body=body, from_number=from_number)
 
 
 class CloudToDeviceMessaging(object):
     """Cloud To Device Messaging.
 
     Send a TCP or UDP message to one or more devices on the Hologram network.
+
+    `data` may also be a binary payload: `bytes`, `bytearray`, `memoryview` or
+    a file-like object. It is base64 encoded on the fly and, when larger than
+    `payload.FRAGMENT_SIZE`, sent as several fragments with a reassembly
+    header (see `python_hologram_api.payload`), `pipeline` at a time.
     """
 
     def __init__(self, client):
         """Save a reference to the client."""
         self.client = client
 
-    def send_message(self, device_ids, protocol, port, data=None, base64_data=None):
+    def _send_fragments(self, send, data, pipeline):
+        """Send the messages of a binary payload concurrently; return their results in order."""
+        results = sorted(run_concurrently(send, enumerate(encode(data)), max_workers=pipeline),
+                         key=lambda result: result.item[0])
+        for result in results:
+            if result.error is not None:
+                raise result.error
+        return [result.result for result in results]
+
+    def send_message(self, device_ids, protocol, port, data=None, base64_data=None, pipeline=4):
         """Send a Message to a List of Devices.
 
         Must send either data or base64data.
 
         Args:
-            device_ids (List[int]): IDs of devices to send message.
+            device_ids (Iterable[int]): IDs of devices to send message, such as
+                a `tagindex.Selection`.
             protocol (str): The protocol to use: 'TCP' or 'UDP'.
             port (int): The port to use.
-            data (str): The data to send. Max length of 10k bytes.
+            data (str or binary): The data to send. Max length of 10k bytes for
+                text; binary payloads of any size are fragmented.
             base64_data (str): The data to send, encoded in base64. Max length of 10k bytes.
+            pipeline (int, optional): Fragments sent at once.
 
         Returns:
-            dict: the json response as a dictionary.
+            dict: the json response as a dictionary. For a fragmented payload,
+                `success` is whether every fragment was sent and `data` holds
+                the response of each fragment, in order.
         """
         if (data is None and base64_data is None) or (data is not None and base64_data is not None):
             raise ValueError('Please provide either `data` or `base64_data`')
-        url = urljoin(self.client.base_url, 'devices/messages')
-        params = {
-            'apikey': self.client.api_key,
-            'deviceids': device_ids,
-            'protocol': protocol,
-            'port': port,
-            'data': data,
-            'base64data': base64_data
-        }
-        resp = requests.post(url, json=params)
-        return resp.json()
-
-    def trigger_webhook(self, device_id, webhook_guid, data=None, base64_data=None):
+        device_ids = list(device_ids)
+        if is_binary(data):
+            responses = self._send_fragments(
+                lambda message: self.send_message(device_ids, protocol, port, base64_data=message[1]), data, pipeline)
+            if len(responses) == 1:
+                return responses[0]
+            return {'success': all(r.get('success') for r in responses), 'data': responses}
+        return self.client.call(
+            endpoints.SEND_CLOUD_MESSAGE,
+            device_ids=device_ids,
+            protocol=protocol,
+            port=port,
+            data=data,
+            base64_data=base64_data)
+
+    def trigger_webhook(self, device_id, webhook_guid, data=None, base64_data=None, pipeline=4):
         """Send Message to a Device via Webhook.
 
         This endpoint does not require authentication with your API key, as the
@@ -152,18 +152,20 @@ class CloudToDeviceMessaging(object):
         Args:
             device_id (int): ID of the device to send to.
             webhook_guid (str): generated UUID for the webhook URL.
-            data (str, optional): The data to send. Max length of 10k bytes.
+            data (str or binary, optional): The data to send. Max length of 10k
+                bytes for text; binary payloads of any size are fragmented.
             base64_data (str, optional): The data to send, encoded in base64. Max length of 10k bytes.
+            pipeline (int, optional): Fragments sent at once.
 
         Returns:
-            int: Integer Code of responded HTTP Status, e.g. 404 or 200.
+            int: Integer Code of responded HTTP Status, e.g. 404 or 200. The
+                highest code of all fragments for a fragmented payload.
         """
         if (data is None and base64_data is None) or (data is not None and base64_data is not None):
             raise ValueError('Please provide either `data` or `base64_data`')
-        url = urljoin(self.client.base_url, 'devices/messages/{}/{}'.format(device_id, webhook_guid))
-        params = {
-            'data': data,
-            'base64data': base64_data
-        }
-        resp = requests.post(url, json=params)
+        if is_binary(data):
+            return max(self._send_fragments(
+                lambda message: self.trigger_webhook(device_id, webhook_guid, base64_data=message[1]), data, pipeline))
+        resp = self.client.request(
+            endpoints.TRIGGER_WEBHOOK, device_id, webhook_guid, data=data, base64_data=base64_data)
         return resp.status_code
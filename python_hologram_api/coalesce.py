@@ -0,0 +1,218 @@
+"""Tag write coalescing module.
+
+Many workers linking one device at a time to a tag send one POST each.
+`TagWriteCoalescer` buffers link and unlink operations per tag for up to
+`window` seconds or `batch_size` devices, and applies each buffer with one
+multi-device call per direction::
+
+    coalescer = client.tags.coalesce(window=0.1)
+    future = coalescer.link_devices(tag_id, [device_id])  # returns at once
+    future.result()  # the response of the call that applied the change
+
+Operations on the same device and tag within one buffer cancel out: only the
+last one is sent, and the futures of the earlier ones resolve with its
+response.
+"""
+
+from concurrent.futures import Future, wait
+import threading
+import time
+
+from .concurrency import run_concurrently
+
+
+class _Waiter(object):
+    """Resolves a caller's future once each of its devices has been applied."""
+
+    def __init__(self, count):
+        self.future = Future()
+        self.remaining = count
+        self.responses = []
+        self.error = None
+        self._lock = threading.Lock()
+
+    def applied(self, resp, error):
+        with self._lock:
+            self.remaining -= 1
+            if error is not None:
+                self.error = error
+            elif not any(r is resp for r in self.responses):
+                self.responses.append(resp)
+            if self.remaining:
+                return
+        if self.error is not None:
+            self.future.set_exception(self.error)
+        elif len(self.responses) == 1:
+            self.future.set_result(self.responses[0])
+        else:
+            self.future.set_result({'success': all(r.get('success') for r in self.responses),
+                                    'data': self.responses})
+
+
+class TagWriteCoalescer(object):
+    """TagWriteCoalescer class. Thread-safe; buffers are applied from a daemon thread."""
+
+    def __init__(self, tags, window=0.05, batch_size=100, max_workers=4):
+        """Initialize an empty coalescer.
+
+        Args:
+            tags (DeviceTags): Resource applying the batched calls.
+            window (float, optional): Seconds an operation may wait for others
+                on the same tag.
+            batch_size (int, optional): Devices after which a tag's buffer is
+                applied without waiting, and most devices per call.
+            max_workers (int, optional): Calls applied at once.
+        """
+        if batch_size < 1:
+            raise ValueError('`batch_size` must be at least 1')
+        self.tags = tags
+        self.window = window
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        self._pending = {}  # tag ID to {device ID: [link, waiters]}
+        self._opened = {}  # tag ID to the time its buffer got its first operation
+        self._unresolved = set()
+        self._urgent = False
+        self._closed = False
+        self._operations = self._calls = self._superseded = 0
+        self._cond = threading.Condition()
+        self._thread = None
+
+    def link_devices(self, tag_id, device_ids):
+        """Buffer linking devices to a tag.
+
+        Returns:
+            concurrent.futures.Future: resolves with the json response of the
+                call that applied the change, or of each call if the devices
+                were split over several.
+        """
+        return self._add(tag_id, device_ids, True)
+
+    def unlink_devices(self, tag_id, device_ids):
+        """Buffer unlinking devices from a tag.
+
+        Returns:
+            concurrent.futures.Future: as for `link_devices`.
+        """
+        return self._add(tag_id, device_ids, False)
+
+    def _add(self, tag_id, device_ids, link):
+        seen = set()
+        device_ids = [i for i in device_ids if not (i in seen or seen.add(i))]
+        waiter = _Waiter(len(device_ids))
+        if not device_ids:
+            waiter.future.set_result({'success': True})
+            return waiter.future
+        with self._cond:
+            if self._closed:
+                raise RuntimeError('The coalescer is closed')
+            buffer = self._pending.get(tag_id)
+            if buffer is None:
+                buffer = self._pending[tag_id] = {}
+                self._opened[tag_id] = time.time()
+            for device_id in device_ids:
+                entry = buffer.get(device_id)
+                if entry is None:
+                    buffer[device_id] = [link, [waiter]]
+                    continue
+                if entry[0] != link:
+                    entry[0] = link
+                    self._superseded += 1
+                entry[1].append(waiter)
+            self._operations += 1
+            self._unresolved.add(waiter.future)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='hologram-tag-coalescer')
+                self._thread.daemon = True
+                self._thread.start()
+            self._cond.notify()
+        waiter.future.add_done_callback(self._resolved)
+        return waiter.future
+
+    def _resolved(self, future):
+        with self._cond:
+            self._unresolved.discard(future)
+
+    def _ready(self, now):
+        return [tag_id for tag_id, buffer in self._pending.items()
+                if self._urgent or self._closed or len(buffer) >= self.batch_size
+                or now - self._opened[tag_id] >= self.window]
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while True:
+                    now = time.time()
+                    ready = self._ready(now)
+                    if ready or (self._closed and not self._pending):
+                        break
+                    timeout = None
+                    if self._pending:
+                        timeout = max(0, min(self._opened.values()) + self.window - now)
+                    self._cond.wait(timeout)
+                if not ready:
+                    return
+                self._urgent = False
+                buffers = [(tag_id, self._pending.pop(tag_id)) for tag_id in ready]
+                for tag_id in ready:
+                    del self._opened[tag_id]
+            calls = []
+            for tag_id, buffer in buffers:
+                for link in (True, False):
+                    device_ids = [i for i, entry in buffer.items() if entry[0] is link]
+                    for start in range(0, len(device_ids), self.batch_size):
+                        calls.append((tag_id, link, device_ids[start:start + self.batch_size], buffer))
+            list(run_concurrently(self._apply, calls, max_workers=self.max_workers))
+
+    def _apply(self, call):
+        tag_id, link, device_ids, buffer = call
+        resp = error = None
+        try:
+            resp = (self.tags.link_devices if link else self.tags.unlink_devices)(tag_id, device_ids)
+        except Exception as e:
+            error = e
+        with self._cond:
+            self._calls += 1
+        for device_id in device_ids:
+            for waiter in buffer[device_id][1]:
+                waiter.applied(resp, error)
+
+    def flush(self, timeout=None):
+        """Apply every buffered operation now and wait for all outstanding ones.
+
+        Returns:
+            bool: whether every operation was applied within `timeout`.
+        """
+        with self._cond:
+            futures = list(self._unresolved)
+            self._urgent = True
+            self._cond.notify()
+        return not wait(futures, timeout=timeout).not_done
+
+    def stats(self):
+        """Return coalescing metrics.
+
+        Returns:
+            dict: `operations` (link and unlink requests), `calls` (API calls
+                made) and `superseded` (device operations cancelled by a later
+                opposite one).
+        """
+        with self._cond:
+            return {'operations': self._operations, 'calls': self._calls, 'superseded': self._superseded}
+
+    def close(self):
+        """Apply the buffered operations and stop the thread. Later operations raise RuntimeError."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+            thread = self._thread
+        if thread is not None:
+            thread.join()
+
+    def __enter__(self):
+        """Return the coalescer."""
+        return self
+
+    def __exit__(self, *exc_info):
+        """Close the coalescer."""
+        self.close()
@@ -0,0 +1,253 @@
+"""Concurrency helpers module."""
+
+from collections import deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+import threading
+import time
+
+from .deadline import DeadlineExceeded, bind, current_deadline
+
+
+BulkResult = namedtuple('BulkResult', ['item', 'result', 'error'])
+"""The outcome of one item of a bulk run. Exactly one of result or error is set."""
+
+
+class RateLimiter(object):
+    """Token bucket rate limiter.
+
+    Allows up to `rate` acquisitions per second on average, with bursts of up
+    to `burst` acquisitions. Safe to share between threads.
+    """
+
+    def __init__(self, rate, burst=None):
+        """Initialize the bucket full.
+
+        Args:
+            rate (float): Average number of acquisitions allowed per second.
+            burst (int, optional): Bucket capacity. Defaults to `rate`, at least 1.
+        """
+        if rate <= 0:
+            raise ValueError('`rate` must be positive')
+        self.rate = float(rate)
+        self.burst = float(burst if burst is not None else max(1, rate))
+        self._tokens = self.burst
+        self._last = time.time()
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        """Return the state to pickle, without the lock."""
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        """Restore a pickled limiter, or reset one in a forked child, with a new lock."""
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def acquire(self, deadline=None):
+        """Block until a token is available, then consume it.
+
+        Raises:
+            DeadlineExceeded: if `deadline` would pass before a token is available.
+        """
+        while True:
+            with self._lock:
+                now = time.time()
+                self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait_for = (1 - self._tokens) / self.rate
+            if deadline is not None and wait_for > deadline.remaining():
+                raise DeadlineExceeded('Deadline would pass while waiting for the rate limit')
+            time.sleep(wait_for)
+
+
+class AdaptiveLimiter(object):
+    """Adaptive concurrency limiter using additive increase, multiplicative decrease.
+
+    Bounds the number of requests in flight. Every healthy completion raises
+    the limit by `1 / limit`, i.e. by about one per round of requests. A 429,
+    a 5xx, an exception, or a latency above `latency_tolerance` times the
+    healthy baseline multiplies the limit by `backoff`, at most once per
+    baseline latency so that one burst of failures counts once. Inflated
+    latencies still pull the baseline up slowly, so that a lasting latency
+    shift becomes the new baseline instead of pinning the limit at `minimum`.
+
+    Changes of the limit are kept in `history` as `(time, limit, reason)`.
+    """
+
+    def __init__(self, initial=4, minimum=1, maximum=64, backoff=0.5, latency_tolerance=2.0, history_size=1000,
+                 baseline_drift=0.02):
+        """Initialize the limiter.
+
+        Args:
+            initial (int, optional): Starting limit.
+            minimum (int, optional): Lowest limit.
+            maximum (int, optional): Highest limit; size bulk worker pools to it.
+            backoff (float, optional): Factor applied to the limit on overload.
+            latency_tolerance (float, optional): Latency inflation, relative to
+                the baseline, treated as overload.
+            history_size (int, optional): Number of limit changes kept.
+            baseline_drift (float, optional): Weight of an inflated latency in
+                the baseline moving average; healthy latencies weigh 0.1.
+        """
+        self.minimum = minimum
+        self.maximum = maximum
+        self.backoff = backoff
+        self.latency_tolerance = latency_tolerance
+        self.baseline_drift = baseline_drift
+        self.history = deque([(time.time(), initial, 'initial')], maxlen=history_size)
+        self._limit = float(initial)
+        self._inflight = 0
+        self._baseline = None
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+
+    def __getstate__(self):
+        """Return the state to pickle, without the condition and the in-flight count."""
+        state = self.__dict__.copy()
+        del state['_cond'], state['_inflight']
+        return state
+
+    def __setstate__(self, state):
+        """Restore a pickled limiter, or reset one in a forked child, with no request in flight."""
+        self.__dict__.update(state)
+        self._inflight = 0
+        self._cond = threading.Condition()
+
+    @property
+    def limit(self):
+        """Return the current concurrency limit."""
+        return int(self._limit)
+
+    @property
+    def inflight(self):
+        """Return the number of requests in flight."""
+        return self._inflight
+
+    @property
+    def baseline(self):
+        """Return the moving average of latencies, in seconds; inflated ones weigh `baseline_drift`."""
+        return self._baseline
+
+    def acquire(self, deadline=None):
+        """Block until fewer than `limit` requests are in flight, then take a slot.
+
+        Raises:
+            DeadlineExceeded: if `deadline` passes while waiting.
+        """
+        with self._cond:
+            while self._inflight >= int(self._limit):
+                if deadline is None:
+                    self._cond.wait()
+                else:
+                    self._cond.wait(deadline.check())
+            self._inflight += 1
+
+    def release(self, latency, overloaded=False):
+        """Give back a slot and adapt the limit.
+
+        Args:
+            latency (float): Seconds the request took.
+            overloaded (bool, optional): Whether the request failed with a sign
+                of overload (429, 5xx, connection error, timeout).
+        """
+        with self._cond:
+            self._inflight -= 1
+            now = time.time()
+            baseline = self._baseline
+            inflated = baseline is not None and latency > baseline * self.latency_tolerance
+            if inflated and not overloaded:
+                self._baseline = baseline + self.baseline_drift * (latency - baseline)
+            if overloaded or inflated:
+                if now - self._last_decrease >= (baseline or latency):
+                    self._last_decrease = now
+                    self._set(max(self.minimum, self._limit * self.backoff), now,
+                              'overload' if overloaded else 'latency')
+            else:
+                self._baseline = latency if baseline is None else 0.9 * baseline + 0.1 * latency
+                self._set(min(self.maximum, self._limit + 1.0 / self._limit), now, 'increase')
+            self._cond.notify_all()
+
+    def cancel(self):
+        """Give back a slot whose request was never sent, without adapting the limit."""
+        with self._cond:
+            self._inflight -= 1
+            self._cond.notify_all()
+
+    def _set(self, limit, now, reason):
+        changed = int(limit) != int(self._limit)
+        self._limit = limit
+        if changed:
+            self.history.append((now, int(limit), reason))
+
+
+def bulk_workers(client, max_workers=None):
+    """Return the worker pool size for a bulk job of `client`.
+
+    An explicit `max_workers` wins. Otherwise, when the client's transport has
+    an AdaptiveLimiter, the pool is sized to its maximum so the limiter alone
+    decides the effective concurrency. The fallback is 8.
+    """
+    if max_workers:
+        return max_workers
+    limiter = getattr(getattr(client, 'transport', None), 'limiter', None)
+    return limiter.maximum if limiter is not None else 8
+
+
+def run_concurrently(func, items, max_workers=8, rate_limiter=None):
+    """Call `func(item)` for every item on a bounded thread pool.
+
+    At most `2 * max_workers` items are in flight at once, so `items` may be a
+    lazy iterable of any length. Exceptions raised by `func` are captured in
+    the yielded result rather than propagated.
+
+    Workers inherit the caller's `deadline` and `timeout`. Once the deadline
+    passes, no further items are started; items not started are not yielded.
+
+    Args:
+        func (Callable): Function called with one item.
+        items (Iterable): Items to process.
+        max_workers (int, optional): Size of the thread pool.
+        rate_limiter (RateLimiter, optional): Acquired before each call.
+
+    Yields:
+        BulkResult: one per item, in completion order.
+    """
+    dl = current_deadline()
+
+    @bind
+    def call(item):
+        if rate_limiter is not None:
+            rate_limiter.acquire(dl)
+        return func(item)
+
+    window = max(1, 2 * max_workers)
+    items = iter(items)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = {}
+        exhausted = False
+        while True:
+            while not exhausted and len(pending) < window:
+                if dl is not None and dl.expired:
+                    exhausted = True
+                    break
+                try:
+                    item = next(items)
+                except StopIteration:
+                    exhausted = True
+                    break
+                pending[executor.submit(call, item)] = item
+            if not pending:
+                return
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                item = pending.pop(future)
+                error = future.exception()
+                if error is None:
+                    yield BulkResult(item, future.result(), None)
+                else:
+                    yield BulkResult(item, None, error)
@@ -1,3 +1,6 @@
 """Constants module."""
 
 HOLOGRAM_API_BASEURL = 'https://dashboard.hologram.io/api/1/'
+
+DEFAULT_TIMEOUT = (10, 60)
+"""Default `(connect, read)` timeout of every request, in seconds."""
@@ -1,10 +1,6 @@
 """Data Plans module."""
 
-try:
-    from urllib.parse import urljoin  # python 3
-except ImportError:
-    from urlparse import urljoin  # python 2
-import requests
+from . import endpoints
 
 
 class DataPlans(object):
@@ -26,12 +22,7 @@ class DataPlans(object):
         Returns:
             dict: the json response as a dictionary.
         """
-        url = urljoin(self.client.base_url, 'plans')
-        params = {
-            'apikey': self.client.api_key
-        }
-        resp = requests.get(url, json=params)
-        return resp.json()
+        return self.client.call(endpoints.LIST_PLANS)
 
     def get(self, plan_id):
         """Get a Data Plan.
@@ -42,9 +33,4 @@ class DataPlans(object):
         Returns:
             dict: the json response as a dictionary.
         """
-        url = urljoin(self.client.base_url, 'plans/{}'.format(plan_id))
-        params = {
-            'apikey': self.client.api_key
-        }
-        resp = requests.get(url, json=params)
-        return resp.json()
+        return self.client.call(endpoints.GET_PLAN, plan_id)
@@ -0,0 +1,118 @@
+"""Timeouts and deadlines module.
+
+Every request is sent with a `(connect, read)` timeout: the client's
+`timeout`, unless overridden for a block of calls with `timeout()`.
+
+A `deadline()` gives a block of calls, such as a bulk job, a total time
+budget. Requests, rate limit and concurrency limit waits inside the block
+are clamped to the remaining budget, and raise `DeadlineExceeded` once it is
+spent::
+
+    with deadline(60):
+        for result in client.across_orgs(client.devices.list):
+            ...
+
+Both are thread-local; `run_concurrently` carries them over to its workers.
+"""
+
+from contextlib import contextmanager
+import threading
+import time
+
+from requests.exceptions import Timeout
+
+
+_local = threading.local()
+
+
+class DeadlineExceeded(Timeout):
+    """Raised when the time budget of a deadline is spent."""
+
+
+class Deadline(object):
+    """Deadline class. A point in time by which work must finish."""
+
+    __slots__ = ('expires_at',)
+
+    def __init__(self, seconds):
+        """Expire `seconds` from now."""
+        self.expires_at = time.time() + seconds
+
+    def remaining(self):
+        """Return the seconds left, possibly negative."""
+        return self.expires_at - time.time()
+
+    @property
+    def expired(self):
+        """Return whether the deadline has passed."""
+        return self.remaining() <= 0
+
+    def check(self):
+        """Raise DeadlineExceeded if the deadline has passed, else return the seconds left."""
+        remaining = self.remaining()
+        if remaining <= 0:
+            raise DeadlineExceeded('Deadline exceeded by {:.3f}s'.format(-remaining))
+        return remaining
+
+    def clamp(self, timeout):
+        """Limit a requests timeout (float or `(connect, read)` tuple) to the time left."""
+        remaining = self.check()
+        if timeout is None:
+            return remaining
+        if isinstance(timeout, tuple):
+            return tuple(remaining if t is None else min(t, remaining) for t in timeout)
+        return min(timeout, remaining)
+
+
+def current_deadline():
+    """Return the innermost active Deadline of this thread, or None."""
+    return getattr(_local, 'deadline', None)
+
+
+def current_timeout():
+    """Return the timeout override active on this thread, or None."""
+    return getattr(_local, 'timeout', None)
+
+
+@contextmanager
+def deadline(seconds):
+    """Run the block with a total time budget of `seconds`.
+
+    A nested deadline can only shorten the enclosing one.
+    """
+    outer = current_deadline()
+    inner = Deadline(seconds)
+    if outer is not None and outer.expires_at < inner.expires_at:
+        inner = outer
+    _local.deadline = inner
+    try:
+        yield inner
+    finally:
+        _local.deadline = outer
+
+
+@contextmanager
+def timeout(value):
+    """Override the client timeout, a float or `(connect, read)` tuple, for the block."""
+    outer = current_timeout()
+    _local.timeout = value
+    try:
+        yield
+    finally:
+        _local.timeout = outer
+
+
+def bind(func):
+    """Wrap `func` to run with the caller's deadline and timeout on any thread."""
+    dl, to = current_deadline(), current_timeout()
+    if dl is None and to is None:
+        return func
+
+    def bound(*args, **kwargs):
+        saved = current_deadline(), current_timeout()
+        _local.deadline, _local.timeout = dl, to
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _local.deadline, _local.timeout = saved
+    return bound
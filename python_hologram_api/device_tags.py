@@ -1,10 +1,7 @@
 """Device Tags module."""
 
-try:
-    from urllib.parse import urljoin  # python 3
-except ImportError:
-    from urlparse import urljoin  # python 2
-import requests
+from . import endpoints
+from .coalesce import TagWriteCoalescer
 
 
 class DeviceTags(object):
@@ -24,12 +21,7 @@ class DeviceTags(object):
         Returns:
             dict: the json response as a dictionary.
         """
-        url = urljoin(self.client.base_url, 'devices/tags')
-        params = {
-            'apikey': self.client.api_key
-        }
-        resp = requests.get(url, json=params)
-        return resp.json()
+        return self.client.call(endpoints.LIST_TAGS)
 
     def create(self, name):
         """Create a Device Tag.
@@ -40,13 +32,7 @@ class DeviceTags(object):
         Returns:
             dict: the json response as a dictionary.
         """
-        url = urljoin(self.client.base_url, 'devices/tags')
-        params = {
-            'apikey': self.client.api_key,
-            'name': name
-        }
-        resp = requests.post(url, json=params)
-        return resp.json()
+        return self.client.call(endpoints.CREATE_TAG, name=name)
 
     def delete(self, tag_id):
         """Delete a Device Tag.
@@ -57,45 +43,44 @@ class DeviceTags(object):
         Returns:
             dict: the json response as a dictionary.
         """
-        url = urljoin(self.client.base_url, 'devices/tags/{}'.format(tag_id))
-        params = {
-            'apikey': self.client.api_key,
-        }
-        resp = requests.delete(url, json=params)
-        return resp.json()
+        return self.client.call(endpoints.DELETE_TAG, tag_id)
 
     def link_devices(self, tag_id, device_ids):
         """Link a List of Devices to a Tag.
 
         Args:
             tag_id (int): The ID of the tag.
-            device_ids (List[int]): List of device IDs to link to this tag.
+            device_ids (Iterable[int]): Device IDs to link to this tag, such as a
+                `tagindex.Selection`.
 
         Returns:
             dict: the json response as a dictionary.
         """
-        url = urljoin(self.client.base_url, 'devices/tags/{}/link'.format(tag_id))
-        params = {
-            'apikey': self.client.api_key,
-            'deviceids': device_ids
-        }
-        resp = requests.post(url, json=params)
-        return resp.json()
+        return self.client.call(endpoints.LINK_TAG, tag_id, device_ids=list(device_ids))
 
     def unlink_devices(self, tag_id, device_ids):
         """Unlink a List of Devices to a Tag.
 
         Args:
             tag_id (int): The ID of the tag.
-            device_ids (List[int]): List of device IDs to unlink to this tag.
+            device_ids (Iterable[int]): Device IDs to unlink to this tag, such as a
+                `tagindex.Selection`.
 
         Returns:
             dict: the json response as a dictionary.
         """
-        url = urljoin(self.client.base_url, 'devices/tags/{}/unlink'.format(tag_id))
-        params = {
-            'apikey': self.client.api_key,
-            'deviceids': device_ids
-        }
-        resp = requests.post(url, json=params)
-        return resp.json()
+        return self.client.call(endpoints.UNLINK_TAG, tag_id, device_ids=list(device_ids))
+
+    def coalesce(self, window=0.05, batch_size=100, max_workers=4):
+        """Return a TagWriteCoalescer batching link and unlink calls of this resource.
+
+        Args:
+            window (float, optional): Seconds an operation may wait for others
+                on the same tag.
+            batch_size (int, optional): Most devices per call.
+            max_workers (int, optional): Calls applied at once.
+
+        Returns:
+            TagWriteCoalescer: its methods return futures; close it when done.
+        """
+        return TagWriteCoalescer(self, window=window, batch_size=batch_size, max_workers=max_workers)
@@ -1,18 +1,16 @@
 """Devices module."""
 
-try:
-    from urllib.parse import urljoin  # python 3
-except ImportError:
-    from urlparse import urljoin  # python 2
-import requests
+from . import endpoints
+from .getmany import get_many
 
 
 class Devices(object):
     """Devices class."""
 
     def __init__(self, client):
-        """Save a reference to the client."""
+        """Save a reference to the client; `planner` is the cost model of `get_many`, shared per API key."""
         self.client = client
+        self.planner = client.transport.planner(client.api_key, 'devices')
 
     def list(self, org_id=None):
         """List Devices.
@@ -23,13 +21,7 @@ class Devices(object):
         Returns:
             dict: the json response as a dictionary.
         """
-        url = urljoin(self.client.base_url, 'devices')
-        params = {
-            'apikey': self.client.api_key,
-            'orgid': org_id,
-        }
-        resp = requests.get(url, json=params)
-        return resp.json()
+        return self.client.call(endpoints.LIST_DEVICES, org_id=org_id)
 
     def get(self, device_id):
         """Get a Device.
@@ -40,9 +32,23 @@ class Devices(object):
         Returns:
             dict: the json response as a dictionary.
         """
-        url = urljoin(self.client.base_url, 'devices/{}'.format(device_id))
-        params = {
-            'apikey': self.client.api_key,
-        }
-        resp = requests.get(url, json=params)
-        return resp.json()
+        return self.client.call(endpoints.GET_DEVICE, device_id)
+
+    def get_many(self, device_ids, org_id=None, strategy=None, fleet_size=None, max_workers=None):
+        """Get Devices by ID, with concurrent Get calls or one filtered List call.
+
+        The strategy expected to be faster is chosen from the number of IDs,
+        the fleet size and the latencies seen so far; see `getmany`.
+
+        Args:
+            device_ids (Iterable[int]): IDs of the devices to get.
+            org_id (int, optional): Organization of the devices, scoping the List call.
+            strategy (str, optional): `'get'` or `'list'` to force a strategy.
+            fleet_size (int, optional): Number of devices the List call would return.
+            max_workers (int, optional): Concurrent Get calls.
+
+        Returns:
+            GetManyResult: `records` in request order, `missing` IDs and the `strategy` used.
+        """
+        return get_many(self.client, self.planner, endpoints.GET_DEVICE, endpoints.LIST_DEVICES, device_ids,
+                        org_id=org_id, strategy=strategy, fleet_size=fleet_size, max_workers=max_workers)
@@ -0,0 +1,137 @@
+"""Endpoint registry module.
+
+Every Hologram REST endpoint used by the resource classes is declared here
+once: its HTTP method, path template, how Python arguments map to JSON
+fields, and whether it is safe to repeat. `HologramClient.request` turns an
+Endpoint into an HTTP request.
+"""
+
+
+class Endpoint(object):
+    """Endpoint class.
+
+    Attributes:
+        name (str): Registry name, `<resource>.<method>`.
+        method (str): HTTP method.
+        path (str): Path template relative to the base url, formatted with the
+            positional path arguments, e.g. 'links/cellular/{}/changeplan'.
+        fields (dict): Python argument name to JSON field name.
+        fixed (dict): JSON fields sent with a constant value.
+        auth (bool): Whether the API key is sent.
+        idempotent (bool): Whether repeating the request is harmless.
+        cached (bool): Whether the response may be served from the client cache.
+        invalidates (tuple): Path templates, formatted like `path`, whose cached
+            responses become stale after a call.
+        group (str): Path template prefix shared by related endpoints, e.g.
+            'links/cellular'.
+    """
+
+    __slots__ = ('name', 'method', 'path', 'fields', 'fixed', 'auth', 'idempotent', 'cached',
+                 'invalidates', 'group', 'static')
+
+    def __init__(self, name, method, path, fields=None, fixed=None, auth=True, idempotent=None,
+                 cached=False, invalidates=()):
+        """Declare an endpoint. `idempotent` defaults to True for GET and DELETE."""
+        self.name = name
+        self.method = method
+        self.path = path
+        self.fields = fields or {}
+        self.fixed = fixed or {}
+        self.auth = auth
+        self.idempotent = method in ('GET', 'DELETE') if idempotent is None else idempotent
+        self.cached = cached
+        self.invalidates = tuple(invalidates)
+        self.group = '/'.join(part for part in path.split('/')[:2] if part != '{}')
+        self.static = '{}' not in path
+
+    def __repr__(self):
+        """Return `<Endpoint METHOD path>`."""
+        return '<Endpoint {} {}>'.format(self.method, self.path)
+
+
+REGISTRY = {}
+"""Registry name to Endpoint."""
+
+
+def endpoint(name, method, path, **kwargs):
+    """Declare an Endpoint and add it to the REGISTRY."""
+    if name in REGISTRY:
+        raise ValueError('Endpoint already registered: {}'.format(name))
+    REGISTRY[name] = ep = Endpoint(name, method, path, **kwargs)
+    return ep
+
+
+# Cellular Links
+ACTIVATE_SIMS = endpoint('cell.activate_sims', 'POST', 'links/cellular/bulkclaim',
+                         fields={'sims': 'sims', 'plan': 'plan', 'tier': 'tier'})
+LIST_LINKS = endpoint('cell.list_links', 'GET', 'links/cellular', fields={'org_id': 'orgid'})
+GET_LINK = endpoint('cell.get_link', 'GET', 'links/cellular/{}')
+CHANGE_PLAN = endpoint('cell.change_plan', 'POST', 'links/cellular/{}/changeplan',
+                       fields={'plan': 'plan', 'tier': 'tier'}, idempotent=True)
+CHANGE_OVERAGE_LIMIT = endpoint('cell.change_overage_limit', 'POST', 'links/cellular/{}/overagelimit',
+                                fields={'limit': 'limit'}, idempotent=True)
+PAUSE_LINK = endpoint('cell.pause_link', 'POST', 'links/cellular/{}/state',
+                      fixed={'state': 'pause'}, idempotent=True)
+UNPAUSE_LINK = endpoint('cell.unpause_link', 'POST', 'links/cellular/{}/state',
+                        fixed={'state': 'live'}, idempotent=True)
+
+# Cloud Messaging
+SEND_CSR_MESSAGE = endpoint('csr.send_message', 'POST', 'csr/rdm',
+                            fields={'device_id': 'deviceid', 'data': 'data', 'tags': 'tags'})
+LIST_CSR_MESSAGES = endpoint('csr.list_messages', 'GET', 'csr/rdm', fields={
+    'device_id': 'deviceid',
+    'limit': 'limit',
+    'org_id': 'orgid',
+    'topic_name': 'topicname',
+    'time_stamp_start': 'timestampstart',
+    'time_stamp_end': 'timestampend'})
+SEND_SMS = endpoint('sms.send_message', 'POST', 'sms/incoming',
+                    fields={'device_id': 'deviceid', 'body': 'body', 'from_number': 'fromnumber'})
+SEND_CLOUD_MESSAGE = endpoint('cloud.send_message', 'POST', 'devices/messages', fields={
+    'device_ids': 'deviceids',
+    'protocol': 'protocol',
+    'port': 'port',
+    'data': 'data',
+    'base64_data': 'base64data'})
+TRIGGER_WEBHOOK = endpoint('cloud.trigger_webhook', 'POST', 'devices/messages/{}/{}',
+                           fields={'data': 'data', 'base64_data': 'base64data'}, auth=False)
+
+# Data Plans
+LIST_PLANS = endpoint('data_plans.list', 'GET', 'plans', cached=True)
+GET_PLAN = endpoint('data_plans.get', 'GET', 'plans/{}', cached=True)
+
+# Devices
+LIST_DEVICES = endpoint('devices.list', 'GET', 'devices', fields={'org_id': 'orgid'})
+GET_DEVICE = endpoint('devices.get', 'GET', 'devices/{}')
+
+# Device Tags
+LIST_TAGS = endpoint('tags.list', 'GET', 'devices/tags', cached=True)
+CREATE_TAG = endpoint('tags.create', 'POST', 'devices/tags', fields={'name': 'name'},
+                      invalidates=('devices/tags',))
+DELETE_TAG = endpoint('tags.delete', 'DELETE', 'devices/tags/{}', invalidates=('devices/tags',))
+LINK_TAG = endpoint('tags.link_devices', 'POST', 'devices/tags/{}/link',
+                    fields={'device_ids': 'deviceids'}, idempotent=True, invalidates=('devices/tags',))
+UNLINK_TAG = endpoint('tags.unlink_devices', 'POST', 'devices/tags/{}/unlink',
+                      fields={'device_ids': 'deviceids'}, idempotent=True, invalidates=('devices/tags',))
+
+# Organization
+LIST_ORGS = endpoint('org.list', 'GET', 'organizations', cached=True)
+GET_ORG = endpoint('org.get', 'GET', 'organizations/{}', cached=True)
+GET_ORG_BALANCE = endpoint('org.get_balance', 'GET', 'organizations/{}/balance')
+ADD_ORG_BALANCE = endpoint('org.add_balance', 'POST', 'organizations/{}/balance', fields={'amount': 'addamount'},
+                           invalidates=('organizations',))  # the organization and the list
+ORG_BALANCE_HISTORY = endpoint('org.balance_history', 'GET', 'organizations/{}/balancehistory')
+
+# Spacebridge
+ADD_PUBLIC_KEY = endpoint('spacebridge.add_public_key', 'POST', 'tunnelkeys', fields={'public_key': 'public_key'})
+LIST_PUBLIC_KEYS = endpoint('spacebridge.list_public_keys', 'GET', 'tunnelkeys',
+                            fields={'with_disabled': 'withdisabled'})
+DISABLE_KEY = endpoint('spacebridge.disable_key', 'POST', 'tunnelkeys/{}/disable', idempotent=True)
+ENABLE_KEY = endpoint('spacebridge.enable_key', 'POST', 'tunnelkeys/{}/enable', idempotent=True)
+
+# User
+GET_USER = endpoint('user.get_info', 'GET', 'users/me', cached=True)
+GET_USER_BALANCE = endpoint('user.get_balance', 'GET', 'users/me/balance')
+ADD_USER_BALANCE = endpoint('user.add_balance', 'POST', 'users/me/balance', fields={'amount': 'addamount'},
+                            invalidates=('users/me',))
+USER_BALANCE_HISTORY = endpoint('user.balance_history', 'GET', 'users/me/balancehistory')
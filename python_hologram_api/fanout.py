@@ -0,0 +1,80 @@
+"""Multi-organization fan-out module."""
+
+from collections import namedtuple
+
+from .concurrency import bulk_workers, run_concurrently
+
+
+OrgResult = namedtuple('OrgResult', ['org_id', 'response', 'error'])
+"""The outcome of a query for one organization.
+
+`error` is None on success. When the query raised, `response` is None; when
+it returned a response without `success`, `response` is that response and
+`error` a RuntimeError with its error message.
+"""
+
+
+def list_org_ids(client, where=None):
+    """List the IDs of the organizations the client is a member of.
+
+    Args:
+        client (HologramClient): the client.
+        where (Callable, optional): Called with each organization dict; only
+            organizations for which it returns True are kept.
+
+    Returns:
+        List[int]: organization IDs.
+    """
+    resp = client.org.list()
+    if not resp.get('success'):
+        raise RuntimeError('List Organizations failed: {}'.format(resp))
+    return [org['id'] for org in resp.get('data') or [] if where is None or where(org)]
+
+
+def across_orgs(client, query, org_ids=None, where=None, max_workers=None):
+    """Run `query(org_id)` for many organizations concurrently.
+
+    Args:
+        client (HologramClient): the client. Used to list organizations when
+            `org_ids` is not given.
+        query (Callable): Called with an organization ID, e.g.
+            ``lambda org_id: client.devices.list(org_id)``.
+        org_ids (Iterable[int], optional): Organizations to query. Defaults to
+            every organization, filtered by `where`.
+        where (Callable, optional): Organization filter, see `list_org_ids`.
+        max_workers (int, optional): Number of organizations queried at once.
+            Defaults to `bulk_workers(client)`.
+
+    Yields:
+        OrgResult: one per organization, in completion order. Exceptions and
+            responses without `success` are reported as errors instead of
+            aborting the other queries.
+    """
+    if org_ids is None:
+        org_ids = list_org_ids(client, where=where)
+    for bulk in run_concurrently(query, org_ids, max_workers=bulk_workers(client, max_workers)):
+        error = bulk.error
+        if error is None and isinstance(bulk.result, dict) and not bulk.result.get('success', True):
+            error = RuntimeError(bulk.result.get('error', bulk.result))
+        yield OrgResult(bulk.item, bulk.result, error)
+
+
+def iter_records(results, errors=None):
+    """Merge the `data` lists of OrgResults into one stream.
+
+    Args:
+        results (Iterable[OrgResult]): e.g. the output of `across_orgs`.
+        errors (list, optional): Failed OrgResults are appended here. If not
+            given, the first failure is raised.
+
+    Yields:
+        Tuple[int, dict]: the organization ID and one record.
+    """
+    for result in results:
+        if result.error is not None:
+            if errors is None:
+                raise result.error
+            errors.append(result)
+            continue
+        for record in result.response.get('data') or []:
+            yield result.org_id, record
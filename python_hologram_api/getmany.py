@@ -0,0 +1,184 @@
+"""Batched record lookup module.
+
+`Devices.get_many` and `CellularLinks.get_many` fetch a set of records by ID
+with whichever of two strategies a cost model expects to be faster:
+
+* ``'get'``: one Get call per ID, `max_workers` at a time. Costs about
+  ``ceil(ids / workers) * get_latency``.
+* ``'list'``: one List call for the whole fleet, filtered locally. Costs about
+  ``list_latency + fleet_size * list_record_latency``.
+
+The latencies start from defaults and are learned from the calls made: the
+Get latency as a moving average, and both List parameters as a least squares
+line through recent List calls of different sizes (while every List call
+returned about as many records, the fixed latency is kept and the rest is
+charged per record). The fleet size is learned from List calls, or can be
+passed in. Clients of the same API key on one Transport share their models.
+"""
+
+from collections import namedtuple
+import math
+import threading
+import time
+
+from .concurrency import bulk_workers, run_concurrently
+from .deadline import DeadlineExceeded
+
+
+GET = 'get'
+LIST = 'list'
+
+GetManyResult = namedtuple('GetManyResult', ['records', 'missing', 'strategy'])
+"""Records found, in request order; IDs not found, in request order; the strategy used."""
+
+
+class GetManyPlanner(object):
+    """GetManyPlanner class. The cost model of one resource; thread-safe."""
+
+    def __init__(self, get_latency=0.15, list_latency=0.5, list_record_latency=0.0005, default_fleet_size=1000,
+                 smoothing=0.2):
+        """Initialize the model with prior latencies, in seconds.
+
+        Args:
+            get_latency (float, optional): Latency of one Get call.
+            list_latency (float, optional): Fixed latency of a List call.
+            list_record_latency (float, optional): Latency added to a List
+                call by each record.
+            default_fleet_size (int, optional): Fleet size assumed until one
+                is known.
+            smoothing (float, optional): Weight of a new observation in the
+                moving averages of the latencies and in the List fit.
+        """
+        self.get_latency = get_latency
+        self.list_latency = list_latency
+        self.list_record_latency = list_record_latency
+        self.default_fleet_size = default_fleet_size
+        self.smoothing = smoothing
+        self.fleet_sizes = {}
+        self._list_sums = (0.0,) * 5  # decayed weight and sums of records, seconds, records^2, records * seconds
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        """Return the state to pickle, without the lock."""
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        """Restore a pickled planner with a new lock."""
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def _smooth(self, old, new):
+        return old + self.smoothing * (new - old)
+
+    def observe_get(self, seconds):
+        """Record the latency of a Get call."""
+        with self._lock:
+            self.get_latency = self._smooth(self.get_latency, seconds)
+
+    def observe_list(self, seconds, records, org_id=None):
+        """Record the latency and size of a List call for `org_id`."""
+        with self._lock:
+            self.fleet_sizes[org_id] = records
+            keep = 1.0 - self.smoothing
+            weight, x, y, xx, xy = [keep * total for total in self._list_sums]
+            weight, x, y, xx, xy = weight + 1, x + records, y + seconds, xx + records * records, xy + records * seconds
+            self._list_sums = weight, x, y, xx, xy
+            mean_x, mean_y = x / weight, y / weight
+            var_x = xx / weight - mean_x * mean_x
+            if var_x > (0.1 * mean_x) ** 2:  # sizes differ enough to tell both parameters apart
+                self.list_record_latency = max(0.0, (xy / weight - mean_x * mean_y) / var_x)
+                self.list_latency = max(0.0, mean_y - self.list_record_latency * mean_x)
+            elif records:
+                per_record = max(0.0, seconds - self.list_latency) / records
+                self.list_record_latency = self._smooth(self.list_record_latency, per_record)
+
+    def costs(self, count, workers, org_id=None, fleet_size=None):
+        """Return the expected seconds of each strategy for `count` IDs.
+
+        Returns:
+            dict: strategy to expected seconds.
+        """
+        with self._lock:
+            if fleet_size is None:
+                fleet_size = self.fleet_sizes.get(org_id, max(count, self.default_fleet_size))
+            return {GET: math.ceil(count / float(max(1, workers))) * self.get_latency,
+                    LIST: self.list_latency + fleet_size * self.list_record_latency}
+
+    def choose(self, count, workers, org_id=None, fleet_size=None):
+        """Return the cheaper strategy for `count` IDs; `'get'` on a tie."""
+        costs = self.costs(count, workers, org_id, fleet_size)
+        return GET if costs[GET] <= costs[LIST] else LIST
+
+
+def get_many(client, planner, get_endpoint, list_endpoint, ids, org_id=None, strategy=None, fleet_size=None,
+             max_workers=None):
+    """Fetch records by ID with the strategy chosen by `planner`.
+
+    Args:
+        client (HologramClient): the client.
+        planner (GetManyPlanner): Cost model of the resource.
+        get_endpoint (Endpoint): Endpoint getting one record by ID.
+        list_endpoint (Endpoint): Endpoint listing records, with an `org_id` field.
+        ids (Iterable[int]): IDs to fetch. Duplicates are fetched once.
+        org_id (int, optional): Organization the records belong to, if known.
+            Scopes the List call.
+        strategy (str, optional): `'get'` or `'list'`, overriding the planner.
+        fleet_size (int, optional): Number of records the List call returns.
+        max_workers (int, optional): Concurrent Get calls. Defaults to
+            `bulk_workers(client)`.
+
+    Returns:
+        GetManyResult: the records in request order and the missing IDs.
+
+    Raises:
+        RuntimeError: if a call fails other than with a 404.
+        DeadlineExceeded: if the deadline passes before every Get call started.
+    """
+    ids = list(ids)
+    seen = set()
+    unique = [i for i in ids if not (i in seen or seen.add(i))]
+    workers = bulk_workers(client, max_workers)
+    if strategy is None:
+        strategy = planner.choose(len(unique), workers, org_id, fleet_size) if unique else GET
+    if strategy == GET:
+        found = _get_each(client, planner, get_endpoint, unique, workers)
+    elif strategy == LIST:
+        found = _list_all(client, planner, list_endpoint, seen, org_id)
+    else:
+        raise ValueError('Unknown strategy: {!r}'.format(strategy))
+    return GetManyResult([found[i] for i in ids if i in found], [i for i in ids if i not in found], strategy)
+
+
+def _get_each(client, planner, endpoint, ids, workers):
+    def get(record_id):
+        start = time.time()
+        resp = client.request(endpoint, record_id)
+        planner.observe_get(time.time() - start)
+        return resp.status_code, resp.json()
+
+    found = {}
+    done = 0
+    for result in run_concurrently(get, ids, max_workers=workers):
+        done += 1
+        if result.error is not None:
+            raise result.error
+        status, body = result.result
+        if body.get('success'):
+            found[result.item] = body.get('data')
+        elif status != 404:
+            raise RuntimeError('{} {} failed: {}'.format(endpoint.name, result.item, body))
+    if done < len(ids):
+        raise DeadlineExceeded('Deadline passed before every record was fetched')
+    return found
+
+
+def _list_all(client, planner, endpoint, ids, org_id):
+    start = time.time()
+    resp = client.call(endpoint, org_id=org_id)
+    if not resp.get('success'):
+        raise RuntimeError('{} failed: {}'.format(endpoint.name, resp))
+    records = resp.get('data') or []
+    planner.observe_list(time.time() - start, len(records), org_id)
+    return dict((record['id'], record) for record in records if record.get('id') in ids)
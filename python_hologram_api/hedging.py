@@ -0,0 +1,265 @@
+"""Hedged requests module.
+
+`Transport(hedging=Hedging())` cuts the latency tail of single record reads,
+such as Get Device, Get Cellular Link and Get Organization Balance. When the
+response to a GET has not arrived within the `percentile` of that endpoint's
+recent latency, the same request is sent again and whichever response comes
+first is returned. Hedges are capped at `budget` times the number of hedgeable
+requests, so a slow API does not get twice the load.
+
+A request that cannot be hedged, for want of a delay or of budget, is sent on
+the caller's thread. Otherwise the first attempt is sent from a pool of
+reused threads that grows with the requests in flight, so that the caller can
+return the hedge's response while the first attempt is still waiting, and
+first attempts are never queued behind one another. Hedges go to a bounded
+pool, sized by the Transport to its limiter maximum or connection pool.
+"""
+
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+import sys
+import threading
+import time
+
+try:
+    import queue  # python 3
+except ImportError:
+    import Queue as queue  # python 2
+
+from .deadline import bind
+
+
+def _discard(future):
+    if future.exception() is None:
+        future.result().close()
+
+
+class _Threads(object):
+    """Unbounded pool of reused daemon threads; threads idle for `idle_timeout` seconds exit."""
+
+    def __init__(self, idle_timeout=60.0):
+        self.idle_timeout = idle_timeout
+        self._queue = queue.Queue()
+        self._idle = 0
+        self._threads = set()
+        self._lock = threading.Lock()
+
+    def submit(self, func):
+        """Call `func` on an idle thread, or a new one; return a Future of its result."""
+        future = Future()
+        future.set_running_or_notify_cancel()
+        with self._lock:
+            self._queue.put((future, func))
+            if self._idle:
+                self._idle -= 1  # claimed by a waiting thread
+                return future
+            thread = threading.Thread(target=self._work)
+            thread.daemon = True
+            self._threads.add(thread)
+        thread.start()
+        return future
+
+    def _work(self):
+        while True:
+            try:
+                item = self._queue.get(timeout=self.idle_timeout)
+            except queue.Empty:
+                with self._lock:
+                    if not self._queue.empty():
+                        continue  # claimed just now
+                    self._idle -= 1
+                    self._threads.discard(threading.current_thread())
+                    return
+            if item is None:
+                return
+            future, func = item
+            try:
+                result, error = func(), None
+            except BaseException:
+                result, error = None, sys.exc_info()[1]
+            with self._lock:
+                self._idle += 1  # before the caller, woken by the result, submits again
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(error)
+            del item, future, func, result, error
+
+    def shutdown(self, wait=True):
+        """Stop every thread once the calls already submitted are done."""
+        with self._lock:
+            threads, self._threads = list(self._threads), set()
+        for _ in threads:
+            self._queue.put(None)
+        if wait:
+            for thread in threads:
+                thread.join()
+
+
+class Hedging(object):
+    """Hedging class. Thread-safe; one instance may serve many clients through a Transport."""
+
+    def __init__(self, percentile=0.95, budget=0.05, min_samples=20, default_delay=None, min_delay=0.005,
+                 window=256, max_workers=None, endpoints=None):
+        """Initialize the hedging policy.
+
+        Args:
+            percentile (float, optional): Quantile of recent latency after
+                which a hedge is sent.
+            budget (float, optional): Maximum hedges per hedgeable request.
+            min_samples (int, optional): Latencies of an endpoint needed before
+                its percentile is trusted.
+            default_delay (float, optional): Hedge delay, in seconds, while an
+                endpoint has fewer than `min_samples` latencies. By default
+                such requests are not hedged.
+            min_delay (float, optional): Shortest hedge delay, in seconds.
+            window (int, optional): Latencies kept per endpoint.
+            max_workers (int, optional): Threads sending hedges. Defaults to
+                the `max_workers` a Transport passes to `call`, its limiter's
+                `maximum` or else its `pool_maxsize`; 16 if used on its own.
+            endpoints (Iterable[str], optional): Names of the endpoints to
+                hedge. Defaults to the idempotent Get endpoints of a single
+                record (``devices.get``, ``cell.get_link``, ...), not the
+                List endpoints, whose hedges would double the heaviest calls.
+        """
+        self.percentile = percentile
+        self.budget = budget
+        self.min_samples = min_samples
+        self.default_delay = default_delay
+        self.min_delay = min_delay
+        self.window = window
+        self.max_workers = max_workers
+        self.endpoints = frozenset(endpoints) if endpoints is not None else None
+        self._reset()
+
+    def _reset(self):
+        self._latencies = {}
+        self._requests = self._hedged = self._wins = self._denied = 0
+        self._executors = {}
+        self._threads = _Threads()
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        """Return the state to pickle: the settings only."""
+        state = self.__dict__.copy()
+        for name in ('_latencies', '_requests', '_hedged', '_wins', '_denied', '_executors', '_threads', '_lock'):
+            del state[name]
+        return state
+
+    def __setstate__(self, state):
+        """Restore a pickled policy, or reset one in a forked child, with no history."""
+        self.__dict__.update(state)
+        self._reset()
+
+    def applies(self, endpoint):
+        """Return whether requests to `endpoint` may be hedged."""
+        if self.endpoints is not None:
+            return endpoint.name in self.endpoints
+        action = endpoint.name.rpartition('.')[2]
+        return endpoint.method == 'GET' and endpoint.idempotent and action.startswith('get')
+
+    def delay(self, name):
+        """Return the seconds after which a request to endpoint `name` is hedged, or None."""
+        with self._lock:
+            samples = sorted(self._latencies.get(name, ()))
+        if len(samples) < max(1, self.min_samples):
+            return self.default_delay
+        return max(self.min_delay, samples[int(self.percentile * (len(samples) - 1))])
+
+    def _record(self, name, latency):
+        with self._lock:
+            samples = self._latencies.get(name)
+            if samples is None:
+                samples = self._latencies[name] = deque(maxlen=self.window)
+            samples.append(latency)
+
+    def _has_budget(self):
+        with self._lock:
+            return self._hedged < self.budget * self._requests
+
+    def _take_budget(self):
+        with self._lock:
+            if self._hedged < self.budget * self._requests:
+                self._hedged += 1
+                return True
+            self._denied += 1
+            return False
+
+    def call(self, name, send, max_workers=None):
+        """Call `send()`, and again if it is slow; return the first response.
+
+        Args:
+            name (str): Endpoint name, keying the latency history.
+            send (Callable): Sends the request and returns the response.
+            max_workers (int, optional): Size of the hedge pool to use, unless
+                `max_workers` was set on the policy.
+
+        Returns:
+            requests.Response: the first response; the other one is closed.
+        """
+        delay = self.delay(name)
+        with self._lock:
+            self._requests += 1
+        start = time.time()
+        if delay is None or not self._has_budget():
+            resp = send()
+            latency = time.time() - start
+            self._record(name, latency)
+            if delay is not None and latency > delay:
+                with self._lock:
+                    self._denied += 1
+            return resp
+        send = bind(send)
+        primary = self._threads.submit(send)
+        primary.add_done_callback(
+            lambda future: future.exception() is None and self._record(name, time.time() - start))
+        done, _ = wait([primary], timeout=delay)
+        if done or not self._take_budget():
+            return primary.result()
+        workers = self.max_workers or max_workers or 16
+        with self._lock:
+            executor = self._executors.get(workers)
+            if executor is None:
+                executor = self._executors[workers] = ThreadPoolExecutor(max_workers=workers)
+        hedge = executor.submit(send)
+        pending = [primary, hedge]
+        while True:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            winner = next((f for f in pending if f in done and f.exception() is None), None)
+            if winner is None:
+                pending = [f for f in pending if f not in done]
+                if pending:
+                    continue
+                return hedge.result()  # both failed
+            break
+        if winner is hedge:
+            with self._lock:
+                self._wins += 1
+        for future in pending:
+            if future is not winner:
+                future.add_done_callback(_discard)
+        return winner.result()
+
+    def stats(self):
+        """Return hedging metrics.
+
+        Returns:
+            dict: `requests` (hedgeable requests), `hedged` (hedges sent),
+                `wins` (hedges answering first), `denied` (hedges over budget)
+                and `delays` (endpoint name to current hedge delay).
+        """
+        with self._lock:
+            names = list(self._latencies)
+            stats = {'requests': self._requests, 'hedged': self._hedged, 'wins': self._wins,
+                     'denied': self._denied}
+        stats['delays'] = dict((name, self.delay(name)) for name in names)
+        return stats
+
+    def shutdown(self, wait=True):
+        """Stop the hedging threads."""
+        with self._lock:
+            executors, self._executors = list(self._executors.values()), {}
+            threads, self._threads = self._threads, _Threads()
+        for executor in executors:
+            executor.shutdown(wait=wait)
+        threads.shutdown(wait=wait)
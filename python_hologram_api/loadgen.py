@@ -0,0 +1,130 @@
+"""Load generator module.
+
+Runs a weighted mix of client calls concurrently and reports throughput
+and latency percentiles, overall and per operation. Combine it with
+`StubServer` to load test offline::
+
+    with StubServer(devices=1000, latency=lognormal(0.03)) as stub:
+        client = HologramClient('key', base_url=stub.base_url, transport=Transport(pool_maxsize=16))
+        print(format_report(run_load(client, 'dashboard', requests=5000, workers=16)))
+"""
+
+from collections import namedtuple
+import random
+import time
+
+from .concurrency import run_concurrently
+
+
+LoadReport = namedtuple('LoadReport', ['requests', 'errors', 'seconds', 'throughput', 'p50', 'p99', 'operations'])
+"""The outcome of a load run. `operations` maps each operation name to an OperationStats."""
+
+OperationStats = namedtuple('OperationStats', ['count', 'errors', 'p50', 'p99'])
+"""Latency percentiles of one operation, in seconds."""
+
+
+def _device(rng, devices):
+    return rng.randint(1, devices)
+
+
+def workloads(devices=100):
+    """Return the built-in workloads for a fleet of `devices` devices with IDs 1 to `devices`.
+
+    Returns:
+        dict: workload name to a list of `(weight, operation name, function of client and rng)`.
+    """
+    return {
+        'dashboard': [
+            (40, 'devices.get', lambda c, r: c.devices.get(_device(r, devices))),
+            (30, 'cell.get_link', lambda c, r: c.cell.get_link(_device(r, devices))),
+            (10, 'devices.list', lambda c, r: c.devices.list()),
+            (10, 'data_plans.list', lambda c, r: c.data_plans.list()),
+            (10, 'tags.list', lambda c, r: c.tags.list()),
+        ],
+        'operations': [
+            (30, 'cell.pause_link', lambda c, r: c.cell.pause_link(_device(r, devices))),
+            (30, 'cell.unpause_link', lambda c, r: c.cell.unpause_link(_device(r, devices))),
+            (20, 'cell.change_plan', lambda c, r: c.cell.change_plan(_device(r, devices), r.randint(1, 3), 1)),
+            (20, 'tags.link_devices', lambda c, r: c.tags.link_devices(1, [_device(r, devices)])),
+        ],
+        'messaging': [
+            (70, 'csr.send_message', lambda c, r: c.csr.send_message(_device(r, devices), 'ping')),
+            (30, 'csr.list_messages', lambda c, r: c.csr.list_messages(limit=10)),
+        ],
+    }
+
+
+def _percentile(values, q):
+    return values[int(q * (len(values) - 1))] if values else 0.0
+
+
+def run_load(client, workload='dashboard', requests=1000, workers=8, devices=100, seed=None):
+    """Run `requests` calls of a workload with `workers` threads.
+
+    A call fails when it raises or returns an unsuccessful response.
+
+    Args:
+        client (HologramClient): Client to load.
+        workload (str or list, optional): A name of `workloads()` or a list of
+            `(weight, operation name, function of client and rng)`.
+        requests (int, optional): Number of calls.
+        workers (int, optional): Concurrent calls.
+        devices (int, optional): Fleet size for the built-in workloads.
+        seed (int, optional): Seed of the operation choices.
+
+    Returns:
+        LoadReport: the throughput and latencies.
+    """
+    mix = workloads(devices)[workload] if not isinstance(workload, list) else workload
+    rng = random.Random(seed)
+    weights = [weight for weight, _, _ in mix]
+    total_weight = float(sum(weights))
+
+    def choose():
+        roll = rng.random() * total_weight
+        for weight, name, func in mix:
+            roll -= weight
+            if roll < 0:
+                return name, func
+        return mix[-1][1:]
+
+    calls = [choose() + (random.Random(rng.random()),) for _ in range(requests)]
+
+    def call(item):
+        name, func, call_rng = item
+        start = time.time()
+        try:
+            resp = func(client, call_rng)
+            ok = not isinstance(resp, dict) or bool(resp.get('success'))
+        except Exception:
+            ok = False
+        return time.time() - start, ok
+
+    start = time.time()
+    latencies = {}
+    errors = {}
+    for result in run_concurrently(call, calls, max_workers=workers):
+        latency, ok = result.result
+        name = result.item[0]
+        latencies.setdefault(name, []).append(latency)
+        errors[name] = errors.get(name, 0) + (not ok)
+    seconds = time.time() - start
+    operations = {}
+    for name, values in latencies.items():
+        values.sort()
+        operations[name] = OperationStats(len(values), errors[name], _percentile(values, 0.5),
+                                          _percentile(values, 0.99))
+    every = sorted(v for values in latencies.values() for v in values)
+    return LoadReport(len(every), sum(errors.values()), seconds, len(every) / max(seconds, 1e-9),
+                      _percentile(every, 0.5), _percentile(every, 0.99), operations)
+
+
+def format_report(report):
+    """Return a LoadReport as a human readable table."""
+    lines = ['{} requests, {} errors in {:.2f}s: {:.1f} req/s, p50 {:.1f} ms, p99 {:.1f} ms'.format(
+        report.requests, report.errors, report.seconds, report.throughput, report.p50 * 1e3, report.p99 * 1e3)]
+    for name in sorted(report.operations):
+        stats = report.operations[name]
+        lines.append('  {:<22} {:>6} calls {:>5} errors  p50 {:7.1f} ms  p99 {:7.1f} ms'.format(
+            name, stats.count, stats.errors, stats.p50 * 1e3, stats.p99 * 1e3))
+    return '\n'.join(lines)
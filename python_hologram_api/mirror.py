@@ -0,0 +1,294 @@
+"""Local fleet mirror module.
+
+`FleetMirror` copies devices, cellular links, device tags, data plans and
+organizations into an indexed SQLite database, so that fleet queries are
+answered locally instead of downloading every list again::
+
+    mirror = FleetMirror(client, '~/.cache/hologram-fleet.sqlite', org_id=1234)
+    mirror.sync()
+    mirror.links(state='PAUSED-USER', plan='Maker', tag='field-units')
+
+Syncs are incremental: the fetched records are compared to the previous sync
+with `DeltaWatcher`, and only added, changed and removed rows are written.
+`start()` syncs on a schedule from a background thread.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from .concurrency import run_concurrently
+from .reconcile import link_state
+from .watch import REMOVED, DeltaWatcher
+
+try:
+    string_types = basestring  # python 2
+except NameError:
+    string_types = str  # python 3
+
+
+SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS orgs (id INTEGER PRIMARY KEY, name TEXT, raw TEXT NOT NULL)',
+    'CREATE TABLE IF NOT EXISTS plans (id INTEGER PRIMARY KEY, name TEXT, raw TEXT NOT NULL)',
+    'CREATE INDEX IF NOT EXISTS plans_name ON plans (name)',
+    'CREATE TABLE IF NOT EXISTS tags (id INTEGER PRIMARY KEY, name TEXT, raw TEXT NOT NULL)',
+    'CREATE INDEX IF NOT EXISTS tags_name ON tags (name)',
+    'CREATE TABLE IF NOT EXISTS device_tags (tag_id INTEGER NOT NULL, device_id INTEGER NOT NULL, '
+    'PRIMARY KEY (tag_id, device_id))',
+    'CREATE INDEX IF NOT EXISTS device_tags_device ON device_tags (device_id)',
+    'CREATE TABLE IF NOT EXISTS devices (id INTEGER PRIMARY KEY, orgid INTEGER, name TEXT, raw TEXT NOT NULL)',
+    'CREATE INDEX IF NOT EXISTS devices_org ON devices (orgid)',
+    'CREATE INDEX IF NOT EXISTS devices_name ON devices (name)',
+    'CREATE TABLE IF NOT EXISTS links (id INTEGER PRIMARY KEY, deviceid INTEGER, orgid INTEGER, '
+    'state TEXT, plan_id INTEGER, sim TEXT, raw TEXT NOT NULL)',
+    'CREATE INDEX IF NOT EXISTS links_org_state_plan ON links (orgid, state, plan_id)',
+    'CREATE INDEX IF NOT EXISTS links_plan ON links (plan_id)',
+    'CREATE INDEX IF NOT EXISTS links_device ON links (deviceid)',
+    'CREATE TABLE IF NOT EXISTS syncs (name TEXT PRIMARY KEY, synced_at REAL NOT NULL, '
+    'rows INTEGER NOT NULL, changed INTEGER NOT NULL)',
+)
+
+
+def _row_org(org):
+    return org['id'], org.get('name')
+
+
+def _row_plan(plan):
+    return plan['id'], plan.get('name')
+
+
+def _row_tag(tag):
+    return tag['id'], tag.get('name')
+
+
+def _row_device(device):
+    return device['id'], device.get('orgid'), device.get('name')
+
+
+def _row_link(link):
+    return (link['id'], link.get('deviceid'), link.get('orgid'), (link.get('state') or '').upper() or None,
+            link_state(link).plan, link.get('sim'))
+
+
+TABLES = (
+    ('orgs', lambda client, org_id: client.org.list(), _row_org),
+    ('plans', lambda client, org_id: client.data_plans.list(), _row_plan),
+    ('tags', lambda client, org_id: client.tags.list(), _row_tag),
+    ('devices', lambda client, org_id: client.devices.list(org_id=org_id), _row_device),
+    ('links', lambda client, org_id: client.cell.list_links(org_id=org_id), _row_link),
+)
+"""Mirrored tables as (name, fetch function of client and org_id, indexed columns of a record)."""
+
+
+def _records(name, resp):
+    if not resp.get('success'):
+        raise RuntimeError('Listing {} failed: {}'.format(name, resp))
+    data = resp.get('data') or []
+    if isinstance(data, dict):  # List Device Tags nests the list under `tags`
+        data = data.get(name) or []
+    return data
+
+
+class FleetMirror(object):
+    """FleetMirror class. Safe for concurrent reads from many threads."""
+
+    def __init__(self, client, path, org_id=None, timeout=5.0):
+        """Open or create the mirror database.
+
+        Args:
+            client (HologramClient): Client used to sync.
+            path (str): Database file path.
+            org_id (int, optional): Only mirror devices and links of the given
+                organization ID.
+            timeout (float, optional): Seconds to wait for another writer's lock.
+        """
+        self.client = client
+        self.path = os.path.expanduser(path)
+        self.org_id = org_id
+        self.timeout = timeout
+        self.last_error = None
+        self._watchers = dict((name, DeltaWatcher(None)) for name, _, _ in TABLES)
+        self._local = threading.local()
+        self._sync_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        with self._connect() as db:
+            for statement in SCHEMA:
+                db.execute(statement)
+
+    def _connect(self):
+        """Return this thread's connection, reopening it after a fork."""
+        local = self._local
+        if getattr(local, 'pid', None) != os.getpid():
+            local.db = sqlite3.connect(self.path, timeout=self.timeout)
+            local.db.execute('PRAGMA journal_mode=WAL')
+            local.pid = os.getpid()
+        return local.db
+
+    def sync(self, tables=None):
+        """Fetch the mirrored lists and write what changed since the last sync.
+
+        The lists are fetched concurrently. The first sync of a table after
+        opening the mirror replaces its rows.
+
+        Args:
+            tables (Iterable[str], optional): Names of the tables to sync.
+                Defaults to every table.
+
+        Returns:
+            dict: table name to the number of rows written or deleted.
+        """
+        wanted = [t for t in TABLES if tables is None or t[0] in tables]
+        results = list(run_concurrently(lambda table: table[1](self.client, self.org_id), wanted,
+                                        max_workers=len(wanted) or 1))
+        for result in results:
+            if result.error is not None:
+                raise result.error
+        responses = dict((result.item[0], result.result) for result in results)
+        changed = {}
+        with self._sync_lock:
+            try:
+                with self._connect() as db:
+                    for name, _, columns in wanted:
+                        changed[name] = self._write(db, name, columns, _records(name, responses[name]))
+            except Exception:
+                for name, _, _ in wanted:  # rolled back: the next sync replaces the tables
+                    self._watchers[name] = DeltaWatcher(None)
+                raise
+        return changed
+
+    def _write(self, db, name, columns, records):
+        watcher = self._watchers[name]
+        full = not len(watcher)
+        deltas = watcher.diff(records)
+        if full:
+            db.execute('DELETE FROM {}'.format(name))
+            if name == 'tags':
+                db.execute('DELETE FROM device_tags')
+        removed = [(d.id,) for d in deltas if d.kind == REMOVED]
+        upserts = [d.record for d in deltas if d.kind != REMOVED]
+        db.executemany('DELETE FROM {} WHERE id = ?'.format(name), removed)
+        if upserts:
+            rows = [columns(r) + (json.dumps(r),) for r in upserts]
+            db.executemany('INSERT OR REPLACE INTO {} VALUES ({})'.format(name, ', '.join('?' * len(rows[0]))), rows)
+        if name == 'tags':
+            db.executemany('DELETE FROM device_tags WHERE tag_id = ?', removed + [(r['id'],) for r in upserts])
+            db.executemany('INSERT OR IGNORE INTO device_tags VALUES (?, ?)',
+                           [(r['id'], device_id) for r in upserts for device_id in r.get('deviceids') or ()])
+        db.execute('INSERT OR REPLACE INTO syncs VALUES (?, ?, ?, ?)', (name, time.time(), len(watcher), len(deltas)))
+        return len(deltas)
+
+    def start(self, interval=300.0):
+        """Sync now and then every `interval` seconds from a daemon thread.
+
+        Errors of background syncs are kept in `last_error`; the next sync is
+        attempted on schedule.
+        """
+        if self._thread is not None:
+            return
+        self._stop.clear()
+
+        def loop():
+            while True:
+                try:
+                    self.sync()
+                    self.last_error = None
+                except Exception as e:  # keep syncing on schedule
+                    self.last_error = e
+                if self._stop.wait(interval):
+                    return
+
+        self._thread = threading.Thread(target=loop, name='hologram-fleet-mirror')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        """Stop scheduled syncs."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def last_synced(self, name):
+        """Return the time of the last sync of table `name`, or None."""
+        row = self._connect().execute('SELECT synced_at FROM syncs WHERE name = ?', (name,)).fetchone()
+        return row and row[0]
+
+    def query(self, sql, params=()):
+        """Run a read-only SQL query against the mirror and return every row."""
+        return self._connect().execute(sql, params).fetchall()
+
+    def _select(self, table, where, params):
+        sql = 'SELECT raw FROM {}'.format(table)
+        if where:
+            sql += ' WHERE ' + ' AND '.join(where)
+        return [json.loads(row[0]) for row in self.query(sql + ' ORDER BY id', params)]
+
+    @staticmethod
+    def _by_id_or_name(column, table, value, where, params):
+        if isinstance(value, string_types):
+            where.append('{} IN (SELECT id FROM {} WHERE name = ?)'.format(column, table))
+        else:
+            where.append('{} = ?'.format(column))
+        params.append(value)
+
+    def devices(self, org_id=None, name=None, tag=None):
+        """Return the mirrored device records matching every given filter.
+
+        Args:
+            org_id (int, optional): Organization ID.
+            name (str, optional): Device name.
+            tag (int or str, optional): Tag ID or name.
+        """
+        where, params = [], []
+        if org_id is not None:
+            where.append('orgid = ?')
+            params.append(org_id)
+        if name is not None:
+            where.append('name = ?')
+            params.append(name)
+        if tag is not None:
+            self._by_id_or_name('device_tags.tag_id', 'tags', tag, where, params)
+            where[-1] = 'EXISTS (SELECT 1 FROM device_tags WHERE device_id = devices.id AND {})'.format(where[-1])
+        return self._select('devices', where, params)
+
+    def links(self, org_id=None, state=None, plan=None, tag=None, device_id=None):
+        """Return the mirrored cellular link records matching every given filter.
+
+        Args:
+            org_id (int, optional): Organization ID.
+            state (str, optional): Link state, e.g. 'LIVE' or 'PAUSED-USER'.
+            plan (int or str, optional): Data plan ID or name.
+            tag (int or str, optional): Tag ID or name of the link's device.
+            device_id (int, optional): Device ID.
+        """
+        where, params = [], []
+        if org_id is not None:
+            where.append('orgid = ?')
+            params.append(org_id)
+        if state is not None:
+            where.append('state = ?')
+            params.append(state.upper())
+        if plan is not None:
+            self._by_id_or_name('plan_id', 'plans', plan, where, params)
+        if device_id is not None:
+            where.append('deviceid = ?')
+            params.append(device_id)
+        if tag is not None:
+            self._by_id_or_name('device_tags.tag_id', 'tags', tag, where, params)
+            where[-1] = 'EXISTS (SELECT 1 FROM device_tags WHERE device_id = links.deviceid AND {})'.format(where[-1])
+        return self._select('links', where, params)
+
+    def tags(self):
+        """Return every mirrored tag record."""
+        return self._select('tags', (), ())
+
+    def plans(self):
+        """Return every mirrored data plan record."""
+        return self._select('plans', (), ())
+
+    def orgs(self):
+        """Return every mirrored organization record."""
+        return self._select('orgs', (), ())
@@ -1,10 +1,6 @@
 """Organization Account Management module."""
 
-try:
-    from urllib.parse import urljoin  # python 3
-except ImportError:
-    from urlparse import urljoin  # python 2
-import requests
+from . import endpoints
 
 
 class Organization(object):
@@ -27,12 +23,7 @@ class Organization(object):
         Returns:
             dict: the json response as a dictionary.
         """
-        url = urljoin(self.client.base_url, 'organizations')
-        params = {
-            'apikey': self.client.api_key
-        }
-        resp = requests.get(url, json=params)
-        return resp.json()
+        return self.client.call(endpoints.LIST_ORGS)
 
     def get(self, org_id):
         """Get an Organization.
@@ -43,12 +34,7 @@ class Organization(object):
         Returns:
             dict: the json response as a dictionary.
         """
-        url = urljoin(self.client.base_url, 'organizations/{}'.format(org_id))
-        params = {
-            'apikey': self.client.api_key
-        }
-        resp = requests.get(url, json=params)
-        return resp.json()
+        return self.client.call(endpoints.GET_ORG, org_id)
 
     def get_balance(self, org_id):
         """Get Current Balance.
@@ -59,12 +45,7 @@ class Organization(object):
         Returns:
             dict: the json response as a dictionary.
         """
-        url = urljoin(self.client.base_url, 'organizations/{}/balance'.format(org_id))
-        params = {
-            'apikey': self.client.api_key
-        }
-        resp = requests.get(url, json=params)
-        return resp.json()
+        return self.client.call(endpoints.GET_ORG_BALANCE, org_id)
 
     def add_balance(self, org_id, amount):
         """Add Balance.
@@ -79,13 +60,7 @@ class Organization(object):
         Returns:
             dict: the json response as a dictionary.
         """
-        url = urljoin(self.client.base_url, 'organizations/{}/balance'.format(org_id))
-        params = {
-            'apikey': self.client.api_key,
-            'addamount': amount
-        }
-        resp = requests.post(url, json=params)
-        return resp.json()
+        return self.client.call(endpoints.ADD_ORG_BALANCE, org_id, amount=amount)
 
     def balance_history(self, org_id):
         """Get Balance History.
@@ -98,9 +73,4 @@ class Organization(object):
         Returns:
             dict: the json response as a dictionary.
         """
-        url = urljoin(self.client.base_url, 'organizations/{}/balancehistory'.format(org_id))
-        params = {
-            'apikey': self.client.api_key
-        }
-        resp = requests.get(url, json=params)
-        return resp.json()
+        return self.client.call(endpoints.ORG_BALANCE_HISTORY, org_id)
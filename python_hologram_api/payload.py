@@ -0,0 +1,127 @@
+"""Binary payload module.
+
+Cloud messages carry at most `MAX_MESSAGE_SIZE` bytes of base64. Binary
+payloads (`bytes`, `bytearray`, `memoryview` or a file-like object) are read
+and base64 encoded one fragment at a time, slicing buffers with `memoryview`
+rather than copying them. A payload of up to `FRAGMENT_SIZE` bytes is sent as
+a single message, unchanged, unless its first byte is the 0xF7 fragment magic:
+such a payload is sent as a single fragment (index 0, last), so that it is not
+mistaken for one. A larger payload is split into fragments, each starting
+with a 6 byte big-endian header::
+
+    magic (1 byte, 0xF7) | flags (1 byte, bit 0: last) | message id (2 bytes) | index (2 bytes)
+
+Devices collect the fragments of a message id and concatenate them by index
+once the last one has arrived; `reassemble` is a reference implementation.
+"""
+
+import base64
+import itertools
+import random
+import struct
+
+
+MAX_MESSAGE_SIZE = 10000
+"""Maximum base64 length of one message."""
+
+HEADER = struct.Struct('>BBHH')
+MAGIC = 0xF7
+LAST = 0x01
+
+FRAGMENT_SIZE = MAX_MESSAGE_SIZE // 4 * 3 - HEADER.size
+"""Payload bytes per fragment; a multiple of 3, so fragments encode without padding."""
+
+MAX_FRAGMENTS = 0x10000
+
+
+def is_binary(data):
+    """Return whether `data` is a binary payload rather than text."""
+    if isinstance(data, (bytearray, memoryview)) or hasattr(data, 'read'):
+        return True
+    return isinstance(data, bytes) and bytes is not str  # on python 2, str is text
+
+
+def _chunks(data, size):
+    """Yield consecutive chunks of `size` bytes (the last may be shorter) without copying buffers."""
+    if not hasattr(data, 'read'):
+        view = memoryview(data)
+        for start in range(0, len(view), size):
+            yield view[start:start + size]
+        return
+    while True:
+        chunk = data.read(size)
+        if not chunk:
+            return
+        while len(chunk) < size:  # unbuffered streams may return short reads
+            more = data.read(size - len(chunk))
+            if not more:
+                break
+            chunk += more
+        yield chunk
+
+
+def _b64(chunk):
+    return base64.b64encode(chunk).decode('ascii')
+
+
+def encode(data, message_id=None):
+    """Yield the base64 messages of a binary payload.
+
+    Args:
+        data (bytes, bytearray, memoryview or file-like): The payload.
+        message_id (int, optional): Fragment header message id. Random by default.
+
+    Yields:
+        str: one message if the payload fits in `FRAGMENT_SIZE` bytes and
+            does not start with `MAGIC`, else the fragments, in order.
+
+    Raises:
+        ValueError: if the payload needs more than 65536 fragments.
+    """
+    chunks = _chunks(data, FRAGMENT_SIZE)
+    current = next(chunks, b'')
+    following = next(chunks, None)
+    if following is None:
+        if not len(current) or bytearray(current[:1])[0] != MAGIC:
+            yield _b64(current)
+            return
+        rest = ()
+    else:
+        rest = itertools.chain([following], chunks)
+    if message_id is None:
+        message_id = random.getrandbits(16)
+    index = -1
+    for index, following in enumerate(rest):
+        if index + 1 >= MAX_FRAGMENTS:
+            raise ValueError('Payload is larger than {} bytes'.format(MAX_FRAGMENTS * FRAGMENT_SIZE))
+        yield _b64(HEADER.pack(MAGIC, 0, message_id, index)) + _b64(current)
+        current = following
+    yield _b64(HEADER.pack(MAGIC, LAST, message_id, index + 1)) + _b64(current)
+
+
+def parse_fragment(raw):
+    """Split a decoded fragment into `(message_id, index, last, chunk)`.
+
+    Raises:
+        ValueError: if `raw` does not start with a fragment header.
+    """
+    if len(raw) < HEADER.size:
+        raise ValueError('Not a fragment')
+    magic, flags, message_id, index = HEADER.unpack(bytes(raw[:HEADER.size]))
+    if magic != MAGIC:
+        raise ValueError('Not a fragment')
+    return message_id, index, bool(flags & LAST), raw[HEADER.size:]
+
+
+def reassemble(fragments):
+    """Rebuild a payload from the decoded fragments of one message, in any order.
+
+    Raises:
+        ValueError: if fragments are missing or belong to different messages.
+    """
+    parsed = sorted((parse_fragment(raw) for raw in fragments), key=lambda f: f[1])
+    if not parsed or len(set(f[0] for f in parsed)) != 1:
+        raise ValueError('Fragments of exactly one message are required')
+    if [f[1] for f in parsed] != list(range(len(parsed))) or not parsed[-1][2]:
+        raise ValueError('Fragments are missing')
+    return b''.join(bytes(f[3]) for f in parsed)
@@ -0,0 +1,226 @@
+"""Cellular Link reconciliation module."""
+
+from collections import namedtuple, OrderedDict
+
+from .concurrency import RateLimiter, bulk_workers, run_concurrently
+from .deadline import current_deadline
+
+try:
+    string_types = basestring  # python 2
+except NameError:
+    string_types = str  # python 3
+
+
+LinkState = namedtuple('LinkState', ['plan', 'tier', 'overage_limit', 'paused'])
+"""The reconcilable state of a Cellular Link."""
+
+Action = namedtuple('Action', ['link_id', 'method', 'args'])
+"""A single `CellularLinks` mutation: `getattr(client.cell, method)(link_id, *args)`."""
+
+ActionResult = namedtuple('ActionResult', ['action', 'response', 'error'])
+"""The outcome of an applied Action."""
+
+
+class ActionSkipped(Exception):
+    """The error of an Action not applied because an earlier one of its link failed, or never started."""
+
+
+def link_state(link):
+    """Extract the reconcilable state of a link record from List Cellular Links.
+
+    Args:
+        link (dict): A single entry of the `data` list.
+
+    Returns:
+        LinkState: the current state of the link.
+    """
+    plan = link.get('plan')
+    tier = link.get('tier')
+    if isinstance(plan, dict):
+        if tier is None:
+            tier = plan.get('tier', plan.get('zone'))
+        plan = plan.get('id')
+    if plan is None:
+        plan = link.get('planid')
+    state = (link.get('state') or '').upper()
+    return LinkState(
+        plan=plan,
+        tier=tier,
+        overage_limit=link.get('overagelimit'),
+        paused=state.startswith('PAUSE'))
+
+
+def describe(action):
+    """Return a one line, human readable description of an Action."""
+    return '{}({})'.format(action.method, ', '.join(str(a) for a in (action.link_id,) + action.args))
+
+
+class LinkReconciler(object):
+    """LinkReconciler class.
+
+    Diffs a desired state for many Cellular Links against their current state
+    and issues only the `CellularLinks` mutations needed to converge.
+
+    Desired state is a mapping of link id to a dict with any of the keys
+    `plan`, `tier`, `overage_limit` and `paused`. Missing keys are left alone.
+    `plan` may be a plan ID or a plan name; names are resolved with a single
+    List Data Plans call.
+    """
+
+    def __init__(self, client, max_workers=None, rate=None):
+        """Initialize the reconciler.
+
+        Args:
+            client (HologramClient): Client used to read and mutate links.
+            max_workers (int, optional): Number of links mutated concurrently.
+                Defaults to `bulk_workers(client)`.
+            rate (float, optional): Maximum mutations per second. Unlimited by default.
+        """
+        self.client = client
+        self.max_workers = bulk_workers(client, max_workers)
+        self.rate_limiter = RateLimiter(rate) if rate else None
+
+    def current_state(self, org_id=None):
+        """Load the current state of every link with one List Cellular Links call.
+
+        Args:
+            org_id (int, optional): Only load links of the given organization ID.
+
+        Returns:
+            dict: link id to LinkState.
+        """
+        resp = self.client.cell.list_links(org_id=org_id)
+        if not resp.get('success'):
+            raise RuntimeError('List Cellular Links failed: {}'.format(resp))
+        return dict((link['id'], link_state(link)) for link in resp.get('data') or [])
+
+    def resolve_plans(self, desired):
+        """Replace plan names in `desired` with plan IDs.
+
+        List Data Plans is only called when at least one plan is given by name.
+
+        Args:
+            desired (dict): link id to desired state dict.
+
+        Returns:
+            dict: a copy of `desired` in which every plan is an ID.
+        """
+        names = set(d['plan'] for d in desired.values() if isinstance(d.get('plan'), string_types))
+        if not names:
+            return desired
+        resp = self.client.data_plans.list()
+        if not resp.get('success'):
+            raise RuntimeError('List Data Plans failed: {}'.format(resp))
+        ids = dict((plan['name'], plan['id']) for plan in resp.get('data') or [] if 'name' in plan)
+        unknown = names - set(ids)
+        if unknown:
+            raise ValueError('Unknown data plans: {}'.format(', '.join(sorted(unknown))))
+        resolved = {}
+        for link_id, state in desired.items():
+            state = dict(state)
+            if state.get('plan') in names:
+                state['plan'] = ids[state['plan']]
+            resolved[link_id] = state
+        return resolved
+
+    def diff(self, desired, current):
+        """Compute the Actions converging `current` to `desired`.
+
+        Args:
+            desired (dict): link id to desired state dict, with plans as IDs.
+            current (dict): link id to LinkState.
+
+        Returns:
+            OrderedDict: link id to the list of Actions for that link, in the
+                order they must be applied. Links without changes are omitted.
+        """
+        plan = OrderedDict()
+        for link_id in sorted(desired):
+            want = desired[link_id]
+            if link_id not in current:
+                raise KeyError('Unknown link: {}'.format(link_id))
+            have = current[link_id]
+            actions = []
+            if want.get('paused') is False and have.paused:
+                actions.append(Action(link_id, 'unpause_link', ()))
+            new_plan = want.get('plan', have.plan)
+            new_tier = want.get('tier', have.tier)
+            if (new_plan, new_tier) != (have.plan, have.tier):
+                actions.append(Action(link_id, 'change_plan', (new_plan, new_tier)))
+            limit = want.get('overage_limit')
+            if limit is not None and limit != have.overage_limit:
+                actions.append(Action(link_id, 'change_overage_limit', (limit,)))
+            if want.get('paused') is True and not have.paused:
+                actions.append(Action(link_id, 'pause_link', ()))
+            if actions:
+                plan[link_id] = actions
+        return plan
+
+    def plan(self, desired, org_id=None):
+        """Compute the Actions needed to reach `desired` without applying them.
+
+        Args:
+            desired (dict): link id to desired state dict.
+            org_id (int, optional): Organization the links belong to.
+
+        Returns:
+            List[Action]: the actions, grouped by link.
+        """
+        grouped = self.diff(self.resolve_plans(desired), self.current_state(org_id))
+        return [action for actions in grouped.values() for action in actions]
+
+    def apply(self, desired, org_id=None, dry_run=False):
+        """Reconcile links to `desired`.
+
+        The actions of one link are applied in order; different links are
+        mutated concurrently. A failed action skips the remaining actions of
+        its link. A plan change whose tier is unknown fails without a call.
+
+        Args:
+            desired (dict): link id to desired state dict.
+            org_id (int, optional): Organization the links belong to.
+            dry_run (bool, optional): Only compute the actions.
+
+        Returns:
+            List[ActionResult]: one per action. With `dry_run` the response and
+                error of every result are None. Actions not applied have an
+                ActionSkipped error.
+        """
+        grouped = self.diff(self.resolve_plans(desired), self.current_state(org_id))
+        if dry_run:
+            return [ActionResult(a, None, None) for actions in grouped.values() for a in actions]
+        results = []
+        pending = dict(grouped)
+        for bulk in run_concurrently(self._apply_link, grouped.values(),
+                                     max_workers=self.max_workers):
+            del pending[bulk.item[0].link_id]
+            if bulk.error is not None:  # e.g. the deadline passed in the rate limiter
+                results.extend(ActionResult(a, None, ActionSkipped(str(bulk.error))) for a in bulk.item)
+            else:
+                results.extend(bulk.result)
+        for actions in pending.values():  # not started before the deadline
+            results.extend(ActionResult(a, None, ActionSkipped('Not started before the deadline')) for a in actions)
+        return results
+
+    def _apply_link(self, actions):
+        results = []
+        for action in actions:
+            if action.method == 'change_plan' and action.args[1] is None:
+                results.append(ActionResult(action, None, ValueError(
+                    'The tier of link {} is unknown; give a tier to change its plan'.format(action.link_id))))
+                break
+            try:
+                if self.rate_limiter is not None:
+                    self.rate_limiter.acquire(current_deadline())
+                resp = getattr(self.client.cell, action.method)(action.link_id, *action.args)
+            except Exception as e:
+                results.append(ActionResult(action, None, e))
+                break
+            if not resp.get('success'):
+                results.append(ActionResult(action, resp, RuntimeError(resp.get('error', resp))))
+                break
+            results.append(ActionResult(action, resp, None))
+        failed = describe(actions[len(results) - 1]) if results else None
+        results.extend(ActionResult(action, None, ActionSkipped('Skipped after {} failed'.format(failed)))
+                       for action in actions[len(results):])
+        return results
@@ -1,10 +1,6 @@
 """Spacebridge module."""
 
-try:
-    from urllib.parse import urljoin  # python 3
-except ImportError:
-    from urlparse import urljoin  # python 2
-import requests
+from . import endpoints
 
 
 class Spacebridge(object):
@@ -30,13 +26,7 @@ class Spacebridge(object):
         Returns:
             dict: the json response as a dictionary.
         """
-        url = urljoin(self.client.base_url, 'tunnelkeys')
-        params = {
-            'apikey': self.client.api_key,
-            'public_key': public_key
-        }
-        resp = requests.post(url, json=params)
-        return resp.json()
+        return self.client.call(endpoints.ADD_PUBLIC_KEY, public_key=public_key)
 
     def list_public_keys(self, with_disabled=False):
         """List Public Keys.
@@ -50,13 +40,7 @@ class Spacebridge(object):
         if type(with_disabled) is not bool:
             raise TypeError("`with_disabled` must be a boolean.")
         with_disabled = 1 if with_disabled else 0
-        url = urljoin(self.client.base_url, 'tunnelkeys')
-        params = {
-            'apikey': self.client.api_key,
-            'withdisabled': with_disabled
-        }
-        resp = requests.get(url, json=params)
-        return resp.json()
+        return self.client.call(endpoints.LIST_PUBLIC_KEYS, with_disabled=with_disabled)
 
     def disable_key(self, tunnel_key_id):
         """Disable a Key.
@@ -67,12 +51,7 @@ class Spacebridge(object):
         Returns:
             dict: the json response as a dictionary.
         """
-        url = urljoin(self.client.base_url, 'tunnelkeys/{}/disable'.format(tunnel_key_id))
-        params = {
-            'apikey': self.client.api_key,
-        }
-        resp = requests.post(url, json=params)
-        return resp.json()
+        return self.client.call(endpoints.DISABLE_KEY, tunnel_key_id)
 
     def enable_key(self, tunnel_key_id):
         """Enable a Key.
@@ -83,9 +62,4 @@ class Spacebridge(object):
         Returns:
             dict: the json response as a dictionary.
         """
-        url = urljoin(self.client.base_url, 'tunnelkeys/{}/enable'.format(tunnel_key_id))
-        params = {
-            'apikey': self.client.api_key,
-        }
-        resp = requests.post(url, json=params)
-        return resp.json()
+        return self.client.call(endpoints.ENABLE_KEY, tunnel_key_id)
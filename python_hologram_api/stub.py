@@ -0,0 +1,361 @@
+"""Local Hologram API stand-in module.
+
+`StubServer` serves the endpoints of `python_hologram_api.endpoints` from an
+in-memory fleet on a local port, with injected latency, errors and 429s, so
+that code using the client can be exercised and load tested offline::
+
+    with StubServer(devices=500, latency=lognormal(0.05, 0.5), error_rate=0.01, throttle_rate=0.02) as stub:
+        client = HologramClient('key', base_url=stub.base_url)
+        client.cell.pause_link(1)
+
+The fleet is generated from `seed`: devices, one cellular link each, data
+plans, tags and one organization. Mutations such as plan changes, pauses and
+tag links are applied to it; endpoints without a stub implementation answer
+with an empty successful response.
+"""
+
+from collections import Counter
+import json
+import math
+import random
+import re
+import threading
+import time
+
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer  # python 3
+    from socketserver import ThreadingMixIn
+    from urllib.parse import parse_qsl, urlsplit
+except ImportError:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer  # python 2
+    from SocketServer import ThreadingMixIn
+    from urlparse import parse_qsl, urlsplit
+
+from . import endpoints
+
+
+def constant(seconds):
+    """Return a latency distribution always taking `seconds`."""
+    return lambda rng: seconds
+
+
+def uniform(low, high):
+    """Return a latency distribution uniform between `low` and `high` seconds."""
+    return lambda rng: rng.uniform(low, high)
+
+
+def lognormal(median, sigma=0.5):
+    """Return a log-normal latency distribution, the usual long-tailed shape of API latency."""
+    mu = math.log(median)
+    return lambda rng: rng.lognormvariate(mu, sigma)
+
+
+class StubError(Exception):
+    """Raised by stub handlers to answer with an unsuccessful response."""
+
+    def __init__(self, message, status=404):
+        """Initialize with the error message and HTTP status."""
+        super(StubError, self).__init__(message)
+        self.status = status
+
+
+class Fleet(object):
+    """Fleet class. The in-memory records served by a StubServer."""
+
+    def __init__(self, devices=100, seed=None):
+        """Generate `devices` devices with their links, plus plans, tags and an organization."""
+        rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.orgs = {1: {'id': 1, 'name': 'Stub Org', 'is_personal': 0}}
+        self.plans = dict((i, {'id': i, 'name': name, 'data': data, 'tiers': {'1': {'price': price}}})
+                          for i, (name, data, price) in enumerate(
+                              [('Flexible', 0, 0.4), ('Maker', 1000000, 1.0), ('Pro', 10000000, 5.0)], 1))
+        self.devices = {}
+        self.links = {}
+        for i in range(1, devices + 1):
+            plan = self.plans[rng.randint(1, len(self.plans))]
+            self.links[i] = {
+                'id': i, 'deviceid': i, 'orgid': 1, 'sim': str(8900000000000000000 + i), 'tier': 1,
+                'state': rng.choice(['LIVE'] * 9 + ['PAUSED-USER']), 'plan': {'id': plan['id'], 'name': plan['name']},
+                'overagelimit': 100}
+            self.devices[i] = {'id': i, 'orgid': 1, 'name': 'device-{}'.format(i), 'type': 'Cellular',
+                               'links': {'cellular': [{'id': i, 'sim': self.links[i]['sim']}]}}
+        self.tags = dict((i, {'id': i, 'name': name, 'deviceids': sorted(rng.sample(
+            list(self.devices), min(len(self.devices), rng.randint(0, 20))))})
+            for i, name in enumerate(['field', 'lab', 'spares'], 1))
+        self.messages = []
+        self.balance = 100.0
+        self.history = []
+
+
+def _get(table, record_id):
+    record = table.get(int(record_id))
+    if record is None:
+        raise StubError('Not found')
+    return record
+
+
+def _link_state(fleet, params, link_id):
+    link = _get(fleet.links, link_id)
+    link['state'] = 'PAUSED-USER' if params.get('state') == 'pause' else 'LIVE'
+    return link
+
+
+def _change_plan(fleet, params, link_id):
+    link = _get(fleet.links, link_id)
+    plan = _get(fleet.plans, params['plan'])
+    link['plan'] = {'id': plan['id'], 'name': plan['name']}
+    link['tier'] = params.get('tier', 1)
+    return link
+
+
+def _overage_limit(fleet, params, link_id):
+    link = _get(fleet.links, link_id)
+    link['overagelimit'] = int(params['limit'])
+    return link
+
+
+def _tag_devices(fleet, params, tag_id, link):
+    tag = _get(fleet.tags, tag_id)
+    ids = set(tag['deviceids'])
+    changed = set(int(i) for i in params.get('deviceids') or ())
+    tag['deviceids'] = sorted(ids | changed if link else ids - changed)
+    return {'tags': [tag]}
+
+
+def _create_tag(fleet, params):
+    tag_id = max(fleet.tags or [0]) + 1
+    fleet.tags[tag_id] = {'id': tag_id, 'name': params.get('name'), 'deviceids': []}
+    return {'tags': [fleet.tags[tag_id]]}
+
+
+def _delete_tag(fleet, params, tag_id):
+    _get(fleet.tags, tag_id)
+    del fleet.tags[int(tag_id)]
+    return {}
+
+
+def _send_csr(fleet, params):
+    message = {'id': len(fleet.messages) + 1, 'deviceid': params.get('deviceid'), 'data': params.get('data'),
+               'logged': time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime())}
+    fleet.messages.append(message)
+    return message
+
+
+def _add_balance(fleet, params, *args):
+    amount = float(params.get('addamount') or 0)
+    fleet.balance += amount
+    fleet.history.append({'time': time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime()), 'amount': amount,
+                          'type': 'ADD', 'description': 'Stub balance'})
+    return {'balance': fleet.balance}
+
+
+def _balance(fleet, params, *args):
+    return {'balance': fleet.balance, 'currency': 'USD'}
+
+
+def _filter_org(records, params):
+    org_id = params.get('orgid')
+    return [r for r in records if org_id is None or r['orgid'] == int(org_id)]
+
+
+HANDLERS = {
+    'cell.list_links': lambda f, p: _filter_org(sorted(f.links.values(), key=lambda r: r['id']), p),
+    'cell.get_link': lambda f, p, i: _get(f.links, i),
+    'cell.change_plan': _change_plan,
+    'cell.change_overage_limit': _overage_limit,
+    'cell.pause_link': _link_state,
+    'cell.unpause_link': _link_state,
+    'devices.list': lambda f, p: _filter_org(sorted(f.devices.values(), key=lambda r: r['id']), p),
+    'devices.get': lambda f, p, i: _get(f.devices, i),
+    'data_plans.list': lambda f, p: sorted(f.plans.values(), key=lambda r: r['id']),
+    'data_plans.get': lambda f, p, i: _get(f.plans, i),
+    'tags.list': lambda f, p: {'tags': sorted(f.tags.values(), key=lambda r: r['id'])},
+    'tags.create': _create_tag,
+    'tags.delete': _delete_tag,
+    'tags.link_devices': lambda f, p, i: _tag_devices(f, p, i, True),
+    'tags.unlink_devices': lambda f, p, i: _tag_devices(f, p, i, False),
+    'org.list': lambda f, p: list(f.orgs.values()),
+    'org.get': lambda f, p, i: _get(f.orgs, i),
+    'org.get_balance': _balance,
+    'org.add_balance': _add_balance,
+    'org.balance_history': lambda f, p, i: f.history,
+    'user.get_info': lambda f, p: {'id': 1, 'first': 'Stub', 'last': 'User', 'email': 'stub@example.com'},
+    'user.get_balance': _balance,
+    'user.add_balance': _add_balance,
+    'user.balance_history': lambda f, p: f.history,
+    'csr.send_message': _send_csr,
+    'csr.list_messages': lambda f, p: f.messages[-int(p.get('limit') or 100):],
+}
+"""Endpoint name to `handler(fleet, params, *path_args)` returning the response `data`."""
+
+
+def _routes():
+    routes = []
+    for ep in endpoints.REGISTRY.values():
+        pattern = re.compile('^' + re.escape(ep.path).replace(r'\{\}', '([^/]+)') + '$')
+        routes.append((ep.method, pattern, ep))
+    # Static paths first, so that e.g. 'devices/tags' is not taken for 'devices/{}'.
+    routes.sort(key=lambda route: (route[2].path.count('{}'), route[2].name))
+    return routes
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True  # headers and body are written separately
+
+    def _handle(self):
+        stub = self.server.stub
+        body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        url = urlsplit(self.path)
+        params = dict(parse_qsl(url.query))
+        if body:
+            params.update(json.loads(body.decode('utf-8')) or {})
+        status, payload, headers = stub.respond(self.command, url.path, params)
+        data = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    do_GET = do_POST = do_DELETE = do_PUT = _handle
+
+    def log_message(self, *args):
+        pass
+
+
+class _Server(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class StubServer(object):
+    """StubServer class.
+
+    Attributes:
+        fleet (Fleet): The served records.
+        requests (Counter): `(endpoint name, status)` to the number of requests.
+    """
+
+    def __init__(self, devices=100, latency=None, endpoint_latency=None, error_rate=0.0, throttle_rate=0.0,
+                 api_key=None, seed=None, host='127.0.0.1', port=0):
+        """Initialize the server; it starts with `start()` or as a context manager.
+
+        Args:
+            devices (int, optional): Number of generated devices and links.
+            latency (float or Callable, optional): Seconds added to every
+                response, or a distribution such as `lognormal(0.05)`.
+            endpoint_latency (dict, optional): Endpoint name to a latency
+                overriding `latency`.
+            error_rate (float, optional): Fraction of requests answered with 500.
+            throttle_rate (float, optional): Fraction of requests answered with
+                429 and a `Retry-After` header.
+            api_key (str, optional): When given, authenticated endpoints
+                require it.
+            seed (int, optional): Seed of the fleet and of the injected faults.
+            host (str, optional): Interface to listen on.
+            port (int, optional): Port to listen on; a free port by default.
+        """
+        self.fleet = Fleet(devices, seed)
+        self.latency = self._distribution(latency)
+        self.endpoint_latency = dict((name, self._distribution(value))
+                                     for name, value in (endpoint_latency or {}).items())
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.api_key = api_key
+        self.requests = Counter()
+        self._count_lock = threading.Lock()
+        self._rng = random.Random(seed)
+        self._routes = _routes()
+        self._address = (host, port)
+        self._server = None
+        self._thread = None
+
+    @staticmethod
+    def _distribution(latency):
+        if latency is None or callable(latency):
+            return latency
+        return constant(latency)
+
+    @property
+    def base_url(self):
+        """Return the base url to give to HologramClient."""
+        host, port = self._server.server_address[:2]
+        return 'http://{}:{}/api/1/'.format(host, port)
+
+    def start(self):
+        """Start serving from a daemon thread."""
+        self._server = _Server(self._address, _Handler)
+        self._server.stub = self
+        self._thread = threading.Thread(target=self._server.serve_forever, name='hologram-stub')
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop serving and close the socket."""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._thread.join()
+            self._server = self._thread = None
+
+    def __enter__(self):
+        """Start the server."""
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        """Stop the server."""
+        self.stop()
+
+    def _route(self, method, path, params):
+        """Find the endpoint of a request; endpoints sharing a path are told apart by their fixed fields."""
+        prefix = '/api/1/'
+        if path.startswith(prefix):
+            path = path[len(prefix):]
+        path = path.strip('/')
+        found = None, ()
+        for route_method, pattern, ep in self._routes:
+            match = route_method == method and pattern.match(path)
+            if match:
+                if all(params.get(field) == value for field, value in ep.fixed.items()):
+                    return ep, match.groups()
+                if found[0] is None:
+                    found = ep, match.groups()
+        return found
+
+    def respond(self, method, path, params):
+        """Return the `(status, json payload, headers)` answering a request."""
+        ep, args = self._route(method, path, params)
+        name = ep.name if ep is not None else None
+        status, payload, headers = self._answer(ep, args, params)
+        with self._count_lock:
+            self.requests[(name, status)] += 1
+        return status, payload, headers
+
+    def _answer(self, ep, args, params):
+        if ep is None:
+            return 404, {'success': False, 'error': 'Unknown endpoint'}, ()
+        latency = self.endpoint_latency.get(ep.name, self.latency)
+        if latency is not None:
+            time.sleep(max(0.0, latency(self._rng)))
+        roll = self._rng.random()
+        if roll < self.throttle_rate:
+            return 429, {'success': False, 'error': 'Too Many Requests'}, (('Retry-After', '1'),)
+        if roll < self.throttle_rate + self.error_rate:
+            return 500, {'success': False, 'error': 'Internal Server Error'}, ()
+        if ep.auth and self.api_key is not None and params.get('apikey') != self.api_key:
+            return 401, {'success': False, 'error': 'Unauthorized'}, ()
+        handler = HANDLERS.get(ep.name)
+        if handler is None:
+            return 200, {'success': True, 'data': {}}, ()
+        try:
+            with self.fleet.lock:
+                data = handler(self.fleet, params, *args)
+        except StubError as e:
+            return e.status, {'success': False, 'error': str(e)}, ()
+        except (KeyError, ValueError) as e:
+            return 400, {'success': False, 'error': 'Bad request: {}'.format(e)}, ()
+        return 200, {'success': True, 'data': data}, ()
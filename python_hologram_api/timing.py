@@ -0,0 +1,206 @@
+"""Request timing module.
+
+`Transport(timing=True)` mounts a `TimingAdapter`, which breaks every request
+down into DNS resolution, TCP connect, TLS handshake, time to first byte and
+body download, and notes whether a pooled connection was reused. The
+breakdown is attached to each response as `response.timing` and aggregated
+per endpoint in `Transport.timing_stats`.
+"""
+
+from collections import deque
+import socket
+import threading
+import time
+
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+
+PHASES = ('dns', 'connect', 'tls', 'ttfb', 'download', 'total')
+"""Timing phases, in seconds."""
+
+_current = threading.local()
+
+
+class Timing(object):
+    """Timing class. The phase durations of one request, in seconds.
+
+    `dns`, `connect` and `tls` are 0 when a pooled connection was reused.
+    """
+
+    __slots__ = PHASES + ('reused', '_start', '_sent')
+
+    def __init__(self):
+        """Start timing a request."""
+        for phase in PHASES:
+            setattr(self, phase, 0.0)
+        self.reused = True
+        self._start = self._sent = time.time()
+
+    def as_dict(self):
+        """Return the phases and `reused` as a dictionary."""
+        d = dict((phase, getattr(self, phase)) for phase in PHASES)
+        d['reused'] = self.reused
+        return d
+
+    def __repr__(self):
+        """Return `<Timing phase=ms ...>`."""
+        return '<Timing {} reused={}>'.format(
+            ' '.join('{}={:.1f}ms'.format(p, getattr(self, p) * 1000) for p in PHASES), self.reused)
+
+
+class _TimingMixin(object):
+    """Records connection setup and first byte times into the current Timing."""
+
+    def _new_conn(self):
+        timing = getattr(_current, 'timing', None)
+        if timing is None:
+            return super(_TimingMixin, self)._new_conn()
+        timing.reused = False
+        start = time.time()
+        host = self._dns_host
+        try:
+            address = socket.getaddrinfo(host, self.port, 0, socket.SOCK_STREAM)[0][4][0]
+        except socket.gaierror:
+            address = host  # let urllib3 raise its own resolution error
+        resolved = time.time()
+        timing.dns = resolved - start
+        self._dns_host = address
+        try:
+            return super(_TimingMixin, self)._new_conn()
+        except Exception:
+            if address == host:
+                raise
+            # fall back to letting urllib3 try every resolved address
+            self._dns_host = host
+            return super(_TimingMixin, self)._new_conn()
+        finally:
+            self._dns_host = host
+            timing.connect = time.time() - resolved
+
+    def connect(self):
+        timing = getattr(_current, 'timing', None)
+        start = time.time()
+        super(_TimingMixin, self).connect()
+        if timing is not None:
+            timing.tls = max(0.0, time.time() - start - timing.dns - timing.connect)
+            timing._sent = time.time()
+
+    def getresponse(self, *args, **kwargs):
+        response = super(_TimingMixin, self).getresponse(*args, **kwargs)
+        timing = getattr(_current, 'timing', None)
+        if timing is not None:
+            timing.ttfb = time.time() - timing._sent
+        return response
+
+
+class TimingHTTPConnection(_TimingMixin, HTTPConnection):
+    """HTTP connection recording its timing."""
+
+
+class TimingHTTPSConnection(_TimingMixin, HTTPSConnection):
+    """HTTPS connection recording its timing."""
+
+
+class TimingHTTPConnectionPool(HTTPConnectionPool):
+    """HTTP connection pool of TimingHTTPConnections."""
+
+    ConnectionCls = TimingHTTPConnection
+
+
+class TimingHTTPSConnectionPool(HTTPSConnectionPool):
+    """HTTPS connection pool of TimingHTTPSConnections."""
+
+    ConnectionCls = TimingHTTPSConnection
+
+
+class TimingAdapter(HTTPAdapter):
+    """TimingAdapter class. An HTTPAdapter whose connections record timings."""
+
+    def init_poolmanager(self, *args, **kwargs):
+        """Create the pool manager with timing connection pools."""
+        super(TimingAdapter, self).init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': TimingHTTPConnectionPool,
+            'https': TimingHTTPSConnectionPool,
+        }
+
+
+def timed(send):
+    """Call `send()`, returning its response with a `timing` attribute."""
+    timing = _current.timing = Timing()
+    try:
+        response = send()
+    finally:
+        _current.timing = None
+    end = time.time()
+    timing.total = end - timing._start
+    timing.download = max(0.0, timing.total - (timing._sent - timing._start) - timing.ttfb)
+    response.timing = timing
+    return response
+
+
+class TimingStats(object):
+    """TimingStats class.
+
+    Aggregates Timings per endpoint. Percentiles are computed over the last
+    `window` requests of each endpoint.
+    """
+
+    def __init__(self, window=1024):
+        """Initialize with no samples."""
+        self.window = window
+        self._samples = {}
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        """Return the state to pickle, without the lock."""
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        """Restore a pickled recorder, or reset one in a forked child, with a new lock."""
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def record(self, endpoint, timing):
+        """Add the Timing of a request to `endpoint`."""
+        with self._lock:
+            samples = self._samples.get(endpoint)
+            if samples is None:
+                samples = self._samples[endpoint] = deque(maxlen=self.window)
+            samples.append(timing)
+            self._counts[endpoint] = self._counts.get(endpoint, 0) + 1
+
+    def summary(self):
+        """Return per endpoint statistics.
+
+        Returns:
+            dict: endpoint to a dict with `count`, `reused` (fraction of
+                requests on a pooled connection) and, for every phase, a dict
+                with `mean`, `p50` and `p99` seconds.
+        """
+        with self._lock:
+            samples = dict((k, list(v)) for k, v in self._samples.items())
+            counts = dict(self._counts)
+        summary = {}
+        for endpoint, timings in samples.items():
+            stats = {'count': counts[endpoint], 'reused': sum(t.reused for t in timings) / float(len(timings))}
+            for phase in PHASES:
+                values = sorted(getattr(t, phase) for t in timings)
+                stats[phase] = {
+                    'mean': sum(values) / len(values),
+                    'p50': values[int(0.50 * (len(values) - 1))],
+                    'p99': values[int(0.99 * (len(values) - 1))],
+                }
+            summary[endpoint] = stats
+        return summary
+
+    def clear(self):
+        """Forget every sample."""
+        with self._lock:
+            self._samples.clear()
+            self._counts.clear()
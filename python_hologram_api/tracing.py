@@ -0,0 +1,104 @@
+"""Tracing module.
+
+`HologramClient(tracer=...)` emits one span per resource method call, named
+after the endpoint (e.g. `hologram cell.change_plan`), with one child span
+per HTTP attempt. Two tracers are provided:
+
+* `InMemoryTracer` keeps finished spans in a list; it has no dependencies
+  and is meant for tests and ad-hoc profiling.
+* `OpenTelemetryTracer` forwards spans to OpenTelemetry, when installed.
+"""
+
+from contextlib import contextmanager
+import itertools
+import threading
+import time
+
+
+class Span(object):
+    """Span class. A timed operation recorded by `InMemoryTracer`."""
+
+    __slots__ = ('name', 'span_id', 'parent_id', 'attributes', 'start', 'end', 'error')
+
+    def __init__(self, name, span_id, parent_id=None, attributes=None):
+        """Start the span."""
+        self.name = name
+        self.span_id = span_id
+        self.parent_id = parent_id
+        self.attributes = dict(attributes or {})
+        self.start = time.time()
+        self.end = None
+        self.error = None
+
+    def set_attribute(self, key, value):
+        """Set an attribute."""
+        self.attributes[key] = value
+
+    def record_exception(self, error):
+        """Record the exception that ended the span."""
+        self.error = error
+
+    @property
+    def duration(self):
+        """Return the span duration in seconds, None while it is open."""
+        return None if self.end is None else self.end - self.start
+
+    def __repr__(self):
+        """Return `<Span name duration>`."""
+        return '<Span {} {}>'.format(self.name, self.duration)
+
+
+class InMemoryTracer(object):
+    """InMemoryTracer class.
+
+    Records finished spans in `spans`, in the order they end. Spans opened
+    while another span is open on the same thread become its children.
+    """
+
+    def __init__(self):
+        """Initialize with no spans."""
+        self.spans = []
+        self._ids = itertools.count(1)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name, attributes=None):
+        """Open a span for the duration of the `with` block."""
+        stack = self._local.__dict__.setdefault('stack', [])
+        span = Span(name, next(self._ids), stack[-1].span_id if stack else None, attributes)
+        stack.append(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.record_exception(e)
+            raise
+        finally:
+            stack.pop()
+            span.end = time.time()
+            with self._lock:
+                self.spans.append(span)
+
+    def children(self, span):
+        """Return the finished children of `span`."""
+        return [s for s in self.spans if s.parent_id == span.span_id]
+
+    def clear(self):
+        """Forget every finished span."""
+        with self._lock:
+            del self.spans[:]
+
+
+class OpenTelemetryTracer(object):
+    """OpenTelemetryTracer class. Requires the `opentelemetry-api` package."""
+
+    def __init__(self, tracer=None):
+        """Wrap an OpenTelemetry tracer, by default `get_tracer('python_hologram_api')`."""
+        if tracer is None:
+            from opentelemetry import trace
+            tracer = trace.get_tracer('python_hologram_api')
+        self.tracer = tracer
+
+    def span(self, name, attributes=None):
+        """Open a span, as the current span, for the duration of the `with` block."""
+        return self.tracer.start_as_current_span(name, attributes=attributes)
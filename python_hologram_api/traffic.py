@@ -0,0 +1,328 @@
+"""CSR message traffic analytics module.
+
+Requires NumPy (``pip install python_hologram_api[analytics]``).
+
+`MessageTraffic` keeps List CSR Messages records as NumPy columns and
+computes per-device or per-topic counts, payload bytes and rates per time
+bucket, and finds devices that went silent, without per-message Python
+loops. Pages are added as they arrive; messages seen twice are counted once::
+
+    traffic = MessageTraffic()
+    traffic.poll(client, org_id=12)           # fetches every page of messages since the last poll
+    buckets, devices, counts = traffic.counts('m', by='device')
+    silent, last_seen = traffic.silent(threshold=3600)
+"""
+
+import json
+import time
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    raise ImportError('python_hologram_api.traffic requires numpy: pip install python_hologram_api[analytics]')
+
+try:
+    string_types = basestring  # python 2
+except NameError:
+    string_types = str  # python 3
+
+
+UNITS = ('s', 'm', 'h', 'D', 'W')
+"""Bucket sizes: NumPy datetime units of fixed length."""
+
+
+def _topic(record):
+    """Return the topic of a message: its first tag not starting with an underscore, or None."""
+    tags = record.get('tags')
+    if tags is None:
+        data = record.get('data')
+        if isinstance(data, string_types) and data.startswith('{'):
+            try:
+                tags = json.loads(data).get('tags')
+            except ValueError:
+                tags = None
+    for tag in tags or ():
+        if not tag.startswith('_'):
+            return tag
+    return None
+
+
+def _logged(record):
+    """Return when a message was logged, from `logged` or else `timestamp`, or None."""
+    logged = record.get('logged')
+    return logged if logged is not None else record.get('timestamp')
+
+
+def _timestamps(values):
+    """Convert unix timestamps and/or date strings, possibly with fractions of seconds, to datetime64[s]."""
+    out = np.empty(len(values), dtype='datetime64[s]')
+    is_str = np.fromiter((isinstance(v, string_types) for v in values), dtype=bool, count=len(values))
+    if is_str.any():
+        out[is_str] = np.array([v for v, s in zip(values, is_str) if s], dtype='datetime64[us]').astype(
+            'datetime64[s]')
+    if not is_str.all():
+        out[~is_str] = np.array([v for v, s in zip(values, is_str) if not s], dtype='int64').astype('datetime64[s]')
+    return out
+
+
+class MessageTraffic(object):
+    """MessageTraffic class.
+
+    Columns, NumPy arrays of the same length sorted by time:
+
+    * `id` (int64): message ID, -1 if the record has none.
+    * `device_id` (int64): device the message came from, -1 if unknown.
+    * `topic` (int32): index of the topic in `topics`, -1 without a topic.
+    * `time` (datetime64[s]): when the message was logged.
+    * `size` (int64): length of the message `data`.
+
+    Added pages are merged into the columns when a column is next read. A
+    page of messages newer than those held costs a copy of the columns, not a
+    sort of them.
+    """
+
+    COLUMNS = ('id', 'device_id', 'topic', 'time', 'size')
+    DTYPES = ('int64', 'int64', 'int32', 'datetime64[s]', 'int64')
+
+    def __init__(self):
+        """Initialize an empty traffic history."""
+        self.topics = []
+        self._topic_codes = {}
+        self._columns = [np.empty(0, dtype=dtype) for dtype in self.DTYPES]
+        self._sorted_ids = np.empty(0, dtype='int64')
+        self._pages = []
+
+    id = property(lambda self: self._column(0))
+    device_id = property(lambda self: self._column(1))
+    topic = property(lambda self: self._column(2))
+    time = property(lambda self: self._column(3))
+    size = property(lambda self: self._column(4))
+
+    @classmethod
+    def from_response(cls, resp):
+        """Build from a List CSR Messages response dictionary."""
+        traffic = cls()
+        traffic.add_response(resp)
+        return traffic
+
+    def _code(self, topic):
+        if topic is None:
+            return -1
+        code = self._topic_codes.get(topic)
+        if code is None:
+            code = self._topic_codes[topic] = len(self.topics)
+            self.topics.append(topic)
+        return code
+
+    def add_records(self, records):
+        """Add the `data` list of a List CSR Messages response.
+
+        Records without a `logged` or `timestamp` time are skipped.
+
+        Returns:
+            int: the number of records given, including skipped ones.
+        """
+        given = len(records)
+        records = [r for r in records if _logged(r) is not None]
+        n = len(records)
+        if n:
+            self._pages.append((
+                np.fromiter((r.get('id', -1) for r in records), dtype='int64', count=n),
+                np.fromiter((r.get('deviceid') or -1 for r in records), dtype='int64', count=n),
+                np.fromiter((self._code(_topic(r)) for r in records), dtype='int32', count=n),
+                _timestamps([_logged(r) for r in records]),
+                np.fromiter((len(r.get('data') or '') for r in records), dtype='int64', count=n)))
+        return given
+
+    def add_response(self, resp):
+        """Add a List CSR Messages response dictionary.
+
+        Returns:
+            int: the number of records in the response.
+        """
+        if not resp.get('success'):
+            raise RuntimeError('List CSR Messages failed: {}'.format(resp))
+        return self.add_records(resp.get('data') or [])
+
+    def poll(self, client, limit=1000, **filters):
+        """Add the messages logged since the latest one held, a page at a time.
+
+        Pages are fetched until one comes back with fewer than `limit`
+        messages, whether the API returns the oldest or the newest messages
+        of a page first.
+
+        Args:
+            client (HologramClient): the client to fetch with.
+            limit (int, optional): Messages per page.
+            **filters: `device_id`, `org_id` or `topic_name` of `list_messages`.
+
+        Returns:
+            int: the number of records fetched. Messages of the second a page
+                ends on are fetched again but counted once.
+
+        Raises:
+            RuntimeError: if a call fails, or more than `limit` messages were
+                logged in a single second, so that paging cannot advance.
+        """
+        start = int(self.time[-1].astype('int64')) if len(self) else None
+        end = None
+        fetched = 0
+        while True:
+            resp = client.csr.list_messages(limit=limit, time_stamp_start=start, time_stamp_end=end, **filters)
+            n = self.add_response(resp)
+            fetched += n
+            if limit is None or n < limit:
+                return fetched
+            times = _timestamps([t for t in map(_logged, resp['data']) if t is not None]).astype('int64')
+            if not len(times):
+                raise RuntimeError('A full page of messages without times cannot be paged')
+            if times[0] > times[-1]:  # newest first: page back through the older messages
+                page = start, int(times.min()) + 1
+            else:
+                page = int(times.max()), end
+            if page == (start, end):
+                raise RuntimeError('More than {} messages were logged in one second: raise `limit`'.format(limit))
+            start, end = page
+
+    def _column(self, index):
+        if self._pages:
+            self._merge()
+        return self._columns[index]
+
+    def _merge(self):
+        """Fold the added pages into the columns, dropping messages whose ID is held already."""
+        pages, self._pages = self._pages, []
+        new = [np.concatenate([page[i] for page in pages]) for i in range(len(self.COLUMNS))]
+        ids = new[0]
+        _, first = np.unique(ids, return_index=True)
+        keep = ids < 0
+        keep[first] = True
+        held = self._sorted_ids
+        if len(held):
+            pos = np.minimum(np.searchsorted(held, ids), len(held) - 1)
+            keep &= (ids < 0) | (held[pos] != ids)
+        new = [column[keep] for column in new]
+        order = np.argsort(new[3], kind='mergesort')
+        new = [column[order] for column in new]
+        old = self._columns
+        if len(old[3]) and len(new[3]) and new[3][0] < old[3][-1]:
+            # an older page: merge it in time order
+            merged = [np.concatenate([a, b]) for a, b in zip(old, new)]
+            order = np.argsort(merged[3], kind='mergesort')
+            self._columns = [column[order] for column in merged]
+        else:
+            self._columns = [np.concatenate([a, b]) for a, b in zip(old, new)]
+        ids = np.sort(new[0][new[0] >= 0])
+        self._sorted_ids = np.insert(held, np.searchsorted(held, ids), ids)
+
+    def __len__(self):
+        """Return the number of messages."""
+        return len(self.id)
+
+    def _keys(self, by):
+        if by is None:
+            return np.array([None], dtype=object), np.zeros(len(self), dtype='intp')
+        if by == 'device':
+            keys, inverse = np.unique(self.device_id, return_inverse=True)
+            return keys, inverse.ravel()
+        if by == 'topic':
+            codes, inverse = np.unique(self.topic, return_inverse=True)
+            keys = np.array([self.topics[code] if code >= 0 else None for code in codes], dtype=object)
+            return keys, inverse.ravel()
+        raise ValueError('`by` must be None, "device" or "topic"')
+
+    def _table(self, unit, by, weights, start, end):
+        if unit not in UNITS:
+            raise ValueError('`unit` must be one of {}'.format(', '.join(UNITS)))
+        buckets = self.time.astype('datetime64[{}]'.format(unit))
+        keys, key_index = self._keys(by)
+        first = np.datetime64(start, unit) if start is not None else (buckets[0] if len(self) else None)
+        last = np.datetime64(end, unit) if end is not None else (buckets[-1] if len(self) else None)
+        if first is None or last is None or last < first:
+            return np.empty(0, dtype=buckets.dtype), keys[:0], np.zeros((0, 0))
+        periods = np.arange(first, last + 1)
+        inside = (buckets >= first) & (buckets <= last)
+        flat = key_index[inside] * len(periods) + (buckets[inside] - first).astype('int64')
+        table = np.bincount(flat, weights=None if weights is None else weights[inside],
+                            minlength=len(keys) * len(periods)).reshape(len(keys), len(periods))
+        return periods, keys, table
+
+    def counts(self, unit='m', by='device', start=None, end=None):
+        """Count messages per time bucket.
+
+        Args:
+            unit (str, optional): Bucket size, one of `UNITS`.
+            by (str, optional): `'device'`, `'topic'` or None for all messages.
+            start, end (optional): First and last bucket, as datetime64 or ISO
+                strings. Default to those of the first and last message, and
+                every bucket in between is included, empty or not.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray, np.ndarray]: bucket starts
+                (datetime64), keys (device IDs, topic names or `[None]`) and
+                an int64 table of counts with a row per key and a column per
+                bucket.
+        """
+        periods, keys, table = self._table(unit, by, None, start, end)
+        return periods, keys, table.astype('int64')
+
+    def sizes(self, unit='m', by='device', start=None, end=None):
+        """Sum the payload lengths per time bucket; arguments and result as for `counts`."""
+        periods, keys, table = self._table(unit, by, self.size.astype('float64'), start, end)
+        return periods, keys, table.astype('int64')
+
+    def rates(self, unit='m', by='device', start=None, end=None):
+        """Return messages per second in each time bucket; arguments and result as for `counts`."""
+        periods, keys, table = self._table(unit, by, None, start, end)
+        return periods, keys, table / (np.timedelta64(1, unit) / np.timedelta64(1, 's'))
+
+    def last_seen(self):
+        """Return the device IDs and the time of the latest message of each; messages without a device are left out."""
+        known = self.device_id >= 0
+        reverse = self.device_id[known][::-1]
+        devices, index = np.unique(reverse, return_index=True)
+        return devices, self.time[known][::-1][index]
+
+    def silent(self, threshold=3600, now=None, devices=None):
+        """Find devices without a message for `threshold` seconds.
+
+        Args:
+            threshold (float, optional): Seconds of silence.
+            now (optional): Reference time, as a unix timestamp or datetime64.
+                Defaults to the current time.
+            devices (Iterable[int], optional): Devices expected to send; those
+                without any message are silent too, with a last seen of NaT.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: device IDs and when each was last
+                seen, longest silent first.
+        """
+        ids, seen = self.last_seen()
+        if devices is not None:
+            expected = np.unique(np.asarray(list(devices), dtype='int64'))
+            never = np.setdiff1d(expected, ids)
+            ids = np.concatenate([never, ids])
+            seen = np.concatenate([np.full(len(never), np.datetime64('NaT'), dtype='datetime64[s]'), seen])
+        if now is None:
+            now = np.datetime64(int(time.time()), 's')
+        elif not isinstance(now, np.datetime64):
+            now = np.datetime64(int(now), 's')
+        cutoff = now - np.timedelta64(int(threshold), 's')
+        quiet = np.isnat(seen) | (seen <= cutoff)
+        ids, seen = ids[quiet], seen[quiet]
+        order = np.argsort(seen.view('int64'), kind='mergesort')  # NaT is the smallest int64
+        return ids[order], seen[order]
+
+    def gaps(self, min_gap=3600):
+        """Find silences of at least `min_gap` seconds between two messages of a known device.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray, np.ndarray]: device IDs, and the
+                times of the messages before and after each gap.
+        """
+        order = np.argsort(self.device_id, kind='mergesort')  # stays in time order per device
+        devices = self.device_id[order]
+        times = self.time[order]
+        hit = (devices[1:] == devices[:-1]) & (devices[1:] >= 0) & (
+            times[1:] - times[:-1] >= np.timedelta64(int(min_gap), 's'))
+        return devices[1:][hit], times[:-1][hit], times[1:][hit]
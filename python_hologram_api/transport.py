@@ -0,0 +1,265 @@
+"""HTTP transport module."""
+
+import os
+import re
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .cache import Revalidator, TTLCache
+from .concurrency import RateLimiter
+from .deadline import current_deadline, current_timeout
+from .getmany import GetManyPlanner
+from .timing import PHASES, TimingAdapter, TimingStats, timed
+from .warmup import CachedDNSAdapter, DNSCache, KeepAlive, warm_up
+
+
+_fork_lock = threading.Lock()
+
+
+def _url_template(url, endpoint):
+    """Return `url` with its path arguments, such as a webhook GUID, put back as the endpoint's ``{}``."""
+    if endpoint is None or '{}' not in endpoint.path:
+        return url
+    pattern = re.escape(endpoint.path).replace(re.escape('{}'), '[^/]*') + '$'
+    return re.sub(pattern, lambda match: endpoint.path, url)
+
+
+class Transport(object):
+    """Transport class.
+
+    Holds everything that can be shared between clients of different API
+    keys: the `requests.Session` and its connection pool, the request rate
+    budget, and the response cache. Cache entries are keyed by API key, so
+    sharing a transport never leaks responses between keys.
+
+    A transport is thread-safe and fork-safe: the first request in a forked
+    child rebuilds the session and the locks of its parts, leaving the
+    parent's connections alone. It is also picklable, to ship clients to
+    process pool workers; the copy starts with no connections.
+    """
+
+    def __init__(self, pool_maxsize=10, rate=None, cache_ttl=None, cache_size=1024, cache=None, timing=False,
+                 limiter=None, breakers=None, max_stale=0, hedging=None, dns_ttl=None):
+        """Initialize the transport.
+
+        Args:
+            pool_maxsize (int, optional): Maximum number of pooled connections per host.
+            rate (float, optional): Maximum requests per second across every
+                client using this transport. Unlimited by default.
+            cache_ttl (float, optional): Seconds to cache reference lookups such
+                as List Data Plans. Caching is disabled by default.
+            cache_size (int, optional): Maximum number of cached responses.
+            cache (object, optional): A cache to use instead of an in-memory
+                `TTLCache`, e.g. a `SQLiteCache` shared between processes.
+            timing (bool, optional): Record a DNS/connect/TLS/first byte/download
+                breakdown of every request, see `python_hologram_api.timing`.
+            limiter (AdaptiveLimiter, optional): Bounds the requests in flight,
+                adapting to 429s, 5xx responses and latency. Size bulk worker
+                pools to its `maximum`.
+            breakers (CircuitBreakers, optional): Fail fast with
+                `CircuitOpenError` while an endpoint group is failing.
+            max_stale (float, optional): Stale-while-revalidate: seconds past
+                `cache_ttl` an expired response is still served, immediately,
+                while a single background request refreshes it. A failed
+                refresh keeps the stale response. Disabled by default.
+            hedging (Hedging, optional): Resend slow read-only requests and
+                return the first response, see `python_hologram_api.hedging`.
+            dns_ttl (float, optional): Seconds to cache host name resolutions
+                for new connections. Resolved on every connection by default.
+        """
+        self.pool_maxsize = pool_maxsize
+        self.rate_limiter = RateLimiter(rate) if rate else None
+        if cache is None and cache_ttl:
+            cache = TTLCache(cache_ttl, cache_size, max_stale=max_stale)
+        self.cache = cache
+        self.revalidator = Revalidator()
+        self.timing_stats = TimingStats() if timing else None
+        self.limiter = limiter
+        self.breakers = breakers
+        self.hedging = hedging
+        self.hedge_workers = limiter.maximum if limiter is not None else pool_maxsize
+        self.dns_cache = DNSCache(dns_ttl) if dns_ttl else None
+        self.planners = {}
+        self._keepalive = None
+        self.session = self._new_session()
+        self._pid = os.getpid()
+
+    def _new_session(self):
+        session = requests.Session()
+        timing = self.timing_stats is not None
+        if self.dns_cache is not None:
+            adapter = CachedDNSAdapter(self.dns_cache, timing=timing, pool_maxsize=self.pool_maxsize)
+        else:
+            adapter = (TimingAdapter if timing else HTTPAdapter)(pool_maxsize=self.pool_maxsize)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+
+    def __getstate__(self):
+        """Return the state to pickle, without the session and keepalive."""
+        state = self.__dict__.copy()
+        del state['session'], state['_pid'], state['_keepalive']
+        return state
+
+    def __setstate__(self, state):
+        """Restore a pickled transport with a new session."""
+        self.__dict__.update(state)
+        self._keepalive = None
+        self.session = self._new_session()
+        self._pid = os.getpid()
+
+    def _after_fork(self):
+        """Give a forked child its own session and locks."""
+        with _fork_lock:
+            if self._pid == os.getpid():
+                return
+            for part in (self.rate_limiter, self.cache, self.timing_stats, self.limiter, self.breakers,
+                         self.revalidator, self.hedging, self.dns_cache) + tuple(self.planners.values()):
+                if part is not None and hasattr(part, '__setstate__'):
+                    part.__setstate__(part.__getstate__())
+            self._keepalive = None  # its thread was not forked
+            self.session = self._new_session()
+            self._pid = os.getpid()
+
+    def planner(self, api_key, name):
+        """Return the `get_many` cost model of resource `name` for `api_key`, shared by its clients."""
+        key = (api_key, name)
+        planner = self.planners.get(key)
+        if planner is None:
+            planner = self.planners.setdefault(key, GetManyPlanner())
+        return planner
+
+    def request(self, method, url, tracer=None, endpoint=None, **kwargs):
+        """Send a request, waiting for the rate budget first.
+
+        Args:
+            method (str): HTTP method.
+            url (str): Absolute URL.
+            tracer (object, optional): Records a span for the HTTP attempt.
+            endpoint (Endpoint, optional): The endpoint being called. Timings
+                are aggregated under its name and circuit breakers are kept
+                per endpoint group; both default to the url.
+            **kwargs: Passed to `requests.Session.request`. A `timeout()`
+                override replaces `timeout`, and the active `deadline()`
+                clamps it.
+
+        Returns:
+            requests.Response: the response. With timing enabled, its `timing`
+                attribute holds the request's `Timing`.
+
+        Raises:
+            CircuitOpenError: if the circuit breaker of the endpoint group is open.
+            DeadlineExceeded: if the active deadline passes before sending.
+        """
+        if self._pid != os.getpid():
+            self._after_fork()
+        dl = current_deadline()
+        if dl is not None:
+            dl.check()
+        if self.breakers is None:
+            return self._request(method, url, tracer, endpoint, None, dl, kwargs)
+        breaker = self.breakers.get(endpoint.group if endpoint is not None else url)
+        probe = breaker.before_request()
+        try:
+            return self._request(method, url, tracer, endpoint, breaker, dl, kwargs)
+        except Exception:
+            breaker.release(probe)  # no-op once the request was sent and its outcome recorded
+            raise
+
+    def _request(self, method, url, tracer, endpoint, breaker, dl, kwargs):
+        hedging = self.hedging
+        if hedging is not None and endpoint is not None and hedging.applies(endpoint):
+            send = self._hedged
+        else:
+            send = self._send
+        if tracer is None:
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire(dl)
+            return send(method, url, endpoint, breaker, dl, kwargs)
+        start = time.time()
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire(dl)
+        attributes = {'http.method': method, 'http.url': _url_template(url, endpoint),
+                      'hologram.rate_limit_wait': time.time() - start}
+        with tracer.span('HTTP ' + method, attributes) as span:
+            resp = send(method, url, endpoint, breaker, dl, kwargs)
+            span.set_attribute('http.status_code', resp.status_code)
+            span.set_attribute('http.response_content_length', len(resp.content or b''))
+            timing = getattr(resp, 'timing', None)
+            if timing is not None:
+                for phase in PHASES:
+                    span.set_attribute('http.timing.' + phase, getattr(timing, phase))
+                span.set_attribute('http.connection_reused', timing.reused)
+            return resp
+
+    def _hedged(self, method, url, endpoint, breaker, dl, kwargs):
+        return self.hedging.call(endpoint.name, lambda: self._send(method, url, endpoint, breaker, dl, dict(kwargs)),
+                                 self.hedge_workers)
+
+    def _send(self, method, url, endpoint, breaker, dl, kwargs):
+        limiter = self.limiter
+        if limiter is not None:
+            limiter.acquire(dl)
+            start = time.time()
+        override = current_timeout()
+        if override is not None:
+            kwargs['timeout'] = override
+        if dl is not None:
+            try:
+                kwargs['timeout'] = dl.clamp(kwargs.get('timeout'))
+            except Exception:
+                if limiter is not None:
+                    limiter.cancel()
+                raise
+        try:
+            if self.timing_stats is None:
+                resp = self.session.request(method, url, **kwargs)
+            else:
+                resp = timed(lambda: self.session.request(method, url, **kwargs))
+                self.timing_stats.record(endpoint.name if endpoint is not None else url, resp.timing)
+        except Exception:
+            if limiter is not None:
+                limiter.release(time.time() - start, overloaded=True)
+            if breaker is not None:
+                breaker.record_failure()
+            raise
+        if limiter is not None:
+            limiter.release(time.time() - start, overloaded=resp.status_code == 429 or resp.status_code >= 500)
+        if breaker is not None:
+            if self.breakers.is_failure(resp):
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+        return resp
+
+    def warm_up(self, url, connections=1, keepalive=None):
+        """Resolve the host of `url` and open pooled connections to it ahead of traffic.
+
+        Args:
+            url (str): Any url of the host, e.g. a client's base url.
+            connections (int, optional): Connections to open, at most `pool_maxsize`.
+            keepalive (float, optional): Seconds between keepalive pings of the
+                idle connections. Not pinged by default.
+
+        Returns:
+            int: the number of connections opened.
+        """
+        opened = warm_up(self.session, url, connections, self.dns_cache)
+        if keepalive:
+            if self._keepalive is not None:
+                self._keepalive.stop()
+            self._keepalive = KeepAlive(self.session, url, keepalive).start()
+        return opened
+
+    def close(self):
+        """Close the pooled connections and stop background refreshes, hedges and keepalive pings."""
+        if self._keepalive is not None:
+            self._keepalive.stop()
+            self._keepalive = None
+        self.revalidator.shutdown(wait=False)
+        if self.hedging is not None:
+            self.hedging.shutdown(wait=False)
+        self.session.close()
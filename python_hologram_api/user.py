@@ -1,10 +1,6 @@
 """User Account Management module."""
 
-try:
-    from urllib.parse import urljoin  # python 3
-except ImportError:
-    from urlparse import urljoin  # python 2
-import requests
+from . import endpoints
 
 
 class User(object):
@@ -24,12 +20,7 @@ class User(object):
         Returns:
             dict: the json response as a dictionary.
         """
-        url = urljoin(self.client.base_url, 'users/me')
-        params = {
-            'apikey': self.client.api_key
-        }
-        resp = requests.get(url, json=params)
-        return resp.json()
+        return self.client.call(endpoints.GET_USER)
 
     def get_balance(self):
         """Get Current Balance.
@@ -37,12 +28,7 @@ class User(object):
         Returns:
             dict: the json response as a dictionary.
         """
-        url = urljoin(self.client.base_url, 'users/me/balance')
-        params = {
-            'apikey': self.client.api_key
-        }
-        resp = requests.get(url, json=params)
-        return resp.json()
+        return self.client.call(endpoints.GET_USER_BALANCE)
 
     def add_balance(self, amount):
         """Add Balance.
@@ -56,13 +42,7 @@ class User(object):
         Returns:
             dict: the json response as a dictionary.
         """
-        url = urljoin(self.client.base_url, 'users/me/balance')
-        params = {
-            'apikey': self.client.api_key,
-            'addamount': amount
-        }
-        resp = requests.post(url, json=params)
-        return resp.json()
+        return self.client.call(endpoints.ADD_USER_BALANCE, amount=amount)
 
     def balance_history(self):
         """Get Balance History.
@@ -72,9 +52,4 @@ class User(object):
         Returns:
             dict: the json response as a dictionary.
         """
-        url = urljoin(self.client.base_url, 'users/me/balancehistory')
-        params = {
-            'apikey': self.client.api_key
-        }
-        resp = requests.get(url, json=params)
-        return resp.json()
+        return self.client.call(endpoints.USER_BALANCE_HISTORY)
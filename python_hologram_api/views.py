@@ -0,0 +1,145 @@
+"""Joined fleet views module.
+
+Showing devices with their cellular link, plan and organization one row at a
+time takes four lookups per device. `FleetView` joins them for a whole set
+of devices in a fixed number of rounds, whatever the number of devices::
+
+    view = FleetView(client)
+    for row in view.rows([12, 15, 17]):
+        print(row.flat())
+
+1. the devices, with `Devices.get_many`, unless device records are given;
+2. their links, with `CellularLinks.get_many`;
+3. their plans and organizations, each with one List call made concurrently.
+
+Plan and organization IDs are deduplicated, and the records are kept by the
+view so later calls only look up those not seen yet. The rare plans and
+organizations missing from their List call, such as the organizations of
+devices shared with you, are then fetched with concurrent Get calls.
+"""
+
+from collections import namedtuple
+import threading
+
+from .concurrency import bulk_workers, run_concurrently
+from .reconcile import link_state
+
+
+class FleetRow(namedtuple('FleetRow', ['device', 'link', 'plan', 'org'])):
+    """The records of one device, its cellular link, plan and organization; each may be None."""
+
+    __slots__ = ()
+
+    def flat(self):
+        """Return the row as one flat dict of the commonly displayed fields."""
+        device, link, plan, org = (record or {} for record in self)
+        return {
+            'device_id': device.get('id'),
+            'device_name': device.get('name'),
+            'org_id': org.get('id', device.get('orgid')),
+            'org_name': org.get('name'),
+            'link_id': link.get('id'),
+            'sim': link.get('sim'),
+            'state': link.get('state'),
+            'tier': link_state(link).tier if link else None,
+            'plan_id': plan.get('id'),
+            'plan_name': plan.get('name'),
+        }
+
+
+def _link_id(device):
+    links = (device.get('links') or {}).get('cellular') or ()
+    return links[0].get('id') if links else None
+
+
+def _records(resp, what):
+    if not resp.get('success'):
+        raise RuntimeError('{} failed: {}'.format(what, resp))
+    return resp.get('data') or []
+
+
+class FleetView(object):
+    """FleetView class. Thread-safe; keeps the plans and organizations it has seen."""
+
+    def __init__(self, client, max_workers=None):
+        """Initialize the view.
+
+        Args:
+            client (HologramClient): the client.
+            max_workers (int, optional): Concurrent Get calls. Defaults to
+                `bulk_workers(client)`.
+        """
+        self.client = client
+        self.max_workers = bulk_workers(client, max_workers)
+        self.plans = {}
+        self.orgs = {}
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        """Forget the plans and organizations seen so far."""
+        with self._lock:
+            self.plans = {}
+            self.orgs = {}
+
+    def rows(self, devices, org_id=None):
+        """Join devices with their link, plan and organization.
+
+        Args:
+            devices (Iterable): Device IDs, or device records such as the
+                `data` of List Devices. Unknown device IDs are skipped. The
+                link of a device is the first of its `links.cellular`.
+            org_id (int, optional): Organization of the devices, scoping List calls.
+
+        Returns:
+            List[FleetRow]: one row per device found, in the given order.
+        """
+        devices = list(devices)
+        ids = [device for device in devices if not isinstance(device, dict)]
+        if ids:
+            found = dict((record['id'], record) for record in self.client.devices.get_many(
+                ids, org_id=org_id, max_workers=self.max_workers).records)
+            devices = [found.get(device) if not isinstance(device, dict) else device for device in devices]
+            devices = [device for device in devices if device is not None]
+        link_ids = [link_id for link_id in (_link_id(device) for device in devices) if link_id is not None]
+        links = {}
+        if link_ids:
+            for link in self.client.cell.get_many(link_ids, org_id=org_id, max_workers=self.max_workers).records:
+                links[link['id']] = link
+        plan_ids = set(link_state(link).plan for link in links.values()) - set([None])
+        org_ids = set(device.get('orgid') for device in devices) - set([None])
+        self._resolve(plan_ids, org_ids)
+        rows = []
+        for device in devices:
+            link = links.get(_link_id(device))
+            plan = self.plans.get(link_state(link).plan) if link else None
+            rows.append(FleetRow(device, link, plan, self.orgs.get(device.get('orgid'))))
+        return rows
+
+    def _resolve(self, plan_ids, org_ids):
+        """Look up the plans and organizations not seen yet, in one concurrent round."""
+        with self._lock:
+            plan_ids = plan_ids - set(self.plans)
+            org_ids = org_ids - set(self.orgs)
+        lookups = []
+        if plan_ids:
+            lookups.append(('plans', plan_ids, self.client.data_plans.list, self.client.data_plans.get,
+                            'List Data Plans'))
+        if org_ids:
+            lookups.append(('orgs', org_ids, self.client.org.list, self.client.org.get, 'List Organizations'))
+        if not lookups:
+            return
+        for result in run_concurrently(self._lookup, lookups, max_workers=len(lookups)):
+            if result.error is not None:
+                raise result.error
+
+    def _lookup(self, lookup):
+        name, wanted, list_all, get, what = lookup
+        found = dict((record['id'], record) for record in _records(list_all(), what) if record.get('id') in wanted)
+        missing = [record_id for record_id in wanted if record_id not in found]
+        for result in run_concurrently(get, missing, max_workers=self.max_workers):
+            if result.error is not None:
+                raise result.error
+            if result.result.get('success'):
+                found[result.item] = result.result.get('data')
+        with self._lock:
+            getattr(self, name).update(found)
@@ -0,0 +1,257 @@
+"""Connection warm-up module.
+
+Keeps the first requests of a freshly started process off the slow path:
+
+* `DNSCache` resolves API hosts once per `ttl` instead of once per new
+  connection. `Transport(dns_ttl=300)` installs it.
+* `warm_up` resolves the host and opens pooled TLS connections ahead of
+  traffic; see `HologramClient.warm_up`.
+* `KeepAlive` sends a `HEAD` request over every idle pooled connection on an
+  interval, so that servers and load balancers do not close them between
+  bursts of traffic.
+
+Warm-up and keepalive work on the connection pool that `requests` would
+pick for the url, through urllib3's pool checkout methods.
+"""
+
+import socket
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+try:
+    from urllib.parse import urlsplit  # python 3
+except ImportError:
+    from urlparse import urlsplit  # python 2
+
+from .concurrency import run_concurrently
+from .timing import TimingHTTPConnection, TimingHTTPSConnection
+
+
+class DNSCache(object):
+    """DNSCache class. A thread-safe cache of host name resolutions."""
+
+    def __init__(self, ttl=300.0, resolver=socket.getaddrinfo):
+        """Initialize an empty cache.
+
+        Args:
+            ttl (float, optional): Seconds a resolution is reused.
+            resolver (Callable, optional): `getaddrinfo` compatible resolver.
+        """
+        self.ttl = ttl
+        self.resolver = resolver
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        """Return the state to pickle, without the lock."""
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        """Restore a pickled cache, or reset one in a forked child, with a new lock."""
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def resolve(self, host, port):
+        """Return the first address of `host`, resolving it at most once per `ttl`.
+
+        Raises:
+            socket.gaierror: if the host cannot be resolved. Failures are not cached.
+        """
+        key = (host, port)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None and entry[0] > now:
+            return entry[1]
+        address = self.resolver(host, port, 0, socket.SOCK_STREAM)[0][4][0]
+        with self._lock:
+            self._entries[key] = (now + self.ttl, address)
+        return address
+
+    def invalidate(self, host):
+        """Forget the resolutions of `host`."""
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == host]:
+                del self._entries[key]
+
+    def clear(self):
+        """Forget every resolution."""
+        with self._lock:
+            self._entries.clear()
+
+
+class _CachedDNSMixin(object):
+    """Connects to the address of the host found in `dns_cache`."""
+
+    dns_cache = None
+
+    def _new_conn(self):
+        host = self._dns_host
+        try:
+            address = self.dns_cache.resolve(host, self.port)
+        except socket.gaierror:
+            return super(_CachedDNSMixin, self)._new_conn()  # let urllib3 raise its own resolution error
+        self._dns_host = address
+        try:
+            return super(_CachedDNSMixin, self)._new_conn()
+        except Exception:
+            # the cached address may be gone: forget it and let urllib3 try every address
+            self.dns_cache.invalidate(host)
+            self._dns_host = host
+            return super(_CachedDNSMixin, self)._new_conn()
+        finally:
+            self._dns_host = host
+
+
+class CachedDNSAdapter(HTTPAdapter):
+    """Transport adapter resolving hosts through a DNSCache, optionally recording timings."""
+
+    def __init__(self, dns_cache, timing=False, **kwargs):
+        """Initialize the adapter; `kwargs` are passed to HTTPAdapter."""
+        self.dns_cache = dns_cache
+        self.timing = timing
+        super(CachedDNSAdapter, self).__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        """Create the pool manager with connections using the DNS cache."""
+        super(CachedDNSAdapter, self).init_poolmanager(*args, **kwargs)
+        classes = {}
+        for scheme, pool_cls, conn_cls in (
+                ('http', HTTPConnectionPool, TimingHTTPConnection if self.timing else HTTPConnection),
+                ('https', HTTPSConnectionPool, TimingHTTPSConnection if self.timing else HTTPSConnection)):
+            conn = type('CachedDNS' + conn_cls.__name__, (_CachedDNSMixin, conn_cls), {'dns_cache': self.dns_cache})
+            classes[scheme] = type('CachedDNS' + pool_cls.__name__, (pool_cls,), {'ConnectionCls': conn})
+        self.poolmanager.pool_classes_by_scheme = classes
+
+
+def connection_pool(session, url):
+    """Return the urllib3 connection pool `session` uses for `url`."""
+    adapter = session.get_adapter(url)
+    # the same settings as Session.request, so that the pool key matches
+    settings = session.merge_environment_settings(url, {}, None, None, None)
+    if hasattr(adapter, 'get_connection_with_tls_context'):  # requests >= 2.32
+        return adapter.get_connection_with_tls_context(
+            requests.Request('GET', url).prepare(), settings['verify'], settings['proxies'], settings['cert'])
+    return adapter.get_connection(url, settings['proxies'])
+
+
+def _checkout(pool, count, idle_only=False):
+    """Take up to `count` connections out of `pool`; only idle, already open ones if `idle_only`."""
+    conns = []
+    for _ in range(count):
+        if idle_only:
+            try:
+                conn = pool.pool.get(block=False)
+            except Exception:  # queue.Empty, or None once the pool is closed
+                break
+            if conn is None or conn.sock is None:
+                pool.pool.put(conn)
+                break
+        else:
+            conn = pool._get_conn()
+        conns.append(conn)
+    return conns
+
+
+def warm_up(session, url, connections=1, dns_cache=None):
+    """Resolve the host of `url` and open up to `connections` pooled connections to it.
+
+    Connections are opened concurrently, including their TLS handshake. The
+    number is capped at the pool size.
+
+    Returns:
+        int: the number of connections opened.
+    """
+    parts = urlsplit(url)
+    if dns_cache is not None:
+        dns_cache.resolve(parts.hostname, parts.port or (443 if parts.scheme == 'https' else 80))
+    pool = connection_pool(session, url)
+    conns = _checkout(pool, min(connections, pool.pool.maxsize))
+    try:
+        closed = [conn for conn in conns if conn.sock is None]
+        for result in run_concurrently(lambda conn: conn.connect(), closed, max_workers=len(closed) or 1):
+            if result.error is not None:
+                result.item.close()
+                raise result.error
+    finally:
+        for conn in conns:
+            pool._put_conn(conn)
+    return len(closed)
+
+
+class KeepAlive(object):
+    """KeepAlive class. Pings idle pooled connections from a daemon thread."""
+
+    def __init__(self, session, url, interval=30.0):
+        """Initialize the pinger; it starts with `start()`.
+
+        Args:
+            session (requests.Session): Session owning the pool.
+            url (str): Url whose pool is kept alive; pinged with `HEAD`.
+            interval (float, optional): Seconds between two rounds of pings.
+                Keep it below the server's idle timeout.
+        """
+        self.session = session
+        self.url = url
+        self.interval = interval
+        self.pings = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def ping(self):
+        """Send one `HEAD` over every idle pooled connection, closing those that fail.
+
+        Returns:
+            int: the number of connections pinged successfully.
+        """
+        pool = connection_pool(self.session, self.url)
+        conns = _checkout(pool, pool.pool.maxsize, idle_only=True)
+        path = urlsplit(self.url).path or '/'
+        ok = 0
+        for conn in conns:
+            try:
+                conn.request('HEAD', path, headers={'Connection': 'keep-alive'})
+                resp = conn.getresponse()
+                resp.read()
+                if (resp.headers.get('Connection') or '').lower() == 'close':
+                    conn.close()
+                else:
+                    ok += 1
+            except Exception:
+                conn.close()
+            finally:
+                pool._put_conn(conn)
+        self.pings += ok
+        return ok
+
+    def start(self):
+        """Start pinging every `interval` seconds."""
+        if self._thread is not None:
+            return self
+        self._stop.clear()
+
+        def loop():
+            while not self._stop.wait(self.interval):
+                try:
+                    self.ping()
+                except Exception:  # e.g. the pool was closed; try again next round
+                    pass
+
+        self._thread = threading.Thread(target=loop, name='hologram-keepalive')
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop pinging."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
@@ -0,0 +1,168 @@
+"""Change detection module.
+
+`DeltaWatcher` polls a list endpoint, such as List Devices or List Cellular
+Links, and reports only what changed since the previous poll. Instead of the
+previous records it keeps a fingerprint per record: a digest of the whole
+record, packed 8 byte digests of its fields and the values of the `keep`
+fields only, so unchanged records are skipped with a single comparison and
+memory stays small for large fleets. Digests are taken over the canonical
+JSON of each value, so a change of type (``1`` to ``true`` or ``1.0``) is a
+change.
+"""
+
+from collections import namedtuple
+import hashlib
+import json
+import time
+
+from .deadline import current_deadline
+
+
+ADDED = 'added'
+REMOVED = 'removed'
+CHANGED = 'changed'
+
+Delta = namedtuple('Delta', ['kind', 'id', 'record', 'changes'])
+"""A change of one record.
+
+`kind` is ADDED, REMOVED or CHANGED. `record` is the new record, or None when
+removed. `changes` is a tuple of FieldChange for CHANGED deltas, else empty.
+"""
+
+FieldChange = namedtuple('FieldChange', ['field', 'old', 'new'])
+"""A changed field. `old` is only known for fields the watcher `keep`s, else None."""
+
+
+FIELD_DIGEST_SIZE = 8
+"""Bytes kept per field, to tell which fields of a changed record changed."""
+
+
+def _field_digest(value):
+    return hashlib.md5(json.dumps(value, sort_keys=True).encode('utf-8')).digest()[:FIELD_DIGEST_SIZE]
+
+
+class DeltaWatcher(object):
+    """DeltaWatcher class.
+
+    Example:
+        >>> watcher = DeltaWatcher.links(client, keep=('state', 'plan'))
+        >>> for delta in watcher.poll():
+        ...     print(delta.kind, delta.id, [c.field for c in delta.changes])
+    """
+
+    def __init__(self, fetch, key='id', fields=None, keep=(), emit_initial=True):
+        """Initialize the watcher.
+
+        Args:
+            fetch (Callable): Returns a list response dictionary (with `data`)
+                or a list of records.
+            key (str, optional): Record field identifying a record.
+            fields (Iterable[str], optional): Fields to compare. Defaults to
+                every top level field.
+            keep (Iterable[str], optional): Fields whose previous values are
+                kept, so their FieldChanges carry the old value.
+            emit_initial (bool, optional): Whether the first poll reports every
+                record as added, or silently takes the baseline.
+        """
+        self.fetch = fetch
+        self.key = key
+        self.fields = tuple(sorted(fields)) if fields is not None else None
+        self.keep = frozenset(keep)
+        self.emit_initial = emit_initial
+        self._snapshot = None
+        self._schemas = {}
+
+    @classmethod
+    def devices(cls, client, org_id=None, **kwargs):
+        """Watch List Devices."""
+        return cls(lambda: client.devices.list(org_id=org_id), **kwargs)
+
+    @classmethod
+    def links(cls, client, org_id=None, **kwargs):
+        """Watch List Cellular Links."""
+        return cls(lambda: client.cell.list_links(org_id=org_id), **kwargs)
+
+    def __len__(self):
+        """Return the number of records in the last snapshot."""
+        return len(self._snapshot or ())
+
+    def _fingerprint(self, record):
+        names = self.fields or tuple(sorted(record))
+        schema = self._schemas.get(names)
+        if schema is None:  # share one tuple, and the digest of its field names, per schema
+            schema = self._schemas[names] = names, _field_digest(names)
+        names, names_digest = schema
+        digests = b''.join(_field_digest(record.get(name)) for name in names)
+        kept = tuple(record.get(name) for name in names if name in self.keep) if self.keep else ()
+        return hashlib.md5(names_digest + digests).digest(), names, digests, kept
+
+    def diff(self, records):
+        """Compare `records` to the last snapshot, and make them the new snapshot.
+
+        Args:
+            records (Iterable[dict]): the current records.
+
+        Returns:
+            List[Delta]: the changes.
+        """
+        previous = self._snapshot
+        emit = previous is not None or self.emit_initial
+        previous = previous or {}
+        current = {}
+        deltas = []
+        key = self.key
+        for record in records:
+            rid = record[key]
+            fingerprint = current[rid] = self._fingerprint(record)
+            old = previous.get(rid)
+            if old is None:
+                if emit:
+                    deltas.append(Delta(ADDED, rid, record, ()))
+            elif old[0] != fingerprint[0]:
+                deltas.append(Delta(CHANGED, rid, record, self._changes(old, fingerprint, record)))
+        if emit:
+            deltas.extend(Delta(REMOVED, rid, None, ()) for rid in previous if rid not in current)
+        self._snapshot = current
+        return deltas
+
+    def _changes(self, old, new, record):
+        _, old_names, old_digests, old_kept = old
+        _, names, digests, _ = new
+        size = FIELD_DIGEST_SIZE
+        old_by_name = dict((name, old_digests[i * size:(i + 1) * size]) for i, name in enumerate(old_names))
+        kept = dict(zip([n for n in old_names if n in self.keep], old_kept))
+        changes = []
+        for i, name in enumerate(names):
+            if old_by_name.pop(name, None) != digests[i * size:(i + 1) * size]:
+                changes.append(FieldChange(name, kept.get(name), record.get(name)))
+        changes.extend(FieldChange(name, kept.get(name), None) for name in old_by_name)
+        return tuple(changes)
+
+    def poll(self):
+        """Fetch the records and return the changes since the last poll."""
+        resp = self.fetch()
+        if isinstance(resp, dict):
+            if not resp.get('success'):
+                raise RuntimeError('Fetch failed: {}'.format(resp))
+            resp = resp.get('data') or []
+        return self.diff(resp)
+
+    def watch(self, interval=60.0):
+        """Poll forever, or until the active deadline, yielding every Delta.
+
+        Args:
+            interval (float, optional): Seconds between the start of two polls.
+
+        Yields:
+            Delta: the changes of each poll.
+        """
+        dl = current_deadline()
+        while True:
+            start = time.time()
+            for delta in self.poll():
+                yield delta
+            wait = interval - (time.time() - start)
+            if dl is not None and dl.remaining() <= max(wait, 0):
+                return
+            if wait > 0:
+                time.sleep(wait)
@@ -13,6 +13,7 @@ with open('HISTORY.rst') as history_file:
 
 requirements = [
     'requests',
+    'futures; python_version < "3"',
 ]
 
 setup_requirements = [
@@ -31,8 +32,16 @@ setup(
     author_email='victor@vicyap.com',
     url='https://github.com/vicyap/python-hologram-api',
     packages=find_packages(include=['python_hologram_api']),
+    entry_points={
+        'console_scripts': [
+            'hologram=python_hologram_api.cli:main',
+        ],
+    },
     include_package_data=True,
     install_requires=requirements,
+    extras_require={
+        'analytics': ['numpy'],
+    },
     license="MIT license",
     zip_safe=False,
     keywords='python_hologram_api',
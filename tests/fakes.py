@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+
+"""Offline stand-ins for `requests` objects used by the tests."""
+
+import threading
+
+
+class FakeResponse(object):
+    def __init__(self, json_data=None, status_code=200):
+        self._json = {'success': True} if json_data is None else json_data
+        self.status_code = status_code
+        self.content = b'{}'
+
+    def json(self):
+        return self._json
+
+    def close(self):
+        self.closed = True
+
+
+class FakeSession(object):
+    """Records every request and answers with `handler(method, url, **kwargs)`."""
+
+    def __init__(self, handler=None):
+        self.handler = handler
+        self.requests = []
+        self._lock = threading.Lock()
+
+    def request(self, method, url, **kwargs):
+        with self._lock:
+            self.requests.append((method, url, kwargs))
+        if self.handler is None:
+            return FakeResponse()
+        return self.handler(method, url, **kwargs)
+
+    def close(self):
+        pass
@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for `python_hologram_api.balance`."""
+
+import unittest
+
+try:
+    import numpy as np
+    from python_hologram_api.balance import BalanceHistory
+except ImportError:
+    np = None
+
+RECORDS = [
+    {'time': '2017-05-02 10:00:00', 'amount': '2.50', 'type': 'CHARGE', 'description': 'data'},
+    {'time': '2017-05-01 09:00:00', 'amount': '20.00', 'type': 'CREDIT', 'description': 'top up'},
+    {'time': 1496275200, 'amount': 7.25, 'type': 'charge', 'description': 'sms'},
+    {'time': '2017-06-03 12:00:00', 'amount': '0.75', 'type': 'CHARGE', 'description': 'data'},
+]
+
+
+@unittest.skipIf(np is None, 'numpy is not installed')
+class TestBalanceHistory(unittest.TestCase):
+    def setUp(self):
+        self.history = BalanceHistory.from_response({'success': True, 'data': RECORDS}, org_id=12)
+
+    def test_columns_sorted_and_signed(self):
+        """Test that records are sorted by time and charges are negative."""
+        self.assertEqual([20.0, -2.5, -7.25, -0.75], self.history.amount.tolist())
+        self.assertEqual([12] * 4, self.history.org_id.tolist())
+
+    def test_spend_by_period(self):
+        """Test monthly spend."""
+        periods, totals = self.history.spend_by_period('M')
+        self.assertEqual(['2017-05', '2017-06'], [str(p) for p in periods])
+        self.assertEqual([2.5, 8.0], totals.tolist())
+
+    def test_running_balance_and_top_charges(self):
+        """Test running balance and the largest charges."""
+        self.assertEqual([20.0, 17.5, 10.25, 9.5], self.history.running_balance().tolist())
+        top = self.history.top_charges(2)
+        self.assertEqual([-7.25, -2.5], self.history.amount[top].tolist())
+
+    def test_concat(self):
+        """Test concatenating the histories of several organizations."""
+        other = BalanceHistory.from_records(RECORDS[:1], org_id=13)
+        merged = BalanceHistory.concat([self.history, other])
+        self.assertEqual(5, len(merged))
+        self.assertEqual(1, int((merged.org_id == 13).sum()))
+        empty = BalanceHistory.concat([])
+        self.assertEqual(0, len(empty))
+        self.assertEqual('datetime64[s]', str(empty.time.dtype))
+        self.assertEqual(0, len(empty.spend_by_period()[0]))
+
+    def test_untimed_records(self):
+        """Test that records without a time are rejected with a clear error."""
+        with self.assertRaises(ValueError):
+            BalanceHistory.from_records([{'amount': '1.00', 'type': 'charge', 'time': None}])
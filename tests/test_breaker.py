@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for `python_hologram_api.breaker`."""
+
+import unittest
+
+from python_hologram_api.breaker import CircuitBreakers, CircuitOpenError
+from python_hologram_api.client import HologramClient
+from python_hologram_api.concurrency import RateLimiter
+from python_hologram_api.deadline import DeadlineExceeded, deadline
+from python_hologram_api.transport import Transport
+
+from .fakes import FakeResponse, FakeSession
+
+
+class TestCircuitBreakers(unittest.TestCase):
+    def setUp(self):
+        self.status = 500
+        self.client = HologramClient('key', transport=Transport(
+            breakers=CircuitBreakers(failure_threshold=2, recovery_timeout=60)))
+        self.session = self.client.transport.session = FakeSession(
+            lambda method, url, **kwargs: FakeResponse({'success': self.status < 500}, self.status))
+        self.breaker = self.client.transport.breakers.get('links/cellular')
+
+    def test_opens_after_threshold_per_group(self):
+        """Test that failures open the breaker of their group only."""
+        self.client.cell.get_link(1)
+        self.client.cell.pause_link(1)
+        with self.assertRaises(CircuitOpenError):
+            self.client.cell.list_links()
+        self.assertEqual(2, len(self.session.requests))
+        self.status = 200
+        self.assertTrue(self.client.devices.get(1)['success'])
+        self.assertEqual({'links/cellular': 'open', 'devices': 'closed'}, self.client.breaker_states())
+
+    def test_half_open_probe(self):
+        """Test that a probe after the recovery timeout closes or reopens the breaker."""
+        self.client.cell.get_link(1)
+        self.client.cell.get_link(1)
+        self.breaker.recovery_timeout = 0
+        self.assertEqual('half-open', self.breaker.state)
+        self.client.cell.get_link(1)
+        self.assertEqual('half-open', self.breaker.state)  # reopened, and immediately probe-able again
+        self.status = 200
+        self.client.cell.get_link(1)
+        self.assertEqual('closed', self.breaker.state)
+
+    def test_half_open_limits_probes(self):
+        """Test that only one probe is allowed while half-open."""
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.breaker.recovery_timeout = 0
+        self.breaker.before_request()
+        self.breaker.recovery_timeout = 60
+        with self.assertRaises(CircuitOpenError):
+            self.breaker.before_request()
+
+    def test_release_abandoned_probe(self):
+        """Test that a probe slot given back lets the next request probe."""
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.breaker.recovery_timeout = 0
+        self.assertIsNone(self.client.transport.breakers.get('devices').before_request())
+        probe = self.breaker.before_request()
+        self.breaker.recovery_timeout = 60
+        with self.assertRaises(CircuitOpenError):
+            self.breaker.before_request()
+        self.breaker.release(probe)
+        self.breaker.release(probe)  # only the slot taken is given back
+        self.assertIsNotNone(self.breaker.before_request())
+        with self.assertRaises(CircuitOpenError):
+            self.breaker.before_request()
+
+    def test_probe_not_sent(self):
+        """Test that a probe that times out waiting for the rate budget does not hold its slot."""
+        self.client.transport.rate_limiter = RateLimiter(0.01)
+        self.client.cell.get_link(1)
+        self.breaker.record_failure()
+        self.breaker.recovery_timeout = 0
+        with self.assertRaises(DeadlineExceeded):
+            with deadline(1):
+                self.client.cell.get_link(1)
+        self.assertEqual(1, len(self.session.requests))
+        self.client.transport.rate_limiter = None
+        self.breaker.recovery_timeout = 60
+        self.status = 200
+        self.assertTrue(self.client.cell.get_link(1)['success'])
+        self.assertEqual('closed', self.breaker.state)
+
+    def test_release_twice(self):
+        """Test that releasing one probe twice does not free the slot of another probe in flight."""
+        self.breaker.half_open_max = 2
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.breaker.recovery_timeout = 0
+        first = self.breaker.before_request()
+        self.breaker.recovery_timeout = 60
+        second = self.breaker.before_request()
+        self.assertNotEqual(first, second)
+        self.breaker.release(first)
+        self.breaker.release(first)
+        self.breaker.before_request()
+        with self.assertRaises(CircuitOpenError):
+            self.breaker.before_request()
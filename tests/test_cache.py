@@ -0,0 +1,161 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for `python_hologram_api.cache`."""
+
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+from python_hologram_api.cache import SQLiteCache, TTLCache
+from python_hologram_api.client import HologramClient
+from python_hologram_api.transport import Transport
+
+from .fakes import FakeResponse, FakeSession
+
+
+class TestSQLiteCache(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'cache.sqlite')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_entries_persist_across_instances(self):
+        """Test that a second cache on the same file sees stored entries."""
+        SQLiteCache(self.path, ttl=60).set(('key', 'https://x/plans'), {'success': True})
+        cache = SQLiteCache(self.path, ttl=60)
+        self.assertEqual({'success': True}, cache.get(('key', 'https://x/plans')))
+        self.assertIsNone(cache.get(('other', 'https://x/plans')))
+
+    def test_expiry_and_maxsize(self):
+        """Test that expired entries are not served and the size is bounded."""
+        cache = SQLiteCache(self.path, ttl=-1)
+        cache.set(('key', 'a'), 1)
+        self.assertIsNone(cache.get(('key', 'a')))
+        cache = SQLiteCache(self.path, ttl=60, maxsize=2)
+        for url in 'abc':
+            cache.set(('key', url), url)
+        self.assertEqual(2, len(cache))
+        self.assertIsNone(cache.get(('key', 'a')))
+
+    def test_invalidate_prefix(self):
+        """Test that invalidation matches path segments, not string prefixes."""
+        cache = SQLiteCache(self.path, ttl=60)
+        for url in ('x/organizations/12', 'x/organizations/12/balance', 'x/organizations/123'):
+            cache.set(('key', url), url)
+        cache.invalidate_prefix('key', 'x/organizations/12')
+        self.assertEqual(1, len(cache))
+        self.assertEqual('x/organizations/123', cache.get(('key', 'x/organizations/123')))
+
+    def test_client_uses_disk_cache(self):
+        """Test that a new client process would be served from the disk cache."""
+        for _ in range(2):
+            client = HologramClient('key', transport=Transport(cache=SQLiteCache(self.path, ttl=60)))
+            session = client.transport.session = FakeSession()
+            client.data_plans.list()
+        self.assertEqual([], session.requests)
+        client.user.add_balance(10)
+        client.org.add_balance(5, 10)
+        client.user.get_info()
+        self.assertEqual(3, len(session.requests))
+
+
+class TestInvalidation(unittest.TestCase):
+    def setUp(self):
+        self.client = HologramClient('key', transport=Transport(cache_ttl=300))
+        self.version = 0
+        self.session = self.client.transport.session = FakeSession(
+            lambda method, url, **kwargs: FakeResponse({'success': True, 'data': self.version}))
+
+    def reread(self, read, mutate):
+        read()
+        self.version += 1
+        mutate()
+        return read()['data']
+
+    def test_tag_links_invalidate_tag_list(self):
+        """Test that linking and unlinking devices refreshes the cached tag list."""
+        self.assertEqual(1, self.reread(self.client.tags.list, lambda: self.client.tags.link_devices(1, [10])))
+        self.assertEqual(2, self.reread(self.client.tags.list, lambda: self.client.tags.unlink_devices(1, [10])))
+
+    def test_org_balance_invalidates_org_list(self):
+        """Test that adding balance refreshes both the cached organization and organization list."""
+        self.assertEqual(1, self.reread(self.client.org.list, lambda: self.client.org.add_balance(5, 10)))
+        self.assertEqual(2, self.reread(lambda: self.client.org.get(5), lambda: self.client.org.add_balance(5, 10)))
+
+    def test_hits_are_copies(self):
+        """Test that modifying a response does not modify the cached entry."""
+        self.session.handler = lambda method, url, **kwargs: FakeResponse({'success': True, 'data': [{'id': 1}]})
+        first = self.client.data_plans.list()
+        first['data'][0]['id'] = 2
+        second = self.client.data_plans.list()
+        second['data'].append({'id': 3})
+        self.assertEqual([{'id': 1}], self.client.data_plans.list()['data'])
+        self.assertEqual(1, len(self.session.requests))
+
+
+class TestStaleWhileRevalidate(unittest.TestCase):
+    def setUp(self):
+        self.release = threading.Event()
+        self.version = 0
+
+        def handler(method, url, **kwargs):
+            self.release.wait(5)
+            self.version += 1
+            return FakeResponse({'success': True, 'data': self.version})
+        self.client = HologramClient('key', transport=Transport(cache_ttl=60, max_stale=600))
+        self.session = self.client.transport.session = FakeSession(handler)
+        self.release.set()
+        self.client.data_plans.list()
+        self.release.clear()
+
+    def tearDown(self):
+        self.release.set()
+        self.client.transport.close()
+
+    def expire(self):
+        cache = self.client.transport.cache
+        for key, (expires, value) in list(cache._data.items()):
+            cache._data[key] = (time.time() - 1, value)
+
+    def test_stale_served_with_one_refresh(self):
+        """Test that expired entries are served at once while a single refresh runs."""
+        self.expire()
+        self.assertEqual([1, 1, 1], [self.client.data_plans.list()['data'] for _ in range(3)])
+        self.assertEqual(2, len(self.session.requests))
+        self.release.set()
+        self.client.transport.revalidator.shutdown()
+        self.assertEqual(2, self.client.data_plans.list()['data'])
+
+    def test_refresh_error_keeps_stale(self):
+        """Test that a failed refresh keeps serving the stale entry."""
+        self.session.handler = lambda method, url, **kwargs: FakeResponse({'success': False}, 500)
+        self.expire()
+        self.assertEqual(1, self.client.data_plans.list()['data'])
+        self.client.transport.revalidator.shutdown()
+        self.assertEqual(1, self.client.data_plans.list()['data'])
+
+    def test_max_stale(self):
+        """Test that entries older than max_stale are dropped."""
+        cache = TTLCache(ttl=-1, max_stale=60)
+        cache.set('a', 1)
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual((1, False), cache.get_stale('a'))
+        cache.max_stale = 0
+        self.assertIsNone(cache.get_stale('a'))
+
+    def test_sqlite_get_stale(self):
+        """Test that SQLiteCache serves stale entries within max_stale."""
+        tmpdir = tempfile.mkdtemp()
+        try:
+            cache = SQLiteCache(os.path.join(tmpdir, 'cache.sqlite'), ttl=-1, max_stale=60)
+            cache.set(('key', 'a'), 1)
+            self.assertIsNone(cache.get(('key', 'a')))
+            self.assertEqual((1, False), cache.get_stale(('key', 'a')))
+        finally:
+            shutil.rmtree(tmpdir)
@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for the `hologram` command line interface."""
+
+import io
+import json
+import unittest
+
+from python_hologram_api.cli import parse_args, read_rows, run
+from python_hologram_api.client import HologramClient
+from python_hologram_api.deadline import deadline
+
+from .fakes import FakeSession
+
+
+class TestCli(unittest.TestCase):
+    def setUp(self):
+        self.client = HologramClient('key', base_url='https://example.com/api/1/')
+        self.session = self.client.transport.session = FakeSession()
+
+    def test_parse_args(self):
+        """Test the input format is guessed from the file name."""
+        args = parse_args(['pause_link', 'links.ndjson', '--api-key', 'key'])
+        self.assertEqual('ndjson', args.format)
+        self.assertEqual('csv', parse_args(['pause_link', '-', '--api-key', 'key']).format)
+
+    def test_run_csv(self):
+        """Test that every row becomes one call and one result line."""
+        rows = read_rows(io.StringIO(u'link_id,plan,tier\n1,73,1\n2,,1\n'), 'csv')
+        output = io.StringIO()
+        failed = run(self.client, 'change_plan', rows, output, workers=2)
+        results = sorted((json.loads(line) for line in output.getvalue().splitlines()),
+                         key=lambda r: r['line'])
+        self.assertEqual(1, failed)
+        self.assertEqual([2, 3], [r['line'] for r in results])
+        self.assertTrue(results[0]['response']['success'])
+        self.assertIn('plan', results[1]['error'])
+        self.assertEqual(1, len(self.session.requests))
+        self.assertEqual({'apikey': 'key', 'plan': 73, 'tier': 1}, self.session.requests[0][2]['json'])
+
+    def test_run_ndjson(self):
+        """Test NDJSON input."""
+        rows = read_rows(io.StringIO(u'{"tag_id": 5, "device_id": 7}\n\n'), 'ndjson')
+        self.assertEqual(0, run(self.client, 'link_devices', rows, io.StringIO()))
+        self.assertEqual([7], self.session.requests[0][2]['json']['deviceids'])
+
+    def test_malformed_ndjson(self):
+        """Test that a malformed line fails alone instead of stopping the job."""
+        rows = read_rows(io.StringIO(u'{"link_id": 1}\n{"link_id": \n[2]\n{"link_id": 3}\n'), 'ndjson')
+        output = io.StringIO()
+        self.assertEqual(2, run(self.client, 'pause_link', rows, output))
+        results = dict((r['line'], r) for r in map(json.loads, output.getvalue().splitlines()))
+        self.assertEqual([1, 2, 3, 4], sorted(results))
+        self.assertIn('malformed NDJSON', results[2]['error'])
+        self.assertEqual('{"link_id": ', results[2]['input'])
+        self.assertIn('not an object', results[3]['error'])
+        self.assertEqual(2, len(self.session.requests))
+
+    def test_rows_not_started(self):
+        """Test that rows left when the deadline passes are reported as failed."""
+        rows = read_rows(io.StringIO(u'link_id\n1\n2\n3\n'), 'csv')
+        output = io.StringIO()
+        with deadline(0):
+            failed = run(self.client, 'pause_link', rows, output)
+        results = [json.loads(line) for line in output.getvalue().splitlines()]
+        self.assertEqual(3, failed)
+        self.assertEqual([2, 3, 4], sorted(r['line'] for r in results))
+        self.assertTrue(all('not started' in r['error'] for r in results))
@@ -0,0 +1,46 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for `HologramClientPool` and the shared `Transport`."""
+
+import unittest
+
+from python_hologram_api.client import HologramClientPool
+
+from .fakes import FakeResponse, FakeSession
+
+
+class TestHologramClientPool(unittest.TestCase):
+    def setUp(self):
+        self.pool = HologramClientPool(cache_ttl=60)
+        self.session = self.pool.transport.session = FakeSession(
+            lambda method, url, **kwargs: FakeResponse({'success': True, 'data': kwargs['json']['apikey']}))
+
+    def test_clients_share_transport(self):
+        """Test that clients of different keys share one transport."""
+        a, b = self.pool.client('a'), self.pool['b']
+        self.assertIs(a.transport, b.transport)
+        a.devices.list()
+        b.devices.list()
+        self.assertEqual(['a', 'b'], [r[2]['json']['apikey'] for r in self.session.requests])
+
+    def test_cache_is_isolated_per_key(self):
+        """Test that cached lookups are not shared between keys."""
+        self.assertEqual('a', self.pool.client('a').data_plans.list()['data'])
+        self.assertEqual('b', self.pool.client('b').data_plans.list()['data'])
+        self.assertEqual('a', self.pool.client('a').data_plans.list()['data'])
+        self.assertEqual(2, len(self.session.requests))
+
+    def test_mutation_invalidates_cache(self):
+        """Test that creating a tag invalidates the cached tag list."""
+        client = self.pool.client('a')
+        client.tags.list()
+        client.tags.create('new')
+        client.tags.list()
+        self.assertEqual(['GET', 'POST', 'GET'], [r[0] for r in self.session.requests])
+
+    def test_resources_are_lazy(self):
+        """Test that resources are only created when used."""
+        client = self.pool.client('a')
+        self.assertNotIn('devices', vars(client))
+        self.assertIs(client.devices, client.devices)
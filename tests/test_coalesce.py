@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for `python_hologram_api.coalesce`."""
+
+import threading
+import unittest
+
+from python_hologram_api.client import HologramClient
+
+from .fakes import FakeResponse, FakeSession
+
+
+class TestTagWriteCoalescer(unittest.TestCase):
+    def setUp(self):
+        self.client = HologramClient('key')
+        self.session = self.client.transport.session = FakeSession()
+
+    def calls(self):
+        return sorted((url.rsplit('/', 1)[-1], sorted(kwargs['json']['deviceids']))
+                      for _, url, kwargs in self.session.requests)
+
+    def test_window(self):
+        """Test that concurrent single-device links become one call per tag."""
+        with self.client.tags.coalesce(window=0.2) as coalescer:
+            futures = []
+            threads = [threading.Thread(target=lambda i=i: futures.append(coalescer.link_devices(1, [i])))
+                       for i in range(20)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            coalescer.unlink_devices(2, [5, 5])
+            self.assertTrue(all(f.result(timeout=5)['success'] for f in futures))
+        self.assertEqual([('link', list(range(20))), ('unlink', [5])], self.calls())
+        self.assertEqual({'operations': 21, 'calls': 2, 'superseded': 0}, coalescer.stats())
+        with self.assertRaises(RuntimeError):
+            coalescer.link_devices(1, [1])
+
+    def test_cancel_out(self):
+        """Test that a later opposite operation replaces the earlier one."""
+        coalescer = self.client.tags.coalesce(window=10)
+        linked = coalescer.link_devices(1, [1, 2])
+        unlinked = coalescer.unlink_devices(1, [2])
+        self.assertTrue(coalescer.flush(timeout=5))
+        self.assertEqual([('link', [1]), ('unlink', [2])], self.calls())
+        self.assertEqual(2, len(linked.result()['data']))
+        self.assertTrue(unlinked.result()['success'])
+        self.assertEqual(1, coalescer.stats()['superseded'])
+        coalescer.close()
+
+    def test_batch_size_and_errors(self):
+        """Test that full buffers are split into calls and that failures reach the futures."""
+        self.session.handler = lambda method, url, **kwargs: (
+            FakeResponse() if 1 not in kwargs['json']['deviceids'] else FakeResponse({'success': False}, 400))
+        with self.client.tags.coalesce(window=10, batch_size=2) as coalescer:
+            first = coalescer.link_devices(1, [1, 2])
+            second = coalescer.link_devices(1, [3])
+            self.assertFalse(first.result(timeout=5)['success'])
+            self.assertTrue(coalescer.flush(timeout=5))
+            self.assertTrue(second.result()['success'])
+            self.session.handler = lambda method, url, **kwargs: 1 / 0
+            with self.assertRaises(ZeroDivisionError):
+                coalescer.unlink_devices(1, [4]).result(timeout=5)
+        self.assertEqual([('link', [1, 2]), ('link', [3]), ('unlink', [4])], self.calls())
@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for `python_hologram_api.concurrency`."""
+
+import unittest
+
+from python_hologram_api.client import HologramClient
+from python_hologram_api.concurrency import AdaptiveLimiter, bulk_workers
+from python_hologram_api.transport import Transport
+
+from .fakes import FakeResponse, FakeSession
+
+
+class TestAdaptiveLimiter(unittest.TestCase):
+    def complete(self, limiter, n, latency=0.01, overloaded=False):
+        for _ in range(n):
+            limiter.acquire()
+            limiter.release(latency, overloaded)
+
+    def test_additive_increase(self):
+        """Test that healthy requests raise the limit about one per round."""
+        limiter = AdaptiveLimiter(initial=4, maximum=6)
+        self.complete(limiter, 5)
+        self.assertEqual(5, limiter.limit)
+        self.complete(limiter, 100)
+        self.assertEqual(6, limiter.limit)
+        self.assertEqual(0, limiter.inflight)
+
+    def test_multiplicative_decrease_once_per_window(self):
+        """Test that a burst of overloads halves the limit once."""
+        limiter = AdaptiveLimiter(initial=16)
+        self.complete(limiter, 1, latency=10.0)
+        self.complete(limiter, 5, latency=10.0, overloaded=True)
+        self.assertEqual(8, limiter.limit)
+        self.assertEqual('overload', limiter.history[-1][2])
+
+    def test_latency_inflation(self):
+        """Test that inflated latency counts as overload."""
+        limiter = AdaptiveLimiter(initial=8, latency_tolerance=2.0)
+        self.complete(limiter, 1, latency=0.001)
+        self.complete(limiter, 1, latency=0.5)
+        self.assertEqual(4, limiter.limit)
+        self.assertEqual('latency', limiter.history[-1][2])
+
+    def test_lasting_latency_shift(self):
+        """Test that the baseline catches up with a lasting latency increase and the limit grows again."""
+        limiter = AdaptiveLimiter(initial=8, latency_tolerance=2.0)
+        self.complete(limiter, 10, latency=0.01)
+        self.complete(limiter, 1, latency=0.05)
+        self.assertEqual(4, limiter.limit)
+        self.complete(limiter, 100, latency=0.05)
+        self.assertGreater(limiter.baseline, 0.025)
+        self.assertEqual('increase', limiter.history[-1][2])
+        self.assertGreater(limiter.limit, 4)
+
+    def test_transport_reports_status(self):
+        """Test that the transport feeds 429s into the limiter."""
+        limiter = AdaptiveLimiter(initial=8)
+        client = HologramClient('key', transport=Transport(limiter=limiter))
+        client.transport.session = FakeSession(lambda method, url, **kwargs: FakeResponse({}, 429))
+        client.devices.list()
+        self.assertEqual(4, limiter.limit)
+        self.assertEqual(64, bulk_workers(client))
+        self.assertEqual(3, bulk_workers(client, 3))
@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for `python_hologram_api.deadline`."""
+
+import time
+import unittest
+
+from python_hologram_api.client import HologramClient
+from python_hologram_api.concurrency import RateLimiter, run_concurrently
+from python_hologram_api.constants import DEFAULT_TIMEOUT
+from python_hologram_api.deadline import DeadlineExceeded, current_deadline, deadline, timeout
+
+from .fakes import FakeSession
+
+
+class TestDeadline(unittest.TestCase):
+    def setUp(self):
+        self.client = HologramClient('key')
+        self.session = self.client.transport.session = FakeSession()
+
+    def last_timeout(self):
+        return self.session.requests[-1][2]['timeout']
+
+    def test_default_and_override(self):
+        """Test the client timeout and a scoped override."""
+        self.client.devices.get(1)
+        self.assertEqual(DEFAULT_TIMEOUT, self.last_timeout())
+        with timeout((1, 2)):
+            self.client.devices.get(1)
+        self.assertEqual((1, 2), self.last_timeout())
+
+    def test_deadline_clamps_and_expires(self):
+        """Test that requests get the remaining budget and fail once it is spent."""
+        with deadline(5):
+            with deadline(100):
+                self.client.devices.get(1)
+                self.assertTrue(all(t <= 5 for t in self.last_timeout()))
+        with deadline(0.01):
+            time.sleep(0.02)
+            with self.assertRaises(DeadlineExceeded):
+                self.client.devices.get(1)
+
+    def test_rate_limit_wait_respects_deadline(self):
+        """Test that a rate limit wait longer than the budget fails immediately."""
+        limiter = RateLimiter(rate=0.1, burst=1)
+        limiter.acquire()
+        with deadline(1):
+            with self.assertRaises(DeadlineExceeded):
+                limiter.acquire(deadline=current_deadline())
+
+    def test_bulk_workers_inherit_deadline(self):
+        """Test that bulk jobs carry the deadline to workers and stop when it passes."""
+        def get(device_id):
+            time.sleep(0.02)
+            return self.client.devices.get(device_id)
+        with deadline(0.05):
+            results = list(run_concurrently(get, range(1000), max_workers=2))
+        self.assertLess(len(results), 20)
+        sent = [r[2]['timeout'] for r in self.session.requests]
+        self.assertTrue(all(t <= 0.05 for timeouts in sent for t in timeouts))
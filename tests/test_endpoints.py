@@ -0,0 +1,55 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for `python_hologram_api.endpoints` and endpoint dispatch."""
+
+import unittest
+
+from python_hologram_api import endpoints
+from python_hologram_api.client import HologramClient
+
+from .fakes import FakeSession
+
+
+class TestEndpoints(unittest.TestCase):
+    def setUp(self):
+        self.client = HologramClient('key', base_url='https://example.com/api/1/')
+        self.session = self.client.transport.session = FakeSession()
+
+    def last_request(self):
+        return self.session.requests[-1]
+
+    def test_registry(self):
+        """Test the endpoint declarations."""
+        self.assertIs(endpoints.CHANGE_PLAN, endpoints.REGISTRY['cell.change_plan'])
+        self.assertEqual('links/cellular', endpoints.CHANGE_PLAN.group)
+        self.assertTrue(endpoints.GET_DEVICE.idempotent)
+        self.assertFalse(endpoints.ACTIVATE_SIMS.idempotent)
+
+    def test_templated_path(self):
+        """Test a POST with path arguments and mapped fields."""
+        self.client.cell.change_plan(54321, 73, 1)
+        method, url, kwargs = self.last_request()
+        self.assertEqual(('POST', 'https://example.com/api/1/links/cellular/54321/changeplan'), (method, url))
+        self.assertEqual({'apikey': 'key', 'plan': 73, 'tier': 1}, kwargs['json'])
+
+    def test_unset_optional_fields_are_sent_as_null(self):
+        """Test that optional arguments are sent as null, like before."""
+        self.client.csr.list_messages(device_id=1)
+        body = self.last_request()[2]['json']
+        self.assertEqual(1, body['deviceid'])
+        self.assertIsNone(body['timestampstart'])
+
+    def test_fixed_fields_and_no_auth(self):
+        """Test constant fields and endpoints without the API key."""
+        self.client.cell.pause_link(1)
+        self.assertEqual('pause', self.last_request()[2]['json']['state'])
+        self.assertEqual(200, self.client.cloud.trigger_webhook(1, 'guid', data='x'))
+        self.assertEqual({'data': 'x', 'base64data': None}, self.last_request()[2]['json'])
+
+    def test_base_url_without_trailing_slash(self):
+        """Test that paths resolve like urljoin does."""
+        client = HologramClient('key', base_url='https://example.com/api/1')
+        client.transport.session = self.session
+        client.devices.get(7)
+        self.assertEqual('https://example.com/api/devices/7', self.last_request()[1])
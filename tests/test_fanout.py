@@ -0,0 +1,44 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for `python_hologram_api.fanout`."""
+
+import unittest
+
+from python_hologram_api.client import HologramClient
+from python_hologram_api.fanout import iter_records
+
+
+class FakeOrganization(object):
+    def list(self):
+        return {'success': True, 'data': [{'id': 1, 'name': 'a'}, {'id': 2, 'name': 'b'}, {'id': 3, 'name': 'c'}]}
+
+
+def list_devices(org_id):
+    if org_id == 3:
+        return {'success': False, 'error': 'forbidden'}
+    return {'success': True, 'data': [{'id': org_id * 10}, {'id': org_id * 10 + 1}]}
+
+
+class TestAcrossOrgs(unittest.TestCase):
+    def setUp(self):
+        self.client = HologramClient(api_key=None)
+        self.client.org = FakeOrganization()
+
+    def test_across_all_orgs(self):
+        """Test that every organization is queried and failures are reported."""
+        errors = []
+        records = list(iter_records(self.client.across_orgs(list_devices), errors=errors))
+        self.assertEqual([(1, {'id': 10}), (1, {'id': 11}), (2, {'id': 20}), (2, {'id': 21})],
+                         sorted(records, key=lambda r: r[1]['id']))
+        self.assertEqual([3], [e.org_id for e in errors])
+
+    def test_where(self):
+        """Test filtering organizations."""
+        results = list(self.client.across_orgs(list_devices, where=lambda org: org['name'] == 'b'))
+        self.assertEqual([2], [r.org_id for r in results])
+
+    def test_failure_raises_without_errors_list(self):
+        """Test that iter_records raises the first failure by default."""
+        with self.assertRaises(RuntimeError):
+            list(iter_records(self.client.across_orgs(list_devices, org_ids=[3])))
@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for pickling clients and sharing them across forks."""
+
+import json
+import os
+import pickle
+import unittest
+
+from python_hologram_api.breaker import CircuitBreakers
+from python_hologram_api.client import HologramClient
+from python_hologram_api.concurrency import AdaptiveLimiter
+from python_hologram_api.stub import StubServer
+from python_hologram_api.tracing import InMemoryTracer
+from python_hologram_api.transport import Transport
+
+from .fakes import FakeSession
+
+
+def make_client(**kwargs):
+    transport = Transport(rate=100, cache_ttl=60, max_stale=60, timing=True, limiter=AdaptiveLimiter(),
+                          breakers=CircuitBreakers())
+    return HologramClient('key', transport=transport, tracer=InMemoryTracer(), timeout=5, **kwargs)
+
+
+class TestForking(unittest.TestCase):
+    def test_pickle(self):
+        """Test that a client with every transport part round-trips through pickle."""
+        client = make_client()
+        client.transport.session = FakeSession()
+        client.data_plans.list()
+        copy = pickle.loads(pickle.dumps(client))
+        self.assertEqual(('key', 5), (copy.api_key, copy.timeout))
+        self.assertIsNone(copy.tracer)
+        self.assertIsNot(client.transport.session, copy.transport.session)
+        copy.transport.session = FakeSession()
+        self.assertTrue(copy.data_plans.list()['success'])
+        self.assertEqual([], copy.transport.session.requests)  # cache entries are kept
+
+    def test_fork_rebuilds_session(self):
+        """Test that the first request in another process replaces the session and locks."""
+        client = make_client()
+        transport = client.transport
+        parent_session = transport.session = FakeSession()
+        lock = transport.rate_limiter._lock
+        transport.limiter._inflight = 3
+        transport._pid = -1  # as if forked
+        transport._after_fork()
+        self.assertEqual(os.getpid(), transport._pid)
+        self.assertIsNot(parent_session, transport.session)
+        self.assertIsNot(lock, transport.rate_limiter._lock)
+        self.assertEqual(0, transport.limiter.inflight)
+        self.assertEqual([], parent_session.requests)
+
+    @unittest.skipUnless(hasattr(os, 'fork'), 'os.fork is not available')
+    def test_request_in_forked_child(self):
+        """Test that a child forked after the parent's requests can make its own against the stub."""
+        with StubServer(devices=5, api_key='key', seed=1) as stub:
+            client = make_client(base_url=stub.base_url)
+            self.assertTrue(client.devices.get(1)['success'])
+            parent_session = client.transport.session
+            read_end, write_end = os.pipe()
+            pid = os.fork()
+            if pid == 0:  # child: report back and exit without running anything else
+                status = 1
+                try:
+                    os.close(read_end)
+                    resp = client.devices.get(2)
+                    report = {'id': resp['data']['id'], 'new_session': client.transport.session is not parent_session,
+                              'pid': client.transport._pid == os.getpid()}
+                    os.write(write_end, json.dumps(report).encode('utf-8'))
+                    status = 0
+                finally:
+                    os._exit(status)
+            os.close(write_end)
+            with os.fdopen(read_end, 'rb') as pipe:
+                report = pipe.read()
+            _, status = os.waitpid(pid, 0)
+            self.assertEqual(0, status)
+            self.assertEqual({'id': 2, 'new_session': True, 'pid': True}, json.loads(report.decode('utf-8')))
+            self.assertIs(parent_session, client.transport.session)
+            self.assertTrue(client.devices.get(3)['success'])
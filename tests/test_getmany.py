@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for `python_hologram_api.getmany`."""
+
+import unittest
+
+from python_hologram_api.client import HologramClient, HologramClientPool
+from python_hologram_api.getmany import GET, LIST, GetManyPlanner
+from python_hologram_api.stub import StubServer
+
+
+class TestGetManyPlanner(unittest.TestCase):
+    def test_choose(self):
+        """Test that few IDs are fetched one by one and many with a List call."""
+        planner = GetManyPlanner(get_latency=0.1, list_latency=0.5, list_record_latency=0.001)
+        self.assertEqual(GET, planner.choose(8, workers=8, fleet_size=10000))
+        self.assertEqual(LIST, planner.choose(2000, workers=8, fleet_size=10000))
+        self.assertEqual(LIST, planner.choose(80, workers=8, fleet_size=10))
+
+    def test_learning(self):
+        """Test that observed latencies and fleet sizes change the choice."""
+        planner = GetManyPlanner(get_latency=0.1, list_latency=0.5, list_record_latency=0.001, smoothing=1)
+        self.assertEqual(LIST, planner.choose(200, workers=8, org_id=7))
+        planner.observe_list(20.5, 10000, org_id=7)
+        self.assertEqual(10000, planner.fleet_sizes[7])
+        self.assertAlmostEqual(0.002, planner.list_record_latency)
+        self.assertEqual(GET, planner.choose(200, workers=8, org_id=7))
+        planner.observe_get(5.0)
+        self.assertEqual(LIST, planner.choose(200, workers=8, org_id=7))
+
+    def test_list_fit(self):
+        """Test that List calls of different sizes learn both the fixed and the per-record latency."""
+        planner = GetManyPlanner(list_latency=0.5, list_record_latency=0.0005, smoothing=0.2)
+        for records in (100, 5000, 100, 5000, 2000):
+            planner.observe_list(2.0 + 0.001 * records, records, org_id=records)
+        self.assertAlmostEqual(2.0, planner.list_latency)
+        self.assertAlmostEqual(0.001, planner.list_record_latency)
+        planner.observe_list(1.0, 0, org_id=0)
+        self.assertLess(planner.list_latency, 2.0)
+
+
+class TestGetMany(unittest.TestCase):
+    def setUp(self):
+        self.stub = StubServer(devices=30, api_key='key', seed=1).start()
+        self.client = HologramClient('key', base_url=self.stub.base_url)
+
+    def tearDown(self):
+        self.client.transport.close()
+        self.stub.stop()
+
+    def test_strategies(self):
+        """Test that both strategies return records in request order and report missing IDs."""
+        ids = [5, 999, 2, 5, 17]
+        for strategy in (GET, LIST):
+            result = self.client.devices.get_many(ids, strategy=strategy)
+            self.assertEqual(strategy, result.strategy)
+            self.assertEqual([5, 2, 5, 17], [record['id'] for record in result.records])
+            self.assertEqual([999], result.missing)
+        self.assertEqual(3, self.stub.requests['devices.get', 200])
+        self.assertEqual(1, self.stub.requests['devices.get', 404])
+        self.assertEqual(1, self.stub.requests['devices.list', 200])
+        self.assertEqual(30, self.client.devices.planner.fleet_sizes[None])
+
+    def test_links(self):
+        """Test that the planner picks a List call for most of a known fleet."""
+        self.client.cell.get_many([1], strategy=LIST)
+        result = self.client.cell.get_many(range(1, 29))
+        self.assertEqual(LIST, result.strategy)
+        self.assertEqual(list(range(1, 29)), [link['id'] for link in result.records])
+        with self.assertRaises(ValueError):
+            self.client.cell.get_many([1], strategy='scan')
+
+    def test_planner_shared_per_api_key(self):
+        """Test that clients of a pool keep what earlier clients of the same key learned."""
+        pool = HologramClientPool(base_url=self.stub.base_url, transport=self.client.transport)
+        self.client.devices.get_many([1], strategy=LIST)
+        self.assertIs(self.client.devices.planner, pool.client('key').devices.planner)
+        self.assertEqual(30, pool.client('key').devices.planner.fleet_sizes[None])
+        self.assertIsNot(self.client.devices.planner, pool.client('other').devices.planner)
+        self.assertIsNot(self.client.devices.planner, self.client.cell.planner)
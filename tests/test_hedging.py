@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for `python_hologram_api.hedging`."""
+
+import itertools
+import threading
+import time
+import unittest
+
+from python_hologram_api.client import HologramClient
+from python_hologram_api.concurrency import AdaptiveLimiter
+from python_hologram_api.hedging import Hedging
+from python_hologram_api.transport import Transport
+
+from .fakes import FakeResponse, FakeSession
+
+
+class TestHedging(unittest.TestCase):
+    def setUp(self):
+        self.release = threading.Event()
+        self.counter = itertools.count()
+        self.responses = []
+        self.threads = []
+
+        def handler(method, url, **kwargs):
+            self.threads.append(threading.current_thread())
+            number = next(self.counter)
+            if number == 0:
+                self.release.wait(5)  # the first request straggles
+            resp = FakeResponse({'success': True, 'data': number})
+            self.responses.append(resp)
+            return resp
+        self.hedging = Hedging(min_samples=1000, default_delay=0.02, budget=1.0)
+        self.client = HologramClient('key', transport=Transport(hedging=self.hedging))
+        self.session = self.client.transport.session = FakeSession(handler)
+
+    def tearDown(self):
+        self.release.set()
+        self.client.transport.close()
+
+    def test_hedge_wins(self):
+        """Test that a straggling read is answered by the hedge and the straggler is closed."""
+        start = time.time()
+        self.assertEqual(1, self.client.devices.get(1)['data'])
+        self.assertLess(time.time() - start, 1)
+        self.release.set()
+        self.hedging.shutdown()
+        self.assertTrue(self.responses[-1].closed)
+        stats = self.hedging.stats()
+        self.assertEqual((1, 1, 1, 0), (stats['requests'], stats['hedged'], stats['wins'], stats['denied']))
+
+    def test_budget(self):
+        """Test that no hedge is sent over budget."""
+        self.hedging.budget = 0
+        threading.Timer(0.1, self.release.set).start()
+        self.assertEqual(0, self.client.devices.get(1)['data'])
+        self.assertEqual(1, len(self.session.requests))
+        self.assertEqual(1, self.hedging.stats()['denied'])
+        self.assertIs(threading.current_thread(), self.threads[0])
+
+    def test_primaries_not_pooled(self):
+        """Test that concurrent first attempts all start at once, whatever the hedge pool size."""
+        self.hedging.max_workers = 1
+        self.hedging.default_delay = 10
+        started = []
+        all_started = threading.Event()
+
+        def handler(method, url, **kwargs):
+            started.append(url)
+            if len(started) == 4:
+                all_started.set()
+            all_started.wait(5)
+            return FakeResponse()
+        self.session.handler = handler
+        threads = [threading.Thread(target=self.client.devices.get, args=(i,)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        self.assertTrue(all_started.wait(5))
+        for thread in threads:
+            thread.join()
+        self.assertEqual(0, self.hedging.stats()['hedged'])
+        pooled = set(self.hedging._threads._threads)
+        workers = set()
+        self.session.handler = lambda method, url, **kwargs: workers.add(threading.current_thread()) or FakeResponse()
+        for i in range(3):
+            self.client.devices.get(i)
+        self.assertTrue(workers <= pooled)  # later first attempts reuse the threads
+        self.assertEqual(pooled, self.hedging._threads._threads)
+
+    def test_pool_size_from_transport(self):
+        """Test that each transport sizes its hedge pool without changing a shared policy."""
+        self.assertEqual(10, self.client.transport.hedge_workers)
+        self.assertEqual(32, Transport(limiter=AdaptiveLimiter(maximum=32), hedging=self.hedging).hedge_workers)
+        self.assertIsNone(self.hedging.max_workers)
+        self.client.devices.get(1)  # hedged
+        self.assertEqual([10], list(self.hedging._executors))
+
+    def test_writes_and_lists_not_hedged(self):
+        """Test that only single record reads are hedged."""
+        self.release.set()
+        self.client.cell.pause_link(1)
+        self.client.devices.list()
+        self.client.cell.list_links()
+        self.assertEqual(0, self.hedging.stats()['requests'])
+        self.client.cell.get_link(1)
+        self.client.org.get_balance(1)
+        self.assertEqual(2, self.hedging.stats()['requests'])
+
+    def test_delay_from_percentile(self):
+        """Test that the hedge delay follows the recorded latency percentile."""
+        hedging = Hedging(percentile=0.5, min_samples=3, min_delay=0)
+        self.assertIsNone(hedging.delay('devices.get'))
+        for latency in (0.1, 0.2, 0.3):
+            hedging._record('devices.get', latency)
+        self.assertEqual(0.2, hedging.delay('devices.get'))
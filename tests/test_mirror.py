@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for `python_hologram_api.mirror`."""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from python_hologram_api.mirror import FleetMirror
+
+
+class FakeList(object):
+    def __init__(self, data):
+        self.data = data
+        self.calls = 0
+
+    def __call__(self, org_id=None):
+        self.calls += 1
+        return {'success': True, 'data': self.data}
+
+
+class FakeResource(object):
+    pass
+
+
+class FakeClient(object):
+    def __init__(self):
+        self.org = FakeResource()
+        self.org.list = FakeList([{'id': 1, 'name': 'acme'}])
+        self.data_plans = FakeResource()
+        self.data_plans.list = FakeList([{'id': 73, 'name': 'Flexible'}, {'id': 80, 'name': 'Maker'}])
+        self.tags = FakeResource()
+        self.tags.list = FakeList({'tags': [{'id': 5, 'name': 'field', 'deviceids': [10, 11]}]})
+        self.devices = FakeResource()
+        self.devices.list = FakeList([{'id': 10, 'orgid': 1, 'name': 'a'}, {'id': 11, 'orgid': 1, 'name': 'b'},
+                                      {'id': 12, 'orgid': 1, 'name': 'c'}])
+        self.cell = FakeResource()
+        self.cell.list_links = FakeList([
+            {'id': 100, 'deviceid': 10, 'orgid': 1, 'state': 'PAUSED-USER', 'plan': {'id': 80}},
+            {'id': 101, 'deviceid': 11, 'orgid': 1, 'state': 'LIVE', 'plan': {'id': 80}},
+            {'id': 102, 'deviceid': 12, 'orgid': 1, 'state': 'PAUSED-USER', 'plan': {'id': 80}},
+        ])
+
+
+class TestFleetMirror(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.client = FakeClient()
+        self.mirror = FleetMirror(self.client, os.path.join(self.dir, 'fleet.sqlite'))
+
+    def tearDown(self):
+        self.mirror.stop()
+        shutil.rmtree(self.dir)
+
+    def test_queries(self):
+        """Test that filters combine, by ID or by name."""
+        self.mirror.sync()
+        links = self.mirror.links(org_id=1, state='paused-user', plan='Maker', tag='field')
+        self.assertEqual([100], [link['id'] for link in links])
+        self.assertEqual([101], [link['id'] for link in self.mirror.links(state='LIVE', plan=80, tag=5)])
+        self.assertEqual([10, 11], [d['id'] for d in self.mirror.devices(tag='field')])
+        self.assertEqual(['Flexible', 'Maker'], [p['name'] for p in self.mirror.plans()])
+        self.assertIsNotNone(self.mirror.last_synced('links'))
+
+    def test_incremental_sync(self):
+        """Test that a resync only writes changed rows, including tag membership."""
+        self.assertEqual(3, self.mirror.sync()['links'])
+        self.client.cell.list_links.data[1] = dict(self.client.cell.list_links.data[1], state='PAUSED-USER')
+        del self.client.cell.list_links.data[2]
+        self.client.tags.list.data['tags'][0] = {'id': 5, 'name': 'field', 'deviceids': [12]}
+        changed = self.mirror.sync()
+        self.assertEqual({'orgs': 0, 'plans': 0, 'tags': 1, 'devices': 0, 'links': 2}, changed)
+        self.assertEqual([100, 101], [link['id'] for link in self.mirror.links(state='PAUSED-USER')])
+        self.assertEqual([12], [d['id'] for d in self.mirror.devices(tag=5)])
+
+    def test_reopen_replaces_rows(self):
+        """Test that the first sync of a reopened mirror drops rows gone upstream."""
+        self.mirror.sync()
+        self.client.devices.list.data.pop()
+        mirror = FleetMirror(self.client, self.mirror.path)
+        mirror.sync(tables=['devices'])
+        self.assertEqual([10, 11], [d['id'] for d in mirror.devices()])
+        self.assertEqual(1, self.client.org.list.calls)
+
+    def test_start(self):
+        """Test that scheduled syncs run in the background until stopped."""
+        self.mirror.start(interval=60)
+        self.mirror.stop()
+        self.assertEqual(1, self.client.cell.list_links.calls)
+        self.assertIsNone(self.mirror.last_error)
@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for `python_hologram_api.payload` and binary cloud messages."""
+
+import base64
+import io
+import unittest
+
+from python_hologram_api.client import HologramClient
+from python_hologram_api.payload import FRAGMENT_SIZE, MAX_MESSAGE_SIZE, encode, parse_fragment, reassemble
+
+from .fakes import FakeResponse, FakeSession
+
+
+class TestEncode(unittest.TestCase):
+    def test_small_payload_is_not_fragmented(self):
+        """Test that a payload that fits is sent unchanged."""
+        self.assertEqual([base64.b64encode(b'\x00\x01').decode('ascii')], list(encode(memoryview(b'\x00\x01'))))
+
+    def test_leading_magic_is_framed(self):
+        """Test that a small payload starting with the fragment magic is sent as a single fragment."""
+        for payload in (b'\xf7\x01\x00\x07\x00\x00', io.BytesIO(b'\xf7' * FRAGMENT_SIZE)):
+            messages = list(encode(payload, message_id=7))
+            self.assertEqual(1, len(messages))
+            self.assertTrue(len(messages[0]) <= MAX_MESSAGE_SIZE)
+            raw = base64.b64decode(messages[0])
+            self.assertEqual((7, 0, True), parse_fragment(raw)[:3])
+            payload = payload.getvalue() if hasattr(payload, 'getvalue') else payload
+            self.assertEqual(payload, reassemble([raw]))
+        self.assertEqual([''], list(encode(b'')))
+
+    def test_fragments_reassemble(self):
+        """Test that fragments fit the message limit and reassemble, from buffers and streams."""
+        payload = bytes(bytearray(i % 256 for i in range(2 * FRAGMENT_SIZE + 10)))
+        for source in (payload, io.BytesIO(payload)):
+            messages = list(encode(source, message_id=7))
+            self.assertEqual(3, len(messages))
+            self.assertTrue(all(len(m) <= MAX_MESSAGE_SIZE for m in messages))
+            raw = [base64.b64decode(m) for m in reversed(messages)]
+            self.assertEqual(payload, reassemble(raw))
+            self.assertRaises(ValueError, reassemble, raw[1:])
+
+
+class TestBinaryMessages(unittest.TestCase):
+    def setUp(self):
+        self.client = HologramClient('key')
+        self.session = self.client.transport.session = FakeSession()
+
+    def test_send_message_fragments(self):
+        """Test that a large binary payload is sent as base64 fragments."""
+        payload = b'\xff' * (FRAGMENT_SIZE + 1)
+        resp = self.client.cloud.send_message([1], 'TCP', 4010, data=payload)
+        self.assertTrue(resp['success'])
+        self.assertEqual(2, len(resp['data']))
+        bodies = [kwargs['json'] for _, _, kwargs in self.session.requests]
+        self.assertEqual([None, None], [body['data'] for body in bodies])
+        raw = [base64.b64decode(body['base64data']) for body in bodies]
+        self.assertEqual(payload, reassemble(raw))
+
+    def test_trigger_webhook_status(self):
+        """Test that a fragmented webhook returns the highest status code."""
+        statuses = iter([200, 500])
+        self.session.handler = lambda method, url, **kwargs: FakeResponse(status_code=next(statuses))
+        status = self.client.cloud.trigger_webhook(1, 'guid', data=io.BytesIO(b'x' * (FRAGMENT_SIZE + 1)),
+                                                   pipeline=1)
+        self.assertEqual(500, status)
+
+    def test_text_unchanged(self):
+        """Test that text data is still sent as is."""
+        self.client.cloud.send_message([1], 'TCP', 4010, data='hello')
+        self.assertEqual('hello', self.session.requests[0][2]['json']['data'])
@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for `python_hologram_api.reconcile`."""
+
+import time
+import unittest
+
+from python_hologram_api.deadline import DeadlineExceeded, deadline
+from python_hologram_api.reconcile import Action, ActionSkipped, LinkReconciler
+
+
+class FakeCell(object):
+    def __init__(self, links):
+        self.links = links
+        self.calls = []
+        self.failing = ()
+
+    def list_links(self, org_id=None):
+        return {'success': True, 'data': self.links}
+
+    def _record(self, name, *args):
+        self.calls.append((name,) + args)
+        return {'success': name not in self.failing}
+
+    def change_plan(self, link_id, plan, tier):
+        return self._record('change_plan', link_id, plan, tier)
+
+    def change_overage_limit(self, link_id, limit):
+        return self._record('change_overage_limit', link_id, limit)
+
+    def pause_link(self, link_id):
+        return self._record('pause_link', link_id)
+
+    def unpause_link(self, link_id):
+        return self._record('unpause_link', link_id)
+
+
+class FakeDataPlans(object):
+    def __init__(self):
+        self.calls = 0
+
+    def list(self):
+        self.calls += 1
+        return {'success': True, 'data': [{'id': 73, 'name': 'Flexible'}, {'id': 80, 'name': 'Maker'}]}
+
+
+class FakeClient(object):
+    def __init__(self, links):
+        self.cell = FakeCell(links)
+        self.data_plans = FakeDataPlans()
+
+
+LINKS = [
+    {'id': 1, 'plan': {'id': 73, 'tier': 1}, 'overagelimit': 100, 'state': 'LIVE'},
+    {'id': 2, 'plan': {'id': 80, 'tier': 1}, 'overagelimit': 100, 'state': 'PAUSED-USER'},
+]
+
+
+class TestLinkReconciler(unittest.TestCase):
+    def setUp(self):
+        self.client = FakeClient(LINKS)
+        self.reconciler = LinkReconciler(self.client, max_workers=2)
+
+    def test_unchanged_links_issue_no_calls(self):
+        """Test that a desired state equal to the current state is a no-op."""
+        desired = {1: {'plan': 73, 'tier': 1, 'overage_limit': 100, 'paused': False},
+                   2: {'paused': True}}
+        self.assertEqual([], self.reconciler.apply(desired))
+        self.assertEqual([], self.client.cell.calls)
+        self.assertEqual(0, self.client.data_plans.calls)
+
+    def test_plan_resolves_names_once(self):
+        """Test that plan names are resolved with a single List Data Plans call."""
+        desired = {1: {'plan': 'Maker', 'paused': True}, 2: {'plan': 'Flexible', 'paused': False}}
+        actions = self.reconciler.plan(desired)
+        self.assertEqual([
+            Action(1, 'change_plan', (80, 1)),
+            Action(1, 'pause_link', ()),
+            Action(2, 'unpause_link', ()),
+            Action(2, 'change_plan', (73, 1)),
+        ], actions)
+        self.assertEqual(1, self.client.data_plans.calls)
+
+    def test_dry_run_does_not_mutate(self):
+        """Test that a dry run reports actions without calling the API."""
+        results = self.reconciler.apply({1: {'overage_limit': 5}}, dry_run=True)
+        self.assertEqual([Action(1, 'change_overage_limit', (5,))], [r.action for r in results])
+        self.assertEqual([], self.client.cell.calls)
+
+    def test_apply(self):
+        """Test that apply issues only the needed mutations."""
+        results = self.reconciler.apply({1: {'overage_limit': 5}, 2: {'paused': False}})
+        self.assertTrue(all(r.error is None for r in results))
+        self.assertEqual(
+            sorted([('change_overage_limit', 1, 5), ('unpause_link', 2)]),
+            sorted(self.client.cell.calls))
+
+    def test_failure_skips_remaining_actions(self):
+        """Test that the actions after a failed one are reported as skipped."""
+        self.client.cell.failing = ('change_plan',)
+        results = self.reconciler.apply({1: {'plan': 80, 'paused': True}})
+        self.assertEqual(['change_plan', 'pause_link'], [r.action.method for r in results])
+        self.assertIsInstance(results[0].error, RuntimeError)
+        self.assertIsInstance(results[1].error, ActionSkipped)
+        self.assertEqual([('change_plan', 1, 80, 1)], self.client.cell.calls)
+
+    def test_unknown_tier(self):
+        """Test that a plan change without a known tier fails without a call."""
+        self.client.cell.links = [{'id': 3, 'planid': 73, 'state': 'LIVE'}]
+        results = self.reconciler.apply({3: {'plan': 80, 'overage_limit': 5}})
+        self.assertIsInstance(results[0].error, ValueError)
+        self.assertIsInstance(results[1].error, ActionSkipped)
+        self.assertEqual([], self.client.cell.calls)
+        self.assertEqual(1, len(self.reconciler.apply({3: {'plan': 80, 'tier': 2}})))
+        self.assertEqual([('change_plan', 3, 80, 2)], self.client.cell.calls)
+
+    def test_rate_limit_respects_deadline(self):
+        """Test that waiting for the mutation rate gives up at the deadline instead of sleeping past it."""
+        reconciler = LinkReconciler(self.client, max_workers=1, rate=0.1)
+        start = time.time()
+        with deadline(1):
+            results = reconciler.apply({1: {'overage_limit': 5, 'paused': True}})
+        self.assertLess(time.time() - start, 1)
+        self.assertIsNone(results[0].error)
+        self.assertIsInstance(results[1].error, DeadlineExceeded)
+        self.assertEqual([('change_overage_limit', 1, 5)], self.client.cell.calls)
@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for `python_hologram_api.stub` and `python_hologram_api.loadgen`."""
+
+import threading
+import unittest
+
+from python_hologram_api.client import HologramClient
+from python_hologram_api.loadgen import format_report, run_load
+from python_hologram_api.stub import StubServer
+
+
+class TestStubServer(unittest.TestCase):
+    def setUp(self):
+        self.stub = StubServer(devices=20, api_key='key', seed=1).start()
+        self.client = HologramClient('key', base_url=self.stub.base_url)
+
+    def tearDown(self):
+        self.client.transport.close()
+        self.stub.stop()
+
+    def test_endpoints(self):
+        """Test that reads and mutations are served from the stub fleet."""
+        self.assertEqual(20, len(self.client.devices.list()['data']))
+        self.assertTrue(self.client.cell.pause_link(3)['success'])
+        self.assertEqual('PAUSED-USER', self.client.cell.get_link(3)['data']['state'])
+        self.client.cell.change_plan(3, 2, 1)
+        self.assertEqual(2, self.client.cell.get_link(3)['data']['plan']['id'])
+        self.client.tags.link_devices(1, [19, 20])
+        tag = self.client.tags.list()['data']['tags'][0]
+        self.assertTrue({19, 20} <= set(tag['deviceids']))
+        self.assertFalse(self.client.devices.get(999)['success'])
+        self.assertEqual(1, self.stub.requests[('devices.list', 200)])
+
+    def test_shared_path(self):
+        """Test that pause and unpause, which share a path, are routed and counted apart."""
+        self.client.cell.pause_link(3)
+        self.client.cell.unpause_link(3)
+        self.assertEqual('LIVE', self.client.cell.get_link(3)['data']['state'])
+        self.assertEqual(1, self.stub.requests[('cell.pause_link', 200)])
+        self.assertEqual(1, self.stub.requests[('cell.unpause_link', 200)])
+
+    def test_concurrent_counts(self):
+        """Test that requests from many threads are all counted."""
+        threads = [threading.Thread(target=lambda: [self.client.devices.get(1) for _ in range(25)])
+                   for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(200, self.stub.requests[('devices.get', 200)])
+
+    def test_auth(self):
+        """Test that a wrong API key is rejected."""
+        other = HologramClient('wrong', base_url=self.stub.base_url)
+        self.assertFalse(other.devices.list()['success'])
+        self.assertEqual(1, self.stub.requests[('devices.list', 401)])
+
+    def test_fault_injection(self):
+        """Test that throttling and errors are injected at the configured rates."""
+        self.stub.throttle_rate = 1.0
+        from python_hologram_api import endpoints
+        resp = self.client.request(endpoints.LIST_DEVICES)
+        self.assertEqual(429, resp.status_code)
+        self.assertEqual('1', resp.headers['Retry-After'])
+        self.stub.throttle_rate, self.stub.error_rate = 0.0, 1.0
+        self.assertEqual(500, self.client.request(endpoints.LIST_DEVICES).status_code)
+
+    def test_load(self):
+        """Test that a load run reports every request."""
+        self.stub.error_rate = 0.2
+        report = run_load(self.client, 'operations', requests=50, workers=4, devices=20, seed=1)
+        self.assertEqual(50, report.requests)
+        self.assertEqual(50, sum(stats.count for stats in report.operations.values()))
+        self.assertTrue(0 < report.errors < 50)
+        self.assertLessEqual(report.p50, report.p99)
+        self.assertIn('req/s', format_report(report))
@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for `python_hologram_api.tagindex`."""
+
+import unittest
+
+from python_hologram_api.client import HologramClient
+from python_hologram_api.tagindex import TagIndex, _from_bitmap, _to_bitmap
+
+from .fakes import FakeResponse, FakeSession
+
+
+TAGS = [
+    {'id': 1, 'name': 'field', 'deviceids': [10, 11, 12, 13]},
+    {'id': 2, 'name': 'lab', 'deviceids': [12, 14]},
+    {'id': 3, 'name': 'spares', 'deviceids': [13]},
+    {'id': 4, 'name': 'east coast', 'deviceids': [10, 14]},
+]
+
+
+class TestTagIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = TagIndex(TAGS, devices=[15])
+
+    def test_bitmaps(self):
+        """Test that bitmaps round trip, including ordinals past a byte boundary."""
+        ordinals = [0, 3, 7, 8, 64, 1000]
+        self.assertEqual(ordinals, list(_from_bitmap(_to_bitmap(ordinals))))
+        self.assertEqual(0, _to_bitmap([]))
+        self.assertEqual([], list(_from_bitmap(0)))
+
+    def test_operators(self):
+        """Test selection algebra, membership and length."""
+        field, lab, spares = self.index.tag('field'), self.index.tag(2), self.index.tag('spares')
+        self.assertEqual([12], list(field & lab))
+        self.assertEqual([10, 11, 12], (field - spares).device_ids())
+        self.assertEqual([10, 11, 13, 14], list(field ^ lab))
+        self.assertEqual([14, 15], sorted(~field))
+        self.assertEqual(6, len(self.index.all()))
+        self.assertIn(11, field)
+        self.assertNotIn(15, field)
+        self.assertNotIn(99, field)
+        self.assertFalse(self.index.none())
+        with self.assertRaises(KeyError):
+            self.index.tag('missing')
+        with self.assertRaises(ValueError):
+            field & TagIndex(TAGS).tag('lab')
+
+    def test_select(self):
+        """Test expression precedence, parentheses, quoting and tag IDs."""
+        select = self.index.select
+        self.assertEqual([10, 11, 12], list(select('field AND NOT spares')))
+        self.assertEqual([10, 12, 14], list(select('field and lab or "east coast"')))
+        self.assertEqual([10, 12], list(select('field & (lab | "east coast")')))
+        self.assertEqual([14, 15], sorted(select('~1')))
+        self.assertEqual(select('NOT (field OR lab)'), select('NOT field AND NOT lab'))
+        for bad in ('', 'field AND', '(field', 'field)', 'field lab', 'AND field', 'lab & "east'):
+            with self.assertRaises(ValueError):
+                select(bad)
+
+    def test_feeds_requests(self):
+        """Test that a selection is sent as a list of device IDs."""
+        client = HologramClient('key')
+        session = client.transport.session = FakeSession(
+            lambda method, url, **kwargs: FakeResponse({'success': True, 'data': {'tags': TAGS}}))
+        index = TagIndex.load(client)
+        targets = index.select('field AND NOT spares')
+        client.cloud.send_message(targets, 'TCP', 4010, data='reboot')
+        client.tags.link_devices(9, targets)
+        self.assertEqual([10, 11, 12], session.requests[1][2]['json']['deviceids'])
+        self.assertEqual([10, 11, 12], session.requests[2][2]['json']['deviceids'])
+        with self.assertRaises(RuntimeError):
+            TagIndex.from_response({'success': False})
@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for `python_hologram_api.timing`."""
+
+import json
+import threading
+import unittest
+
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer  # python 3
+except ImportError:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer  # python 2
+
+from python_hologram_api.client import HologramClient
+from python_hologram_api.transport import Transport
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        body = json.dumps({'success': True, 'data': []}).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestTiming(unittest.TestCase):
+    def setUp(self):
+        self.server = HTTPServer(('127.0.0.1', 0), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+        base_url = 'http://localhost:{}/api/1/'.format(self.server.server_address[1])
+        self.client = HologramClient('key', base_url=base_url, transport=Transport(timing=True))
+
+    def tearDown(self):
+        self.client.transport.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_breakdown_and_reuse(self):
+        """Test that the first request connects and the second reuses the connection."""
+        from python_hologram_api import endpoints
+        first = self.client.request(endpoints.LIST_DEVICES)
+        second = self.client.request(endpoints.LIST_DEVICES)
+        self.assertFalse(first.timing.reused)
+        self.assertGreater(first.timing.connect, 0)
+        self.assertTrue(second.timing.reused)
+        self.assertEqual(0, second.timing.connect)
+        self.assertGreater(second.timing.ttfb, 0)
+        self.assertGreaterEqual(first.timing.total, first.timing.ttfb)
+
+    def test_stats_per_endpoint(self):
+        """Test aggregated statistics per endpoint."""
+        for _ in range(3):
+            self.client.devices.list()
+        self.client.cell.list_links()
+        summary = self.client.transport.timing_stats.summary()
+        self.assertEqual(3, summary['devices.list']['count'])
+        self.assertEqual(1, summary['cell.list_links']['count'])
+        self.assertIn('p99', summary['devices.list']['ttfb'])
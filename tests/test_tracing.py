@@ -0,0 +1,50 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for `python_hologram_api.tracing`."""
+
+import unittest
+
+from python_hologram_api.client import HologramClient
+from python_hologram_api.tracing import InMemoryTracer
+
+from .fakes import FakeSession
+
+
+class TestTracing(unittest.TestCase):
+    def setUp(self):
+        self.tracer = InMemoryTracer()
+        self.client = HologramClient('key', tracer=self.tracer)
+        self.client.transport.session = FakeSession()
+
+    def test_call_and_attempt_spans(self):
+        """Test that a call records a span with an HTTP attempt child."""
+        self.client.cell.change_plan(1, 73, 1)
+        attempt, call = self.tracer.spans
+        self.assertEqual('hologram cell.change_plan', call.name)
+        self.assertEqual('links/cellular/{}/changeplan', call.attributes['hologram.endpoint'])
+        self.assertEqual(200, call.attributes['http.status_code'])
+        self.assertEqual([attempt], self.tracer.children(call))
+        self.assertEqual('HTTP POST', attempt.name)
+        self.assertEqual(2, attempt.attributes['http.response_content_length'])
+
+    def test_path_arguments_not_recorded(self):
+        """Test that attempt spans record the path template, not a webhook GUID."""
+        self.client.cloud.trigger_webhook(1, 'secret-guid', data='on')
+        attempt = self.tracer.spans[0]
+        self.assertEqual('https://dashboard.hologram.io/api/1/devices/messages/{}/{}', attempt.attributes['http.url'])
+        self.assertFalse(any('secret-guid' in str(value) for span in self.tracer.spans
+                             for value in span.attributes.values()))
+
+    def test_exceptions_are_recorded(self):
+        """Test that a failing attempt records the exception on both spans."""
+        def fail(method, url, **kwargs):
+            raise IOError('boom')
+        self.client.transport.session = FakeSession(fail)
+        with self.assertRaises(IOError):
+            self.client.devices.get(1)
+        self.assertTrue(all(isinstance(s.error, IOError) for s in self.tracer.spans))
+
+    def test_disabled_by_default(self):
+        """Test that clients do not trace unless asked to."""
+        self.assertIsNone(HologramClient('key').tracer)
@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for `python_hologram_api.traffic`."""
+
+import unittest
+
+from python_hologram_api.client import HologramClient
+
+from .fakes import FakeResponse, FakeSession
+
+try:
+    import numpy as np
+    from python_hologram_api.traffic import MessageTraffic
+except ImportError:
+    np = None
+
+RECORDS = [
+    {'id': 1, 'deviceid': 10, 'logged': '2017-10-20 10:00:05.250', 'data': 'abcd', 'tags': ['_DEVICE_10_', 'temp']},
+    {'id': 2, 'deviceid': 11, 'logged': '2017-10-20 10:00:40', 'data': 'ab', 'tags': ['gps']},
+    {'id': 3, 'deviceid': 10, 'logged': '2017-10-20 10:03:10', 'data': '{"tags": ["temp"]}'},
+    {'id': 4, 'deviceid': 10, 'logged': 1508494200, 'data': '', 'tags': []},
+]
+
+
+@unittest.skipIf(np is None, 'numpy is not installed')
+class TestMessageTraffic(unittest.TestCase):
+    def setUp(self):
+        self.traffic = MessageTraffic.from_response({'success': True, 'data': RECORDS})
+
+    def test_columns(self):
+        """Test that records become time-sorted columns with topic codes."""
+        self.assertEqual([1, 2, 3, 4], self.traffic.id.tolist())
+        self.assertEqual(['temp', 'gps'], self.traffic.topics)
+        self.assertEqual([0, 1, 0, -1], self.traffic.topic.tolist())
+        self.assertEqual('2017-10-20T10:00:05', str(self.traffic.time[0]))
+        self.assertEqual([4, 2, 18, 0], self.traffic.size.tolist())
+
+    def test_counts_sizes_rates(self):
+        """Test per-minute buckets by device and topic, including empty buckets."""
+        periods, keys, counts = self.traffic.counts('m', by='device')
+        self.assertEqual(11, len(periods))
+        self.assertEqual([10, 11], keys.tolist())
+        self.assertEqual([1, 0, 0, 1, 0, 0, 0, 0, 0, 0, 1], counts[0].tolist())
+        self.assertEqual(1, counts[1].sum())
+        periods, keys, sizes = self.traffic.sizes('h', by='topic')
+        self.assertEqual([None, 'temp', 'gps'], keys.tolist())
+        self.assertEqual([[0], [22], [2]], sizes.tolist())
+        periods, keys, rates = self.traffic.rates('m', by=None, end='2017-10-20T10:01')
+        self.assertEqual([2 / 60.0, 0.0], rates[0].tolist())
+        with self.assertRaises(ValueError):
+            self.traffic.counts('M')
+
+    def test_silence_and_gaps(self):
+        """Test devices gone silent, devices never heard from and gaps between messages."""
+        devices, seen = self.traffic.silent(threshold=300, now=np.datetime64('2017-10-20T10:12:00'),
+                                            devices=[10, 11, 12])
+        self.assertEqual([12, 11], devices.tolist())
+        self.assertTrue(np.isnat(seen[0]))
+        devices, before, after = self.traffic.gaps(min_gap=300)
+        self.assertEqual([10], devices.tolist())
+        self.assertEqual(('2017-10-20T10:03:10', '2017-10-20T10:10:00'), (str(before[0]), str(after[0])))
+
+    def test_unknown_device_and_time(self):
+        """Test that messages without a device are never silent and those without a time are skipped."""
+        traffic = MessageTraffic()
+        self.assertEqual(3, traffic.add_records([
+            {'id': 1, 'logged': 1508494200},
+            {'id': 2, 'deviceid': 5, 'logged': None, 'timestamp': 1508494260},
+            {'id': 3, 'deviceid': 6},
+        ]))
+        self.assertEqual([1, 2], traffic.id.tolist())
+        devices, seen = traffic.silent(threshold=1, now=2e9)
+        self.assertEqual([5], devices.tolist())
+        self.assertEqual([5], traffic.last_seen()[0].tolist())
+
+    def test_incremental(self):
+        """Test that overlapping and older pages are merged in time order, once per message ID."""
+        self.traffic.add_records([
+            {'id': 4, 'deviceid': 10, 'logged': 1508494200},
+            {'id': 5, 'deviceid': 11, 'logged': '2017-10-20 10:20:00'},
+            {'id': 5, 'deviceid': 11, 'logged': '2017-10-20 10:20:00'},
+        ])
+        self.assertEqual([1, 2, 3, 4, 5], self.traffic.id.tolist())
+        self.traffic.add_records([{'id': 0, 'deviceid': 12, 'logged': '2017-10-20 09:00:00'}])
+        self.assertEqual([0, 1, 2, 3, 4, 5], self.traffic.id.tolist())
+        self.assertEqual(6, len(self.traffic))
+
+    def test_poll(self):
+        """Test that polling asks for messages since the latest one held."""
+        client = HologramClient('key')
+        session = client.transport.session = FakeSession(
+            lambda method, url, **kwargs: FakeResponse({'success': True, 'data': RECORDS}))
+        traffic = MessageTraffic()
+        self.assertEqual(4, traffic.poll(client, org_id=12))
+        traffic.poll(client)
+        self.assertIsNone(session.requests[0][2]['json']['timestampstart'])
+        self.assertEqual(1508494200, session.requests[1][2]['json']['timestampstart'])
+        self.assertEqual(4, len(traffic))
+
+    def test_poll_pages(self):
+        """Test that polling pages through full pages, oldest or newest first, and stops on a short page."""
+        messages = [{'id': i, 'deviceid': 10, 'logged': 1508494200 + i // 3} for i in range(250)]
+
+        def handler(method, url, json=None, **kwargs):
+            start, end = json['timestampstart'] or 0, json['timestampend'] or float('inf')
+            page = [m for m in messages if start <= m['logged'] < end]
+            page = page[::-1][:json['limit']] if self.newest_first else page[:json['limit']]
+            return FakeResponse({'success': True, 'data': page})
+        client = HologramClient('key')
+        for self.newest_first in (False, True):
+            session = client.transport.session = FakeSession(handler)
+            traffic = MessageTraffic()
+            self.assertGreaterEqual(traffic.poll(client, limit=100), 250)
+            self.assertEqual(list(range(250)), sorted(traffic.id.tolist()))
+            self.assertEqual(3, len(session.requests))
+        messages = [{'id': i, 'deviceid': 10, 'logged': 1508494200} for i in range(5)]
+        with self.assertRaises(RuntimeError):
+            MessageTraffic().poll(client, limit=5)
@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for `python_hologram_api.views`."""
+
+import unittest
+
+from python_hologram_api.client import HologramClient
+from python_hologram_api.stub import StubServer
+from python_hologram_api.views import FleetView
+
+
+class TestFleetView(unittest.TestCase):
+    def setUp(self):
+        self.stub = StubServer(devices=40, api_key='key', seed=1).start()
+        self.client = HologramClient('key', base_url=self.stub.base_url)
+        self.view = FleetView(self.client)
+
+    def tearDown(self):
+        self.client.transport.close()
+        self.stub.stop()
+
+    def calls(self):
+        return dict((name, count) for (name, status), count in self.stub.requests.items())
+
+    def test_rows(self):
+        """Test that rows are joined in order with one lookup per plan and organization list."""
+        rows = self.view.rows([7, 3, 999, 12])
+        self.assertEqual([7, 3, 12], [row.device['id'] for row in rows])
+        for row in rows:
+            self.assertEqual(row.device['id'], row.link['deviceid'])
+            self.assertEqual(row.link['plan']['id'], row.plan['id'])
+            self.assertEqual('Stub Org', row.org['name'])
+        flat = rows[0].flat()
+        self.assertEqual((7, 'device-7', 1, 'Stub Org', 7), (
+            flat['device_id'], flat['device_name'], flat['org_id'], flat['org_name'], flat['link_id']))
+        self.assertEqual(rows[0].plan['name'], flat['plan_name'])
+        calls = self.calls()
+        self.assertEqual(1, calls['data_plans.list'])
+        self.assertEqual(1, calls['org.list'])
+        self.assertNotIn('data_plans.get', calls)
+
+    def test_round_trips(self):
+        """Test that device records cost only link lookups once plans and organizations are known."""
+        devices = self.client.devices.list()['data']
+        rows = self.view.rows(devices)
+        self.assertEqual(40, len(rows))
+        self.view.rows(devices)
+        calls = self.calls()
+        self.assertEqual(1, calls['data_plans.list'])
+        self.assertEqual(1, calls['org.list'])
+        self.assertEqual(80, calls.get('cell.get_link', 0) + 40 * calls.get('cell.list_links', 0))
+        self.assertNotIn('devices.get', calls)
+        self.assertNotIn('org.get', calls)
+        self.view.refresh()
+        self.view.rows(devices[:1])
+        self.assertEqual(2, self.calls()['org.list'])
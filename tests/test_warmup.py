@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for `python_hologram_api.warmup`."""
+
+import json
+import socket
+import threading
+import unittest
+
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer  # python 3
+    from socketserver import ThreadingMixIn
+except ImportError:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer  # python 2
+    from SocketServer import ThreadingMixIn
+
+from python_hologram_api.client import HologramClient
+from python_hologram_api.transport import Transport
+from python_hologram_api.warmup import DNSCache
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self):
+        BaseHTTPRequestHandler.setup(self)
+        self.server.connections += 1
+
+    def do_HEAD(self):
+        self.server.heads += 1
+        self.send_response(404)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def do_GET(self):
+        self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        body = json.dumps({'success': True, 'data': []}).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class Server(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+    connections = heads = 0
+
+
+class TestWarmUp(unittest.TestCase):
+    def setUp(self):
+        self.server = Server(('127.0.0.1', 0), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+        base_url = 'http://localhost:{}/api/1/'.format(self.server.server_address[1])
+        self.transport = Transport(pool_maxsize=4, timing=True, dns_ttl=60)
+        self.client = HologramClient('key', base_url=base_url, transport=self.transport)
+
+    def tearDown(self):
+        self.transport.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_warm_up_opens_connections(self):
+        """Test that warm-up opens pooled connections that requests then reuse."""
+        self.assertEqual(3, self.client.warm_up(connections=3))
+        self.assertEqual(1, self.client.warm_up(connections=10))  # capped at the pool size of 4
+        self.assertEqual(4, self.server.connections)
+        from python_hologram_api import endpoints
+        self.assertTrue(self.client.request(endpoints.LIST_DEVICES).timing.reused)
+
+    def test_keepalive_pings_idle_connections(self):
+        """Test that a keepalive round pings every idle connection."""
+        self.client.warm_up(connections=2, keepalive=3600)
+        self.assertEqual(2, self.transport._keepalive.ping())
+        self.assertEqual(2, self.server.heads)
+        self.assertEqual(2, self.server.connections)
+
+
+class TestDNSCache(unittest.TestCase):
+    def test_resolutions_cached_until_ttl(self):
+        """Test that a host is resolved once per TTL and failures are not cached."""
+        calls = []
+
+        def resolver(host, port, family, type):
+            calls.append(host)
+            if host == 'bad':
+                raise socket.gaierror('unknown host')
+            return [(socket.AF_INET, socket.SOCK_STREAM, 6, '', ('10.0.0.1', port))]
+        cache = DNSCache(ttl=60, resolver=resolver)
+        self.assertEqual('10.0.0.1', cache.resolve('api', 443))
+        self.assertEqual('10.0.0.1', cache.resolve('api', 443))
+        self.assertRaises(socket.gaierror, cache.resolve, 'bad', 443)
+        self.assertRaises(socket.gaierror, cache.resolve, 'bad', 443)
+        self.assertEqual(['api', 'bad', 'bad'], calls)
+        cache.ttl = -1
+        cache.invalidate('api')
+        cache.resolve('api', 443)
+        cache.resolve('api', 443)
+        self.assertEqual(5, len(calls))
@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for `python_hologram_api.watch`."""
+
+import unittest
+
+from python_hologram_api.watch import ADDED, CHANGED, REMOVED, DeltaWatcher, FieldChange
+
+
+class TestDeltaWatcher(unittest.TestCase):
+    def setUp(self):
+        self.records = [
+            {'id': 1, 'state': 'LIVE', 'plan': {'id': 73}, 'name': 'a'},
+            {'id': 2, 'state': 'LIVE', 'plan': {'id': 73}, 'name': 'b'},
+        ]
+        self.watcher = DeltaWatcher(lambda: {'success': True, 'data': self.records}, keep=('state',))
+
+    def test_initial_poll(self):
+        """Test that the first poll reports every record as added."""
+        self.assertEqual([ADDED, ADDED], [d.kind for d in self.watcher.poll()])
+        self.assertEqual([], self.watcher.poll())
+        quiet = DeltaWatcher(lambda: self.records, emit_initial=False)
+        self.assertEqual([], quiet.poll())
+
+    def test_changes(self):
+        """Test added, removed and changed records with field detail."""
+        self.watcher.poll()
+        self.records = [
+            {'id': 1, 'state': 'PAUSED-USER', 'plan': {'id': 80}, 'name': 'a'},
+            {'id': 3, 'state': 'LIVE', 'plan': {'id': 73}, 'name': 'c'},
+        ]
+        deltas = dict((d.id, d) for d in self.watcher.poll())
+        self.assertEqual(ADDED, deltas[3].kind)
+        self.assertEqual(REMOVED, deltas[2].kind)
+        self.assertEqual(CHANGED, deltas[1].kind)
+        self.assertEqual((FieldChange('plan', None, {'id': 80}), FieldChange('state', 'LIVE', 'PAUSED-USER')),
+                         deltas[1].changes)
+        self.assertEqual(2, len(self.watcher))
+
+    def test_tracked_fields(self):
+        """Test that only the given fields are compared."""
+        watcher = DeltaWatcher(lambda: self.records, fields=('state',))
+        watcher.poll()
+        self.records[0]['name'] = 'renamed'
+        self.assertEqual([], watcher.poll())
+
+    def test_type_changes(self):
+        """Test that a value changing type but not hash, like 1 to True, is a change."""
+        self.records = [{'id': 1, 'flag': 1}, {'id': 2, 'flag': 1.0}, {'id': 3, 'flag': True}]
+        self.watcher.poll()
+        self.records = [{'id': 1, 'flag': True}, {'id': 2, 'flag': 1}, {'id': 3, 'flag': True}]
+        deltas = self.watcher.poll()
+        self.assertEqual([(1, ('flag',)), (2, ('flag',))], [(d.id, tuple(c.field for c in d.changes)) for d in deltas])
+        self.assertEqual(16, len(self.watcher._snapshot[3][0]))
+
+    def test_renamed_field(self):
+        """Test that a field renamed with its value unchanged is a change."""
+        self.records = [{'id': 1, 'a': 1}]
+        self.watcher.poll()
+        self.records = [{'id': 1, 'b': 1}]
+        deltas = self.watcher.poll()
+        self.assertEqual([CHANGED], [d.kind for d in deltas])
+        self.assertEqual((FieldChange('b', None, 1), FieldChange('a', None, None)), deltas[0].changes)